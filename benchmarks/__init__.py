@@ -0,0 +1,17 @@
+"""
+Бенчмарки проекта.
+
+Модули:
+- datagen: Генератор синтетических файлов данных.
+- harness: Измерение задержки, пропускной способности и памяти, базовый результат.
+- suite: Бенчмарк функций данных и всех страниц сайта.
+- records_memory: Память, занимаемая хранилищем терминов.
+- row_render: Скорость рендеринга строк таблицы словаря (цикл шаблона и готовые фрагменты).
+- startup: Время от старта процесса до первого ответа (CSV и снимок данных).
+
+Запуск из корня репозитория, например:
+    python -m benchmarks.suite --sizes 1000 100000
+    python -m benchmarks.records_memory
+    python -m benchmarks.row_render
+    python -m benchmarks.startup
+"""
@@ -0,0 +1,111 @@
+"""
+Проверка одновременной записи в словарь: сотни параллельных POST /send-term/.
+
+Во временном каталоге создается набор данных (см. `benchmarks.datagen`), затем
+несколько процессов, в каждом из которых несколько потоков, одновременно
+отправляют POST /send-term/ через django.test.Client (полный путь запроса:
+middleware, представление, `terms_work.write_term`, блокировки). Процессы
+нужны, чтобы проверить межпроцессную блокировку (fcntl), потоки — блокировку
+внутри процесса.
+
+После записи проверяется (см. `benchmarks.load.check_data`), что `terms.csv`
+содержит ровно столько строк, сколько было плюс отправленные термины, каждая
+строка — целая строка из трех полей, и каждый термин записан ровно один раз.
+Если нарушения есть, команда завершается с кодом 1.
+
+Пример:
+    python -m benchmarks.concurrent_writes
+    python -m benchmarks.concurrent_writes --processes 8 --threads 16 --per-thread 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .datagen import write_dataset
+from .load import check_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Количество терминов в наборе данных до записи
+INITIAL_TERMS = 1_000
+
+# Код процесса-писателя: потоки ждут общего старта и отправляют термины
+_WORKER = """
+import json, os, sys, threading
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj_eng.settings")
+import django
+django.setup()
+from django.test import Client
+
+process, threads, per_thread = map(int, sys.argv[1:4])
+start = threading.Barrier(threads)
+added = []
+failed = []
+lock = threading.Lock()
+
+
+def run(thread):
+    client = Client()
+    start.wait()
+    for number in range(per_thread):
+        term = f"concurrent-{process}-{thread}-{number}"
+        response = client.post("/send-term/", {"name": "test", "new_term": term,
+                                               "new_definition": f"параллельная запись {number}"})
+        ok = response.status_code == 200 and "Ваше слово добавлено" in response.content.decode("utf-8")
+        with lock:
+            (added if ok else failed).append(term)
+
+
+workers = [threading.Thread(target=run, args=(thread,)) for thread in range(threads)]
+sys.stdin.readline()  # общий старт всех процессов
+for worker in workers:
+    worker.start()
+for worker in workers:
+    worker.join()
+print(json.dumps({"added": added, "failed": failed}))
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Параллельные POST /send-term/ и проверка terms.csv")
+    parser.add_argument("--processes", type=int, default=4, help="количество процессов")
+    parser.add_argument("--threads", type=int, default=8, help="потоков в каждом процессе")
+    parser.add_argument("--per-thread", type=int, default=10, help="терминов от каждого потока")
+    args = parser.parse_args(argv)
+    expected = args.processes * args.threads * args.per_thread
+
+    with tempfile.TemporaryDirectory(prefix="proj-eng-writes-") as directory:
+        write_dataset(directory, INITIAL_TERMS, texts=10, tests=10)
+        env = dict(os.environ, PYTHONPATH=ROOT, DATA_SNAPSHOT="0")
+        processes = [
+            subprocess.Popen([sys.executable, "-c", _WORKER, str(process), str(args.threads), str(args.per_thread)],
+                             cwd=directory, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            for process in range(args.processes)
+        ]
+        started = time.perf_counter()
+        results = [json.loads(process.communicate("\n")[0]) for process in processes]
+        elapsed = time.perf_counter() - started
+        added = [term for result in results for term in result["added"]]
+        failed = [term for result in results for term in result["failed"]]
+
+        problems = check_data(directory, INITIAL_TERMS, added)
+        if len(added) != expected:
+            problems.append(f"сервер подтвердил {len(added)} терминов из {expected} (отказов: {len(failed)})")
+
+    print(f"POST /send-term/: {expected} ({args.processes} процессов × {args.threads} потоков), "
+          f"{elapsed:.2f} с, {expected / elapsed:.0f} запр/с")
+    if problems:
+        print("Нарушения:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print(f"terms.csv цел: добавлено ровно {expected} строк, каждый термин записан один раз")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
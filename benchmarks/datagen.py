@@ -0,0 +1,113 @@
+"""
+Генератор синтетических данных для бенчмарков.
+
+Создает файлы `data/terms.csv`, `data/texts.csv` и `data/tests.csv` в том же
+формате, что и файлы проекта, с заданным количеством строк. Данные
+детерминированы: одинаковые размер и seed дают одинаковые файлы, поэтому
+результаты бенчмарков сравнимы между коммитами.
+
+Пример:
+    python -m benchmarks.datagen /tmp/bench 100000
+    # /tmp/bench/data/terms.csv, texts.csv, tests.csv по 100000 строк
+"""
+
+import os
+import random
+import sys
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+_RUSSIAN_WORDS = ("перевод", "слово", "значение", "термин", "пример", "вариант", "толкование")
+_ENGLISH_WORDS = ("country", "history", "culture", "city", "river", "mountain", "famous",
+                  "capital", "language", "people", "known", "beautiful", "ancient", "modern")
+_COUNTRIES = ("Франция", "Россия", "Германия", "Италия", "Испания", "Япония", "Китай", "Бразилия")
+
+
+def synthetic_terms(count, seed=0):
+    """
+    Генерирует синтетические термины.
+
+    Аргументы:
+        count (int): Количество терминов.
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Возвращает:
+        generator: Кортежи (термин, определение, источник).
+    """
+    rnd = random.Random(seed)
+    for _ in range(count):
+        term = "".join(rnd.choice(_LETTERS) for _ in range(rnd.randint(4, 12)))
+        definition = ", ".join(rnd.choice(_RUSSIAN_WORDS) for _ in range(rnd.randint(1, 4)))
+        # Строки разбираются из файла, поэтому каждое поле — отдельный объект str
+        line = f"{term};{definition};{'db' if rnd.random() < 0.8 else 'user'}\n"
+        term, definition, source = line.split(";")
+        yield term, definition, source.strip()
+
+
+def _sentence(rnd, words, low, high):
+    """Возвращает предложение из случайных слов длиной от low до high слов."""
+    return " ".join(rnd.choice(words) for _ in range(rnd.randint(low, high))).capitalize() + "."
+
+
+def synthetic_texts(count, seed=0):
+    """
+    Генерирует синтетические тексты с переводами.
+
+    Возвращает:
+        generator: Кортежи (текст, перевод, источник).
+    """
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield _sentence(rnd, _ENGLISH_WORDS, 20, 60), _sentence(rnd, _RUSSIAN_WORDS, 20, 60), "db"
+
+
+def synthetic_tests(count, seed=0):
+    """
+    Генерирует синтетические вопросы теста.
+
+    Возвращает:
+        generator: Кортежи (текст вопроса, правильный ответ).
+    """
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield _sentence(rnd, _ENGLISH_WORDS, 40, 120), rnd.choice(_COUNTRIES)
+
+
+def _write_csv(path, header, rows):
+    """Записывает строки в CSV файл с разделителем ";"."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header + "\n")
+        for row in rows:
+            f.write(";".join(row) + "\n")
+
+
+def write_dataset(directory, count, seed=0, texts=None, tests=None):
+    """
+    Создает набор данных в каталоге `directory/data`.
+
+    Аргументы:
+        directory (str): Каталог, который будет рабочим каталогом бенчмарка.
+        count (int): Количество строк в каждом файле.
+        seed (int): Начальное значение генератора случайных чисел.
+        texts (int): Количество текстов, если оно должно отличаться от count.
+        tests (int): Количество вопросов теста, если оно должно отличаться от count.
+
+    Возвращает:
+        str: Путь к созданному каталогу data.
+
+    Пример:
+        write_dataset("/tmp/bench", 1000)
+    """
+    data_dir = os.path.join(directory, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    _write_csv(os.path.join(data_dir, "terms.csv"), "term;explanation;source", synthetic_terms(count, seed))
+    _write_csv(os.path.join(data_dir, "texts.csv"), "term;explanation;source",
+               synthetic_texts(count if texts is None else texts, seed))
+    _write_csv(os.path.join(data_dir, "tests.csv"), "term;source",
+               synthetic_tests(count if tests is None else tests, seed))
+    return data_dir
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Использование: python -m benchmarks.datagen <каталог> <количество строк>")
+    print(write_dataset(sys.argv[1], int(sys.argv[2])))
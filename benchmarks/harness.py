@@ -0,0 +1,174 @@
+"""
+Измерение производительности и сравнение с сохраненным базовым результатом.
+
+Каждый бенчмарк — функция без аргументов. Для нее измеряются:
+- задержка одного вызова: процентили p50, p90, p99 и среднее, мс;
+- пропускная способность: вызовов в секунду;
+- выделение памяти (tracemalloc) в отдельном прогоне: пик во время вызова
+  и объем, оставшийся после него, байт.
+
+Результаты сохраняются в JSON (базовый результат) и сравниваются с ним по
+медиане задержки: замедление больше порога считается регрессией.
+
+Функции:
+- percentile(samples, percent): Процентиль по списку значений.
+- run(func, repeat, max_seconds, setup): Измеряет функцию.
+- load_baseline(path), save_baseline(path, results): Чтение и запись базового результата.
+- compare(results, baseline, threshold): Находит регрессии.
+"""
+
+import gc
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+
+
+def percentile(samples, percent):
+    """
+    Находит процентиль методом ближайшего ранга.
+
+    Аргументы:
+        samples (list): Значения.
+        percent (float): Процентиль от 0 до 100.
+
+    Возвращает:
+        float: Значение процентиля.
+
+    Пример:
+        percentile([1, 2, 3, 4], 50)  # 2
+    """
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _measure_allocations(func, setup):
+    """
+    Выполняет func под tracemalloc.
+
+    Возвращает:
+        tuple: (пик выделенной во время вызова памяти, память, оставшаяся после вызова), байт.
+    """
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before, after - before
+
+
+def run(func, repeat=20, max_seconds=5.0, setup=None):
+    """
+    Измеряет задержку, пропускную способность и выделение памяти функции.
+
+    Эта функция:
+    - Выполняет один прогревочный вызов (заполняются кэши процесса).
+    - Выполняет func до repeat раз, но не дольше max_seconds (минимум один раз).
+    - Перед каждым вызовом выполняет setup (не входит в измерение), если он задан.
+    - Отдельным вызовом измеряет выделение памяти, чтобы tracemalloc не искажал время.
+
+    Аргументы:
+        func (callable): Измеряемая функция без аргументов.
+        repeat (int): Максимальное количество измерений.
+        max_seconds (float): Ограничение общего времени измерений, секунд.
+        setup (callable | None): Подготовка перед каждым вызовом.
+
+    Возвращает:
+        dict: Результат с ключами "runs", "p50_ms", "p90_ms", "p99_ms", "mean_ms",
+              "ops_per_sec", "alloc_peak_bytes", "alloc_retained_bytes".
+
+    Пример:
+        run(terms_work.get_terms_for_table, repeat=10)
+    """
+    if setup:
+        setup()
+    func()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat and (not samples or time.perf_counter() - started < max_seconds):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    peak, retained = _measure_allocations(func, setup)
+    total = sum(samples)
+    return {
+        "runs": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": total / len(samples) * 1000,
+        "ops_per_sec": len(samples) / total if total else float("inf"),
+        "alloc_peak_bytes": peak,
+        "alloc_retained_bytes": retained,
+    }
+
+
+def _git_commit():
+    """Возвращает хэш текущего коммита или None, если git недоступен."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(path):
+    """
+    Загружает базовый результат.
+
+    Возвращает:
+        dict | None: Результаты по именам бенчмарков или None, если файла нет.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["results"]
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results):
+    """
+    Сохраняет результаты как базовые вместе с коммитом и версией Python.
+
+    Аргументы:
+        path (str): Путь к JSON файлу.
+        results (dict): Результаты по именам бенчмарков.
+    """
+    data = {"commit": _git_commit(), "python": platform.python_version(), "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """
+    Сравнивает результаты с базовыми по медиане задержки.
+
+    Аргументы:
+        results (dict): Текущие результаты по именам бенчмарков.
+        baseline (dict): Базовые результаты.
+        threshold (float): Допустимое замедление, доля (0.2 — на 20%).
+
+    Возвращает:
+        list: Кортежи (имя, базовая медиана мс, текущая медиана мс, отношение)
+              для бенчмарков, замедлившихся больше порога.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"]
+        if ratio > 1 + threshold:
+            regressions.append((name, base["p50_ms"], result["p50_ms"], ratio))
+    return regressions
@@ -0,0 +1,497 @@
+"""
+Нагрузочный тест сайта: смесь запросов к адресам из `proj_eng/urls.py` по HTTP.
+
+Генератор нагрузки работает без внешних сервисов: несколько потоков с
+постоянными HTTP-соединениями (http.client) отправляют запросы, выбирая адрес
+случайно по весам смеси. Каждый поток ждет ответа перед следующим запросом
+(замкнутая модель), поэтому параллельность задается количеством потоков.
+Каждый поток хранит свои cookie, как браузер одного пользователя: ответы на
+тест (`test-input:post`) проверяются по вопросам, выбранным для этого потока
+последней страницей теста.
+Генератор случайных чисел инициализируется параметром --seed: одинаковые
+параметры дают одинаковую последовательность запросов.
+
+Сервер:
+- --server runserver|gunicorn|uvicorn: во временном каталоге создается набор
+  данных (см. `benchmarks.datagen`), для сессий выполняется `manage.py migrate`,
+  в каталоге данных запускается сервер, а после теста
+  проверяется целостность файлов данных (см. `check_data`);
+- --url: тест идет против уже запущенного сервера; целостность проверяется,
+  если указан каталог его данных (--data-dir).
+
+Отчет (пропускная способность, p50/p95/p99, доля ошибок по каждому адресу и
+в целом, результат проверки данных) печатается таблицей и записывается в JSON
+(--output). С параметром --baseline результат сравнивается с прежним отчетом
+по медиане задержки: при замедлении больше порога, ошибках ответов или
+нарушенной целостности данных команда завершается с кодом 1.
+
+Пример:
+    python -m benchmarks.load --server runserver --duration 30
+    python -m benchmarks.load --server gunicorn --workers 4 --concurrency 32 --output load.json
+    python -m benchmarks.load --url http://127.0.0.1:8000 --mix terms_list=5,send_term=1
+"""
+
+import argparse
+import http.client
+import http.cookies
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from . import harness
+from .datagen import write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Смесь запросов по умолчанию: имя маршрута -> вес
+DEFAULT_MIX = {
+    "terms_list": 30,
+    "texts_list": 10,
+    "text_detail": 10,
+    "stats": 10,
+    "test-input": 10,
+    "test-input:post": 10,
+    "terms_search": 10,
+    "send_term": 5,
+    "home": 5,
+}
+# Адреса, которые можно добавить в смесь, кроме маршрутов с GET по умолчанию
+POST_ROUTES = ("test-input:post", "send_term", "tests_grade", "reviews_grade")
+# Строк в каждом файле набора данных для --server
+DEFAULT_SIZE = 10_000
+# Допустимое замедление медианы относительно --baseline
+DEFAULT_THRESHOLD = 0.2
+# Время ожидания запуска сервера, секунд
+SERVER_START_TIMEOUT = 120
+
+# Признак успешного добавления термина на странице ответа send_term
+_TERM_ADDED = "Ваше слово добавлено"
+
+
+def _free_port():
+    """Возвращает свободный TCP порт на 127.0.0.1."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server, port, workers):
+    """
+    Возвращает команду запуска сервера и дополнительные переменные окружения.
+
+    Аргументы:
+        server (str): "runserver", "gunicorn" или "uvicorn".
+        port (int): Порт.
+        workers (int): Количество процессов (для gunicorn и uvicorn).
+    """
+    if server == "runserver":
+        return [sys.executable, os.path.join(ROOT, "manage.py"), "runserver", f"127.0.0.1:{port}", "--noreload"], {}
+    if server == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "proj_eng.wsgi:application", "--bind", f"127.0.0.1:{port}",
+                "--workers", str(workers)], {}
+    if server == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "proj_eng.asgi:application", "--host", "127.0.0.1",
+                "--port", str(port), "--workers", str(workers)], {"ASYNC_VIEWS": "1"}
+    raise ValueError(f"Неизвестный сервер: {server}")
+
+
+def start_server(server, directory, workers):
+    """
+    Запускает сервер в каталоге данных и ждет, пока он начнет отвечать.
+
+    Возвращает:
+        tuple: (процесс сервера, базовый адрес).
+
+    Исключения:
+        RuntimeError: Если сервер завершился или не ответил за `SERVER_START_TIMEOUT` секунд.
+    """
+    port = _free_port()
+    command, extra_env = server_command(server, port, workers)
+    env = dict(os.environ, PYTHONPATH=ROOT, **extra_env)
+    # Таблица сессий нужна тесту и повторению слов
+    subprocess.run([sys.executable, os.path.join(ROOT, "manage.py"), "migrate", "--noinput"],
+                   cwd=directory, env=env, stdout=subprocess.DEVNULL, check=True)
+    process = subprocess.Popen(command, cwd=directory, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Сервер {server} завершился: {process.stderr.read().decode(errors='replace')}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            connection.close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Сервер {server} не ответил за {SERVER_START_TIMEOUT} с")
+
+
+def stop_server(process):
+    """Останавливает сервер (SIGTERM, затем SIGKILL)."""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def parse_mix(text):
+    """
+    Разбирает смесь запросов вида "terms_list=5,send_term=1".
+
+    Возвращает:
+        dict: Имя маршрута -> вес.
+
+    Исключения:
+        ValueError: Если вес не является положительным числом.
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        mix[name] = float(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f"Вес маршрута {name} должен быть больше нуля")
+    return mix
+
+
+def route_paths():
+    """
+    Возвращает пути всех именованных маршрутов из `proj_eng/urls.py`.
+
+    Возвращает:
+        dict: Имя маршрута -> путь.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj_eng.settings")
+    os.environ.setdefault("DATA_SNAPSHOT", "0")
+    import django
+
+    django.setup()
+    from django.urls import URLPattern, reverse
+    from proj_eng.urls import urlpatterns
+
+    from .suite import _URL_KWARGS
+
+    return {pattern.name: reverse(pattern.name, kwargs=_URL_KWARGS.get(pattern.name))
+            for pattern in urlpatterns if isinstance(pattern, URLPattern) and pattern.name}
+
+
+class Traffic:
+    """
+    Построитель запросов смеси.
+
+    Каждый запрос — четверка (метод, путь, тело, заголовки). Для send_term термины
+    уникальны (номер потока и запроса), чтобы после теста проверить, что каждый
+    добавленный термин записан в файл ровно один раз.
+
+    Аргументы:
+        mix (dict): Имя маршрута -> вес. Имя с суффиксом ":post" — POST-запрос к маршруту.
+        paths (dict): Имя маршрута -> путь (см. `route_paths`).
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Исключения:
+        ValueError: Если в смеси есть маршрут, которого нет в `proj_eng/urls.py`.
+    """
+
+    def __init__(self, mix, paths, seed):
+        for name in mix:
+            if name.split(":")[0] not in paths:
+                raise ValueError(f"Маршрута {name} нет в proj_eng/urls.py")
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.paths = paths
+        self.seed = seed
+
+    def requests(self, worker):
+        """
+        Бесконечно генерирует запросы потока worker.
+
+        Возвращает:
+            generator: Пары (имя маршрута, (метод, путь, тело, заголовки)).
+        """
+        rnd = random.Random(f"{self.seed}:{worker}")
+        form = {"Content-Type": "application/x-www-form-urlencoded"}
+        json_type = {"Content-Type": "application/json"}
+        number = 0
+        while True:
+            name = rnd.choices(self.names, self.weights)[0]
+            route = name.split(":")[0]
+            path = self.paths[route]
+            number += 1
+            if name == "send_term":
+                body = urllib.parse.urlencode({"name": "load", "new_term": f"loadterm-{self.seed}-{worker}-{number}",
+                                               "new_definition": "термин нагрузочного теста"})
+                yield name, ("POST", path, body.encode("utf-8"), form)
+            elif name == "test-input:post":
+                body = urllib.parse.urlencode({f"user_input_{i}": rnd.choice(("франция", "россия")) for i in range(1, 11)})
+                yield name, ("POST", path, body.encode("utf-8"), form)
+            elif name == "tests_grade":
+                body = json.dumps({"submissions": [{"id": "1", "answers": {str(i): "Франция" for i in range(1, 11)}}]})
+                yield name, ("POST", path, body.encode("utf-8"), json_type)
+            elif name == "reviews_grade":
+                body = json.dumps({"term": "loadterm", "grade": rnd.randint(0, 5)})
+                yield name, ("POST", path, body.encode("utf-8"), json_type)
+            elif name == "terms_search":
+                query = "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(1, 3)))
+                yield name, ("GET", f"{path}?q={query}", None, {})
+            elif name in ("terms_list", "texts_list"):
+                yield name, ("GET", f"{path}?page={rnd.randint(1, 20)}", None, {})
+            else:
+                yield name, ("GET", path, None, {})
+
+
+def _worker(base_url, traffic, worker, deadline, max_requests, samples, added):
+    """
+    Поток генератора нагрузки: отправляет запросы до deadline или max_requests.
+
+    В samples дописываются тройки (имя маршрута, задержка в секундах, код ответа или 0 при
+    ошибке соединения), в added — термины, добавление которых подтвердил сервер.
+    """
+    url = urllib.parse.urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+    cookies = http.cookies.SimpleCookie()
+    sent = 0
+    for name, (method, path, body, headers) in traffic.requests(worker):
+        if time.perf_counter() >= deadline or (max_requests and sent >= max_requests):
+            break
+        sent += 1
+        if cookies:
+            headers = dict(headers, Cookie="; ".join(f"{key}={morsel.value}" for key, morsel in cookies.items()))
+        started = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+            status = response.status
+            for header in response.headers.get_all("Set-Cookie") or ():
+                cookies.load(header)
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+            status = 0
+            content = b""
+        samples.append((name, time.perf_counter() - started, status))
+        if name == "send_term" and status == 200 and _TERM_ADDED in content.decode("utf-8", "replace"):
+            added.append(urllib.parse.parse_qs(body.decode("utf-8"))["new_term"][0])
+    connection.close()
+
+
+def run_load(base_url, traffic, concurrency, duration, max_requests=0):
+    """
+    Отправляет смесь запросов в concurrency потоков.
+
+    Аргументы:
+        base_url (str): Адрес сервера.
+        traffic (Traffic): Смесь запросов.
+        concurrency (int): Количество потоков (одновременных запросов).
+        duration (float): Длительность теста, секунд.
+        max_requests (int): Ограничение количества запросов одного потока (0 — без ограничения).
+
+    Возвращает:
+        tuple: (тройки (маршрут, задержка, код ответа), добавленные термины, длительность теста).
+    """
+    samples = []
+    added = []
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [threading.Thread(target=_worker, args=(base_url, traffic, worker, deadline, max_requests,
+                                                      samples, added), daemon=True)
+               for worker in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, added, time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    """
+    Считает показатели по маршрутам и в целом.
+
+    Ошибка — ответ с кодом 500 и выше или ошибка соединения.
+
+    Возвращает:
+        dict: Имя маршрута (и "total") -> {"requests", "errors", "error_rate", "rps",
+              "p50_ms", "p95_ms", "p99_ms", "mean_ms"}.
+    """
+    groups = {}
+    for name, latency, status in samples:
+        groups.setdefault(name, []).append((latency, status))
+    groups["total"] = [(latency, status) for _, latency, status in samples]
+    results = {}
+    for name, group in sorted(groups.items()):
+        if not group:
+            continue
+        latencies = [latency for latency, _ in group]
+        errors = sum(1 for _, status in group if status == 0 or status >= 500)
+        results[name] = {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": errors / len(group),
+            "rps": len(group) / elapsed,
+            "p50_ms": harness.percentile(latencies, 50) * 1000,
+            "p95_ms": harness.percentile(latencies, 95) * 1000,
+            "p99_ms": harness.percentile(latencies, 99) * 1000,
+            "mean_ms": sum(latencies) / len(latencies) * 1000,
+        }
+    return results
+
+
+def check_data(directory, initial_terms, added):
+    """
+    Проверяет целостность файлов данных после теста.
+
+    Эта функция:
+    - Проверяет, что каждая строка `terms.csv` — целая строка из трех полей
+      (нет наполовину записанных или склеенных строк).
+    - Проверяет, что каждый термин, добавление которого подтвердил сервер, записан
+      ровно один раз, и что терминов стало ровно столько, сколько было плюс добавленные.
+    - Если есть общая таблица терминов `terms.csv.table` для текущей версии CSV файла,
+      проверяет, что она совпадает с таблицей, разобранной из CSV.
+    - Если есть история повторений `reviews.log`, проверяет, что в ней нет оборванной записи.
+
+    Аргументы:
+        directory (str): Каталог, в котором лежит каталог data сервера.
+        initial_terms (int): Количество терминов до теста.
+        added (list): Термины, добавление которых подтвердил сервер.
+
+    Возвращает:
+        list: Описания найденных нарушений (пустой список, если данные целы).
+    """
+    from proj_eng import review_work
+    from proj_eng.records import TermTable
+    from proj_eng.repositories import _open_terms_table, _source_key
+
+    problems = []
+    terms_file = os.path.join(directory, "data", "terms.csv")
+    counts = {}
+    rows = []
+    with open(terms_file, "rb") as f:
+        data = f.read()
+    if data and not data.endswith(b"\n"):
+        problems.append("terms.csv не заканчивается переводом строки")
+    for number, line in enumerate(data.decode("utf-8").splitlines()[1:], 2):
+        if not line.strip():
+            continue
+        fields = line.split(";")
+        if len(fields) != 3:
+            problems.append(f"terms.csv, строка {number}: {len(fields)} полей вместо 3")
+            continue
+        rows.append(fields)
+        counts[fields[0]] = counts.get(fields[0], 0) + 1
+    for term in added:
+        if counts.get(term, 0) != 1:
+            problems.append(f"термин {term} записан {counts.get(term, 0)} раз")
+    if len(rows) != initial_terms + len(added):
+        problems.append(f"терминов {len(rows)}, ожидалось {initial_terms + len(added)}")
+
+    opened = _open_terms_table(terms_file + ".table")
+    if opened is not None and opened[1] == _source_key(os.stat(terms_file)):
+        expected = TermTable((term, definition, source.strip()) for term, definition, source in rows)
+        if opened[2].rows(0, len(opened[2])) != expected.rows(0, len(expected)):
+            problems.append("terms.csv.table не совпадает с terms.csv")
+
+    reviews_file = os.path.join(directory, "data", "reviews.log")
+    if os.path.exists(reviews_file):
+        with open(reviews_file, "rb") as f:
+            data = f.read()
+        if review_work._replay(data, {}) != len(data):
+            problems.append("reviews.log заканчивается оборванной записью")
+    return problems
+
+
+def print_report(report):
+    """Печатает показатели отчета таблицей."""
+    print(f"{'маршрут':<18} {'запросов':>9} {'ошибок':>7} {'запр/с':>9} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9}")
+    for name, result in report["results"].items():
+        print(f"{name:<18} {result['requests']:>9} {result['error_rate']:>7.1%} {result['rps']:>9.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}")
+    consistency = report["consistency"]
+    if consistency is None:
+        print("Целостность данных не проверялась (укажите --data-dir)")
+    elif consistency:
+        print("Нарушения целостности данных:")
+        for problem in consistency:
+            print(f"  {problem}")
+    else:
+        print(f"Данные целы, добавлено терминов: {report['added_terms']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест адресов proj_eng/urls.py")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--server", choices=("runserver", "gunicorn", "uvicorn"),
+                        help="запустить сервер на синтетическом наборе данных")
+    target.add_argument("--url", help="адрес уже запущенного сервера")
+    parser.add_argument("--data-dir", help="каталог сервера с каталогом data (для проверки целостности с --url)")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="строк в каждом файле данных для --server")
+    parser.add_argument("--workers", type=int, default=2, help="процессов gunicorn или uvicorn")
+    parser.add_argument("--concurrency", type=int, default=8, help="одновременных запросов")
+    parser.add_argument("--duration", type=float, default=20.0, help="длительность теста, секунд")
+    parser.add_argument("--requests", type=int, default=0, help="запросов на поток (0 — ограничение только по времени)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="смесь запросов: маршрут=вес,...")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_report.json", help="JSON файл отчета")
+    parser.add_argument("--baseline", help="прежний отчет для сравнения")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    traffic = Traffic(args.mix, route_paths(), args.seed)
+    with tempfile.TemporaryDirectory(prefix="proj-eng-load-") as tmp:
+        directory = args.data_dir
+        process = None
+        if args.server:
+            directory = tmp
+            write_dataset(directory, args.size)
+            process, base_url = start_server(args.server, directory, args.workers)
+        else:
+            base_url = args.url
+        initial_terms = None
+        if directory:
+            with open(os.path.join(directory, "data", "terms.csv"), "rb") as f:
+                initial_terms = sum(1 for line in f if line.strip()) - 1
+        try:
+            samples, added, elapsed = run_load(base_url, traffic, args.concurrency, args.duration, args.requests)
+        finally:
+            if process is not None:
+                stop_server(process)
+        consistency = check_data(directory, initial_terms, added) if directory else None
+
+    report = {
+        "commit": harness._git_commit(),
+        "python": platform.python_version(),
+        "config": {"server": args.server, "url": args.url, "size": args.size, "workers": args.workers,
+                   "concurrency": args.concurrency, "duration": args.duration, "mix": args.mix, "seed": args.seed},
+        "elapsed": elapsed,
+        "added_terms": len(added),
+        "consistency": consistency,
+        "results": summarize(samples, elapsed),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print_report(report)
+    print(f"Отчет записан: {args.output}")
+
+    failed = bool(consistency) or report["results"].get("total", {}).get("errors", 0) > 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = harness.compare(report["results"], baseline, args.threshold)
+        for name, base, current, ratio in regressions:
+            print(f"Замедление {name}: {base:.1f} мс -> {current:.1f} мс ({ratio:.2f}x)")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Бенчмарк памяти: сколько байт занимает один термин в хранилище терминов.
+
+Сравниваются два представления словаря:
+- "lists": прежнее хранилище — список кортежей (термин, определение, источник),
+  отсортированная таблица списков [номер, термин, определение] и список ключей
+  в нижнем регистре для бинарного поиска;
+- "TermTable": колоночная таблица из модуля `proj_eng.records`.
+
+Память измеряется модулем tracemalloc как объем, удерживаемый построенной
+структурой. Данные синтетические: строки генерируются на лету.
+
+Пример:
+    python -m benchmarks.records_memory
+    python -m benchmarks.records_memory 10000 100000
+"""
+
+import sys
+import tracemalloc
+
+from proj_eng.records import TermTable
+
+from .datagen import synthetic_terms
+
+# Размеры словаря по умолчанию
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def build_lists(rows):
+    """Строит прежнее представление хранилища терминов (списки)."""
+    rows = list(rows)
+    ordered = sorted(rows, key=lambda row: row[0].lower())
+    table = [[cnt, term, definition] for cnt, (term, definition, _) in enumerate(ordered, 1)]
+    keys = [row[1].lower() for row in table]
+    return rows, table, keys
+
+
+def measure(builder, count):
+    """
+    Измеряет память, удерживаемую структурой после построения.
+
+    Возвращает:
+        float: Байт на один термин.
+    """
+    tracemalloc.start()
+    structure = builder(synthetic_terms(count))
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return retained / count
+
+
+def main(sizes):
+    print(f"{'терминов':>10} {'lists, Б/термин':>16} {'TermTable, Б/термин':>20} {'выигрыш':>8}")
+    for count in sizes:
+        lists = measure(build_lists, count)
+        columnar = measure(TermTable, count)
+        print(f"{count:>10} {lists:>16.1f} {columnar:>20.1f} {lists / columnar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,78 @@
+"""
+Бенчмарк рендеринга строк таблицы словаря: строк в секунду.
+
+Сравниваются три способа получить HTML строк <tr> для страницы словаря:
+- "цикл": прежний цикл {% for %} шаблона `term_list.html` по всем строкам;
+- "фрагменты, холодный": `row_cache.render_rows` с пустым кэшем (каждая строка рендерится);
+- "фрагменты, теплый": `row_cache.render_rows`, все фрагменты уже в кэше.
+
+Строки синтетические (см. `benchmarks.datagen`), номер строки — позиция в списке.
+
+Пример:
+    python -m benchmarks.row_render
+    python -m benchmarks.row_render 50 1000
+"""
+
+import os
+import sys
+import time
+
+import django
+
+from .datagen import synthetic_terms
+
+# Количество строк по умолчанию (50 — одна страница словаря)
+DEFAULT_SIZES = (50, 1_000, 10_000)
+# Минимальное время измерения одного способа, секунд
+MIN_SECONDS = 1.0
+
+# Цикл из term_list.html до перехода на готовые фрагменты
+LOOP_TEMPLATE = """{% for row in terms %}
+<tr>
+    <td class="py-3">{{ row.cnt }}</td>
+    <td class="py-3">{{ row.term }}</td>
+    <td class="py-3">{{ row.definition }}</td>
+</tr>
+{% endfor %}"""
+
+
+def rows_per_second(func, count, setup=None):
+    """
+    Выполняет func повторно не меньше `MIN_SECONDS` секунд.
+
+    Возвращает:
+        float: Строк в секунду.
+    """
+    calls = 0
+    elapsed = 0.0
+    while elapsed < MIN_SECONDS:
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        elapsed += time.perf_counter() - started
+        calls += 1
+    return calls * count / elapsed
+
+
+def main(sizes):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj_eng.settings")
+    django.setup()
+    from django.template import engines
+    from proj_eng import row_cache
+    from proj_eng.records import TermRow
+
+    loop = engines.all()[0].from_string(LOOP_TEMPLATE)
+    print(f"{'строк':>8} {'цикл, строк/с':>15} {'холодный, строк/с':>19} {'теплый, строк/с':>17} {'выигрыш':>8}")
+    for count in sizes:
+        rows = [TermRow(cnt, term, definition)
+                for cnt, (term, definition, _) in enumerate(synthetic_terms(count), 1)]
+        baseline = rows_per_second(lambda: loop.render({"terms": rows}), count)
+        cold = rows_per_second(lambda: row_cache.render_rows("terms", rows), count, setup=row_cache.clear)
+        row_cache.render_rows("terms", rows)
+        warm = rows_per_second(lambda: row_cache.render_rows("terms", rows), count)
+        print(f"{count:>8} {baseline:>15.0f} {cold:>19.0f} {warm:>17.0f} {warm / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
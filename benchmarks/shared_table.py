@@ -0,0 +1,115 @@
+"""
+Бенчмарк общей таблицы терминов: память воркеров и стоимость нового поколения.
+
+Для набора данных с заданным количеством терминов запускается несколько
+процессов-воркеров. Каждый загружает хранилище терминов и читает все строки
+словаря (как при обходе всех страниц), после чего сообщает свою собственную
+память (Private_Clean + Private_Dirty из /proc/self/smaps_rollup) — память,
+которую добавляет к серверу каждый следующий воркер. Сравниваются режимы:
+- "TermTable": каждый процесс разбирает CSV в свою таблицу (DATA_SHARED_TABLE=0);
+- "общая таблица": процессы отображают файл `terms.csv.table` (DATA_SHARED_TABLE=1).
+
+Для общей таблицы также измеряется время `add_term` (запись строки; таблица не
+переписывается) и время, за которое другой процесс видит новый термин поверх таблицы.
+
+Работает только в Linux (нужен /proc/self/smaps_rollup).
+
+Пример:
+    python -m benchmarks.shared_table
+    python -m benchmarks.shared_table 100000
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from .datagen import write_dataset
+
+# Количество терминов по умолчанию
+DEFAULT_SIZES = (1_000_000,)
+# Количество воркеров в каждом режиме
+WORKERS = 4
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Код воркера: загрузка таблицы, чтение всех строк, собственная память процесса
+_WORKER = """
+import json, os, sys, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj_eng.settings")
+import django
+django.setup()
+from proj_eng.repositories import get_repository
+
+
+def private_kb():
+    with open("/proc/self/smaps_rollup") as f:
+        return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean", "Private_Dirty")))
+
+
+repository = get_repository()
+baseline = private_kb()
+started = time.perf_counter()
+count = repository.count_terms()
+for offset in range(0, count, 1000):
+    repository.get_terms_page(offset, 1000)
+loaded = time.perf_counter() - started
+result = {"private_kb": private_kb() - baseline, "loaded": loaded}
+if sys.argv[1] == "write":
+    started = time.perf_counter()
+    repository.add_term("zzzbenchmark", "новое слово")
+    result["add_term"] = time.perf_counter() - started
+print(json.dumps(result))
+sys.stdout.flush()
+if sys.argv[1] == "wait":
+    # Ждем, пока другой процесс добавит термин, и дочитываем его поверх таблицы
+    sys.stdin.readline()
+    started = time.perf_counter()
+    assert repository.search_terms("zzzbenchmark", 1)
+    print(json.dumps({"remap": time.perf_counter() - started}))
+"""
+
+
+def start_worker(directory, shared, role="read"):
+    env = dict(os.environ, PYTHONPATH=ROOT, DATA_SNAPSHOT="0", DATA_SHARED_TABLE="1" if shared else "0")
+    return subprocess.Popen([sys.executable, "-c", _WORKER, role], cwd=directory, env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+
+def read_result(process):
+    return json.loads(process.stdout.readline())
+
+
+def main(sizes):
+    print(f"{'терминов':>10} {'режим':<14} {'память воркера, МБ':>19} {'загрузка, с':>12}")
+    for count in sizes:
+        with tempfile.TemporaryDirectory(prefix="proj-eng-shared-") as directory:
+            write_dataset(directory, count, texts=10, tests=10)
+            for mode, shared in (("TermTable", False), ("общая таблица", True)):
+                if shared:
+                    # Первое поколение таблицы строит отдельный процесс, как после развертывания
+                    read_result(start_worker(directory, shared))
+                processes = [start_worker(directory, shared) for _ in range(WORKERS)]
+                results = [read_result(process) for process in processes]
+                for process in processes:
+                    process.communicate("")
+                memory = max(result["private_kb"] for result in results) / 1024
+                loaded = max(result["loaded"] for result in results)
+                print(f"{count:>10} {mode:<14} {memory:>19.1f} {loaded:>12.2f}")
+
+            reader = start_worker(directory, True, "wait")
+            read_result(reader)
+            writer = start_worker(directory, True, "write")
+            add_term = read_result(writer)["add_term"]
+            writer.communicate("")
+            reader.stdin.write("\n")
+            reader.stdin.flush()
+            remap = read_result(reader)["remap"]
+            reader.communicate("")
+            print(f"{count:>10} add_term: {add_term * 1000:.0f} мс, "
+                  f"новый термин в другом процессе: {remap * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
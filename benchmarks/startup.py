@@ -0,0 +1,97 @@
+"""
+Бенчмарк старта процесса: время от запуска интерпретатора до первого ответа страницы словаря.
+
+Для набора данных с заданным количеством терминов (1 000 текстов и вопросов)
+в отдельном процессе Python импортируется `proj_eng.wsgi` (django.setup() и
+загрузка снимка, как в процессе сервера) и выполняется первый запрос
+`/terms-list/` через тестовый клиент Django. Сравниваются режимы:
+- "CSV": снимок отключен (DATA_SNAPSHOT=0), первый запрос разбирает CSV;
+- "CSV + запись снимка": снимка еще нет, процесс при старте читает CSV и записывает снимок;
+- "снимок": данные загружаются из снимка, записанного командой warm_cache.
+
+Общая таблица терминов отключена (DATA_SHARED_TABLE=0), чтобы словарь входил в снимок;
+режим с общей таблицей сравнивает `benchmarks.shared_table`.
+
+Пример:
+    python -m benchmarks.startup
+    python -m benchmarks.startup 100000
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .datagen import write_dataset
+
+# Количество терминов по умолчанию
+DEFAULT_SIZES = (1_000_000,)
+# Количество текстов и вопросов теста
+OTHER_ROWS = 1_000
+# Сколько раз запускается процесс в каждом режиме (берется минимум)
+RUNS = 3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Код процесса: время django.setup() и время до первого байта ответа от старта интерпретатора
+_WORKER = """
+import time
+started = time.perf_counter()
+import json, os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj_eng.settings")
+import proj_eng.wsgi
+ready = time.perf_counter()
+from django.test import Client
+response = Client().get("/terms-list/")
+assert response.status_code == 200 and response.content[:1]
+print(json.dumps({"setup": ready - started, "first_byte": time.perf_counter() - started}))
+"""
+
+
+def run_worker(directory, snapshot):
+    """
+    Запускает процесс с первым запросом.
+
+    Возвращает:
+        tuple: (время django.setup(), время до первого байта, время процесса целиком), секунд.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, DATA_SNAPSHOT="1" if snapshot else "0", DATA_SHARED_TABLE="0")
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", _WORKER], cwd=directory, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - started
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["setup"], result["first_byte"], wall
+
+
+def remove_snapshot(directory):
+    path = os.path.join(directory, "data", "snapshot.bin")
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def main(sizes):
+    print(f"{'терминов':>10} {'режим':<22} {'setup, с':>9} {'первый байт, с':>15} {'процесс, с':>11}")
+    for count in sizes:
+        with tempfile.TemporaryDirectory(prefix="proj-eng-startup-") as directory:
+            write_dataset(directory, count, texts=OTHER_ROWS, tests=OTHER_ROWS)
+            modes = {
+                "CSV": (False, lambda: remove_snapshot(directory)),
+                "CSV + запись снимка": (True, lambda: remove_snapshot(directory)),
+                "снимок": (True, lambda: subprocess.run(
+                    [sys.executable, os.path.join(ROOT, "manage.py"), "warm_cache"], cwd=directory,
+                    env=dict(os.environ, PYTHONPATH=ROOT, DATA_SHARED_TABLE="0"), capture_output=True, check=True)),
+            }
+            for mode, (snapshot, prepare) in modes.items():
+                runs = []
+                for _ in range(RUNS):
+                    prepare()
+                    runs.append(run_worker(directory, snapshot))
+                setup, first_byte, wall = (min(values) for values in zip(*runs))
+                print(f"{count:>10} {mode:<22} {setup:>9.2f} {first_byte:>15.2f} {wall:>11.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,223 @@
+"""
+Бенчмарк функций модулей данных и страниц сайта на синтетических данных.
+
+Для каждого размера набора данных:
+- во временном каталоге создаются `data/terms.csv`, `data/texts.csv` и
+  `data/tests.csv` (см. `benchmarks.datagen`), каталог становится рабочим;
+- измеряются функции `get_terms_for_table`, `write_term`, `get_terms_stats`,
+  `get_texts_for_table` и `get_tests`;
+- измеряется каждый адрес из `proj_eng/urls.py` через тестовый клиент Django.
+  Перед каждым запросом кэш страниц очищается, поэтому измеряется рендеринг,
+  а не выдача готовой страницы из кэша.
+
+Результаты печатаются таблицей и сравниваются с базовым JSON файлом: если
+медиана задержки какого-либо бенчмарка выросла больше порога, команда
+завершается с кодом 1.
+
+Пример:
+    python -m benchmarks.suite --sizes 1000 100000 --save   # сохранить базовый результат
+    python -m benchmarks.suite --sizes 1000 100000          # сравнить с ним
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+import django
+
+from . import harness
+from .datagen import write_dataset
+
+# Размеры наборов данных по умолчанию (строк в каждом файле)
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+# Файл базового результата
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Допустимое замедление медианы относительно базового результата
+DEFAULT_THRESHOLD = 0.2
+
+
+def _setup_django():
+    """Настраивает Django для работы вне manage.py."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj_eng.settings")
+    django.setup()
+    from django.conf import settings
+
+    # Сессии (ученик на странице повторения) хранятся в cookie: бенчмарку не нужна база после migrate
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
+
+def _reset_process_state():
+    """
+    Сбрасывает состояние процесса, привязанное к прежнему набору данных:
+    репозиторий, агрегат статистики и кэш страниц.
+    """
+    from django.core.cache import cache
+    from proj_eng import repositories, review_work, terms_work
+
+    repositories._repository = None
+    terms_work._aggregate = None
+    review_work._schedule = {"inode": None, "offset": 0, "decks": {}}
+    cache.clear()
+
+
+def function_benchmarks():
+    """
+    Возвращает бенчмарки функций модулей данных.
+
+    Возвращает:
+        dict: Имя бенчмарка -> функция без аргументов.
+    """
+    from proj_eng import terms_work, tests_work, texts_work
+
+    counter = itertools.count()
+    return {
+        "get_terms_for_table": terms_work.get_terms_for_table,
+        "write_term": lambda: terms_work.write_term(f"benchterm{next(counter)}", "термин для бенчмарка"),
+        "get_terms_stats": terms_work.get_terms_stats,
+        "get_texts_for_table": texts_work.get_texts_for_table,
+        "get_tests": tests_work.get_tests,
+    }
+
+
+# Аргументы адресов с параметрами в пути
+_URL_KWARGS = {
+    "text_detail": {"number": 1},
+    "static": {"path": "bootstrap.min.css"},
+}
+
+
+def _request_specs():
+    """
+    Возвращает параметры запросов к страницам, которым нужен не простой GET.
+
+    Возвращает:
+        dict: Имя маршрута -> функция (client, path) -> HttpResponse.
+    """
+    from proj_eng import terms_work
+
+    counter = itertools.count()
+    grade_body = json.dumps({"submissions": [
+        {"id": str(i), "answers": {str(cnt): "Франция" for cnt in range(1, 11)}} for i in range(10)
+    ]})
+    return {
+        "send_term": lambda client, path: client.post(path, {
+            "name": "bench", "new_term": f"benchpage{next(counter)}", "new_definition": "страница для бенчмарка",
+        }),
+        "terms_search": lambda client, path: client.get(path, {"q": "abc"}),
+        "reviews_grade": lambda client, path: client.post(path, json.dumps({
+            "term": terms_work.get_terms_page(1, 1)[0].term, "grade": 4,
+        }), content_type="application/json"),
+        "tests_grade": lambda client, path: client.post(path, grade_body, content_type="application/json"),
+    }
+
+
+def url_benchmarks():
+    """
+    Возвращает бенчмарки всех именованных адресов из `proj_eng/urls.py`.
+
+    Возвращает:
+        dict: Имя бенчмарка ("url:<путь>") -> функция без аргументов.
+    """
+    from django.test import Client
+    from django.urls import URLPattern, reverse
+    from proj_eng.urls import urlpatterns
+
+    client = Client()
+    specs = _request_specs()
+    benchmarks = {}
+    for pattern in urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        path = reverse(pattern.name, kwargs=_URL_KWARGS.get(pattern.name))
+        request = specs.get(pattern.name, lambda client, path: client.get(path))
+
+        def bench(request=request, path=path):
+            response = request(client, path)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{path}: ответ {response.status_code}")
+
+        benchmarks[f"url:{path}"] = bench
+    return benchmarks
+
+
+def run_size(size, repeat, max_seconds):
+    """
+    Выполняет все бенчмарки на наборе данных заданного размера.
+
+    Аргументы:
+        size (int): Количество строк в каждом файле данных.
+        repeat (int): Максимальное количество измерений одного бенчмарка.
+        max_seconds (float): Ограничение времени измерений одного бенчмарка, секунд.
+
+    Возвращает:
+        dict: Имя бенчмарка ("<размер>:<имя>") -> результат `harness.run`.
+    """
+    from django.core.cache import cache
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="proj-eng-bench-") as directory:
+        write_dataset(directory, size)
+        os.chdir(directory)
+        try:
+            _reset_process_state()
+            for name, func in function_benchmarks().items():
+                results[f"{size}:{name}"] = harness.run(func, repeat, max_seconds)
+            for name, func in url_benchmarks().items():
+                results[f"{size}:{name}"] = harness.run(func, repeat, max_seconds, setup=cache.clear)
+        finally:
+            os.chdir(cwd)
+            _reset_process_state()
+    return results
+
+
+def print_results(results):
+    """Печатает результаты таблицей."""
+    print(f"{'бенчмарк':<36} {'p50, мс':>10} {'p90, мс':>10} {'p99, мс':>10} {'оп/с':>10} "
+          f"{'пик, КБ':>10} {'остаток, КБ':>12}")
+    for name, result in results.items():
+        print(f"{name:<36} {result['p50_ms']:>10.3f} {result['p90_ms']:>10.3f} {result['p99_ms']:>10.3f} "
+              f"{result['ops_per_sec']:>10.1f} {result['alloc_peak_bytes'] / 1024:>10.1f} "
+              f"{result['alloc_retained_bytes'] / 1024:>12.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк функций данных и страниц на синтетических данных.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Количество строк в файлах данных.")
+    parser.add_argument("--repeat", type=int, default=20, help="Максимальное количество измерений.")
+    parser.add_argument("--max-seconds", type=float, default=5.0,
+                        help="Ограничение времени измерений одного бенчмарка, секунд.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON файл базового результата.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Допустимое замедление медианы, доля (0.2 — 20%%).")
+    parser.add_argument("--save", action="store_true", help="Сохранить результаты как базовые.")
+    args = parser.parse_args(argv)
+
+    _setup_django()
+    results = {}
+    for size in args.sizes:
+        results.update(run_size(size, args.repeat, args.max_seconds))
+    print_results(results)
+
+    if args.save:
+        harness.save_baseline(args.baseline, results)
+        print(f"Базовый результат сохранен в {args.baseline}")
+        return 0
+    baseline = harness.load_baseline(args.baseline)
+    if baseline is None:
+        print(f"Базовый результат {args.baseline} не найден, сравнение пропущено (используйте --save)")
+        return 0
+    regressions = harness.compare(results, baseline, args.threshold)
+    for name, base, current, ratio in regressions:
+        print(f"Регрессия {name}: {base:.3f} мс -> {current:.3f} мс ({ratio:.2f}x)")
+    if not regressions:
+        print(f"Регрессий больше {args.threshold:.0%} нет")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
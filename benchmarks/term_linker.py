@@ -0,0 +1,71 @@
+"""
+Бенчмарк подсветки слов словаря в текстах: скорость разметки в зависимости от размера словаря.
+
+Автомат Ахо — Корасик (`proj_eng.term_linker.TermAutomaton`) строится по
+синтетическому словарю заданного размера, затем им размечаются синтетические
+тексты (см. `benchmarks.datagen`). Время разметки должно расти с объемом
+текстов и почти не зависеть от количества терминов. Для сравнения на малом
+словаре измеряется поиск каждого термина по очереди регулярным выражением
+(тексты × термины).
+
+Пример:
+    python -m benchmarks.term_linker
+    python -m benchmarks.term_linker 1000 100000
+"""
+
+import re
+import sys
+import time
+
+from proj_eng.term_linker import TermAutomaton
+
+from .datagen import synthetic_terms, synthetic_texts
+
+# Размеры словаря по умолчанию
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+# Количество текстов
+TEXTS = 2_000
+# Словарь, на котором измеряется поиск терминов по очереди
+NAIVE_TERMS = 1_000
+
+
+def build(count):
+    """Строит автомат по синтетическому словарю и английским словам текстов (чтобы были совпадения)."""
+    automaton = TermAutomaton()
+    for term, definition, _ in synthetic_terms(count):
+        automaton.add(term, definition)
+    for word in ("country", "history", "capital city", "famous river", "ancient culture"):
+        automaton.add(word, "")
+    automaton.find("")  # суффиксные ссылки
+    return automaton
+
+
+def naive(terms, texts):
+    """Ищет каждый термин во всех текстах по очереди."""
+    patterns = [re.compile(rf"(?<!\w){re.escape(term)}(?!\w)", re.IGNORECASE) for term in terms]
+    return sum(len(pattern.findall(text)) for pattern in patterns for text in texts)
+
+
+def main(sizes):
+    texts = [text for text, _, _ in synthetic_texts(TEXTS)]
+    megabytes = sum(len(text) for text in texts) / 1e6
+    print(f"{'терминов':>10} {'построение, с':>14} {'разметка, с':>12} {'МБ текста/с':>12} {'совпадений':>11}")
+    for count in sizes:
+        started = time.perf_counter()
+        automaton = build(count)
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        matches = sum(len(automaton.find(text)) for text in texts)
+        elapsed = time.perf_counter() - started
+        print(f"{count:>10} {built:>14.2f} {elapsed:>12.2f} {megabytes / elapsed:>12.2f} {matches:>11}")
+
+    terms = [term for term, _, _ in synthetic_terms(NAIVE_TERMS)]
+    started = time.perf_counter()
+    naive(terms, texts)
+    elapsed = time.perf_counter() - started
+    print(f"поиск {NAIVE_TERMS} терминов по очереди: {elapsed:.2f} с "
+          f"(≈{elapsed * max(sizes) / NAIVE_TERMS:.0f} с для {max(sizes)} терминов)")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,23 @@
+"""
+Конфигурация приложения proj_eng.
+
+Данные при старте здесь не загружаются: `ready()` выполняется при каждой
+загрузке приложений, в том числе в командах manage.py (migrate, check,
+collectstatic) и в наблюдающем процессе автоперезагрузки runserver. Снимок
+разобранных данных загружают только процессы сервера — модули `wsgi` и `asgi`
+(см. `snapshot.preload`), а записывает заранее команда `warm_cache`.
+
+`ready()` только регистрирует системные проверки (см. модуль `checks`).
+"""
+
+from django.apps import AppConfig
+from django.core import checks
+
+
+class ProjEngConfig(AppConfig):
+    name = "proj_eng"
+
+    def ready(self):
+        from .checks import check_session_table
+
+        checks.register(check_session_table)
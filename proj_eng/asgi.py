@@ -16,3 +16,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'proj_eng.settings')
 
 # Получаем и устанавливаем объект ASGI-приложения
 application = get_asgi_application()
+
+# Разобранные данные загружаются только в процессе сервера, а не в AppConfig.ready()
+from proj_eng.snapshot import preload  # noqa: E402
+
+preload()
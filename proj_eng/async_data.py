@@ -0,0 +1,159 @@
+"""
+Модуль асинхронного доступа к данным для ASGI-представлений.
+
+Функции модулей `terms_work`, `texts_work` и `tests_work` синхронные: они
+обращаются к файлам и базе SQLite. Здесь они оборачиваются в корутины:
+- чтение выполняется в ограниченном пуле потоков (размер задается настройкой
+  `DATA_THREADS`), поэтому цикл событий не блокируется и тысячи одновременных
+  соединений обслуживаются несколькими потоками. Пул создается при первом
+  обращении, поэтому процесс с синхронными представлениями потоков не заводит;
+- запись терминов выполняется по одной под threading.Lock внутри задачи пула:
+  блокировка не привязана к циклу событий и работает с любым из них.
+
+Функции:
+- run_read(func, *args): Выполняет синхронную функцию чтения в пуле потоков.
+- get_terms_page, get_terms_after, count_terms, get_terms_stats: Данные словаря.
+- get_texts_page, count_texts, get_text: Данные текстов.
+- link_texts, annotate: Подсветка слов словаря в текстах.
+- get_test_bank, grade_submission, start_session, grade_session: Данные тестов.
+- record_results, get_results_stats: Журнал результатов теста и его статистика.
+- write_term: Добавляет термин.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import terms_work
+from . import texts_work
+from . import tests_work
+from . import results_work
+from . import term_linker
+
+# Пул потоков доступа к данным создается при первом обращении (см. `_get_executor`)
+_executor = None
+_executor_lock = threading.Lock()
+# Блокировка записи терминов между задачами пула
+_write_lock = threading.Lock()
+
+
+def _get_executor():
+    """Возвращает пул потоков доступа к данным, создавая его при первом обращении."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.DATA_THREADS, thread_name_prefix="data")
+    return _executor
+
+
+async def run_read(func, *args):
+    """
+    Выполняет синхронную функцию в пуле потоков доступа к данным.
+
+    Аргументы:
+        func (callable): Синхронная функция.
+        *args: Аргументы функции.
+
+    Возвращает:
+        Результат функции.
+
+    Пример:
+        terms = await run_read(terms_work.get_terms_page, 1, 50)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args))
+
+
+async def get_terms_page(page, per_page):
+    """Асинхронная версия `terms_work.get_terms_page`."""
+    return await run_read(terms_work.get_terms_page, page, per_page)
+
+
+async def get_terms_after(term, limit, position=None):
+    """Асинхронная версия `terms_work.get_terms_after`."""
+    return await run_read(terms_work.get_terms_after, term, limit, position)
+
+
+async def count_terms():
+    """Асинхронная версия `terms_work.count_terms`."""
+    return await run_read(terms_work.count_terms)
+
+
+async def get_terms_stats():
+    """Асинхронная версия `terms_work.get_terms_stats`."""
+    return await run_read(terms_work.get_terms_stats)
+
+
+async def get_texts_page(page, per_page):
+    """Асинхронная версия `texts_work.get_texts_page`."""
+    return await run_read(texts_work.get_texts_page, page, per_page)
+
+
+async def count_texts():
+    """Асинхронная версия `texts_work.count_texts`."""
+    return await run_read(texts_work.count_texts)
+
+
+async def get_text(number):
+    """Асинхронная версия `texts_work.get_text`."""
+    return await run_read(texts_work.get_text, number)
+
+
+async def link_texts(texts):
+    """Асинхронная версия `term_linker.link_texts`."""
+    return await run_read(term_linker.link_texts, texts)
+
+
+async def annotate(text):
+    """Асинхронная версия `term_linker.annotate`."""
+    return await run_read(term_linker.annotate, text)
+
+
+async def get_test_bank():
+    """Асинхронная версия `tests_work.get_test_bank`."""
+    return await run_read(tests_work.get_test_bank)
+
+
+async def grade_submission(answers, bank=None):
+    """Асинхронная версия `tests_work.grade_submission`."""
+    return await run_read(tests_work.grade_submission, answers, bank)
+
+
+async def start_session(size=tests_work.SESSION_QUESTIONS, seed=None):
+    """Асинхронная версия `tests_work.start_session`."""
+    return await run_read(tests_work.start_session, size, seed)
+
+
+async def grade_session(session, answers):
+    """Асинхронная версия `tests_work.grade_session`."""
+    return await run_read(tests_work.grade_session, session, answers)
+
+
+async def record_results(submissions):
+    """Асинхронная версия `results_work.record_results`."""
+    return await run_read(results_work.record_results, submissions)
+
+
+async def get_results_stats():
+    """Асинхронная версия `results_work.get_results_stats`."""
+    return await run_read(results_work.get_results_stats)
+
+
+async def write_term(new_term, new_definition):
+    """
+    Асинхронная версия `terms_work.write_term`.
+
+    Записи выполняются по одной: следующая начинается только после того, как
+    предыдущая дописана в хранилище.
+    """
+    await run_read(_write_term, new_term, new_definition)
+
+
+def _write_term(new_term, new_definition):
+    """Записывает термин под блокировкой записи (выполняется в пуле потоков)."""
+    with _write_lock:
+        terms_work.write_term(new_term, new_definition)
@@ -0,0 +1,208 @@
+"""
+Модуль асинхронных представлений для запуска под ASGI-сервером (uvicorn, daphne).
+
+Представления повторяют одноименные функции модуля `views`, но не блокируют
+цикл событий: обращения к данным выполняются через модуль `async_data`
+(чтение — в ограниченном пуле потоков, запись терминов — по одной под
+блокировкой записи). В том же пуле готовятся строки таблиц (`row_cache`),
+подсветка текста и рендеринг шаблонов (`_render`). Благодаря этому один
+ASGI-процесс обслуживает тысячи одновременных соединений, а потоки заняты
+только на время чтения данных и рендеринга.
+
+Подключаются вместо синхронных версий настройкой `ASYNC_VIEWS` (см. `urls.py`).
+
+Функции:
+    - terms_list: Отображает список терминов.
+    - texts_list: Отображает список текстов.
+    - text_detail: Отображает один текст с переводом.
+    - test_input: Обрабатывает тестовый запрос и отображает результаты.
+    - send_term: Обрабатывает добавление нового термина.
+    - show_stats: Отображает статистику по терминам и результатам теста.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import redirect, render
+from . import async_data
+from . import row_cache
+from . import term_linker
+from .page_cache import acached_page, invalidate
+from .views import (TERMS_PER_PAGE, TEXTS_PER_PAGE, TEST_SESSION_KEY, _get_page_number, _get_position, _get_seed,
+                    _paginate, _terms_page_key, _texts_page_key, add_term)
+
+
+async def _render(request, template_name, context=None):
+    """Рендерит шаблон в пуле потоков `async_data`, не блокируя цикл событий (аргументы как у render)."""
+    return await async_data.run_read(render, request, template_name, context)
+
+
+@acached_page("terms", key=_terms_page_key)
+async def terms_list(request):
+    """
+    Асинхронная версия `views.terms_list`: страница с таблицей терминов.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "term_list.html".
+
+    Пример:
+        await terms_list(request)
+    """
+    after = request.GET.get("after")
+    if after is not None:
+        # Берем на одну строку больше, чтобы узнать, есть ли следующая страница
+        terms = await async_data.get_terms_after(after, TERMS_PER_PAGE + 1, _get_position(request))
+        has_next = len(terms) > TERMS_PER_PAGE
+        terms = terms[:TERMS_PER_PAGE]
+        context = {"terms": terms, "next_after": terms[-1].term if has_next else "",
+                   "next_position": terms[-1].cnt if has_next else None}
+    else:
+        context = _paginate(_get_page_number(request), TERMS_PER_PAGE, await async_data.count_terms())
+        context["terms"] = await async_data.get_terms_page(context["page"], TERMS_PER_PAGE)
+    context["term_rows"] = await async_data.run_read(row_cache.render_rows, "terms", context["terms"])
+    return await _render(request, "term_list.html", context)
+
+
+@acached_page("texts", "terms", key=_texts_page_key)
+async def texts_list(request):
+    """
+    Асинхронная версия `views.texts_list`: страница с таблицей текстов.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "text_list.html".
+
+    Пример:
+        await texts_list(request)
+    """
+    context = _paginate(_get_page_number(request), TEXTS_PER_PAGE, await async_data.count_texts())
+    context["texts"] = await async_data.get_texts_page(context["page"], TEXTS_PER_PAGE)
+    linked = await async_data.link_texts(context["texts"])
+    context["text_rows"] = await async_data.run_read(row_cache.render_rows, "texts", linked)
+    return await _render(request, "text_list.html", context)
+
+
+@acached_page("texts", "terms")
+async def text_detail(request, number):
+    """
+    Асинхронная версия `views.text_detail`: страница одного текста.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+        number (int): Номер текста (начиная с 1).
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "text_detail.html".
+
+    Исключения:
+        Http404: Если текста с таким номером нет.
+
+    Пример:
+        await text_detail(request, 3)
+    """
+    text = await async_data.get_text(number)
+    if text is None:
+        raise Http404("Текст не найден")
+    links = await async_data.annotate(text.text)
+    context = {"text": text, "list_page": (number - 1) // TEXTS_PER_PAGE + 1, "links": links,
+               "text_html": await async_data.run_read(term_linker.highlight, text.text, links),
+               "linked_terms": term_linker.linked_terms(links)}
+    return await _render(request, "text_detail.html", context)
+
+
+async def test_input(request):
+    """
+    Асинхронная версия `views.test_input`: вопросы сессии теста и проверка ответов.
+
+    Сессия пользователя читается и меняется через sync_to_async: хранилище сессий
+    обращается к базе данных синхронно.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "test_input_form.html".
+
+    Пример:
+        await test_input(request)
+    """
+    if request.method == "POST":
+        session = await sync_to_async(request.session.pop)(TEST_SESSION_KEY, None)
+        if session is None:
+            return redirect("test-input")
+        answers = {cnt: request.POST.get(f"user_input_{cnt}", "") for cnt in session["numbers"]}
+        result = await async_data.grade_session(session, answers)
+        await async_data.record_results([result["submitted_data"]])
+
+        return await _render(request, "test_input_form.html", {
+            "submitted_data": result["submitted_data"],
+            "score": result["score"]
+        })
+
+    session, questions = await async_data.start_session(seed=_get_seed(request))
+    await sync_to_async(request.session.__setitem__)(TEST_SESSION_KEY, session)
+    return await _render(request, "test_input_form.html", {
+        "tests": questions
+    })
+
+
+async def send_term(request):
+    """
+    Асинхронная версия `views.send_term`: добавление нового термина.
+
+    Термин записывается через `async_data.write_term`, поэтому одновременные
+    запросы на добавление выполняются по очереди, не занимая потоки пула.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "term_request.html" или форма добавления термина.
+
+    Пример:
+        await send_term(request)
+    """
+    if request.method == "POST":
+        user_name = request.POST.get("name")
+        new_term = request.POST.get("new_term", "")
+        new_definition = request.POST.get("new_definition", "").replace(";", ",")
+        context = {"user": user_name}
+        if len(new_definition) == 0:
+            context["success"] = False
+            context["comment"] = "Описание должно быть не пустым"
+        elif len(new_term) == 0:
+            context["success"] = False
+            context["comment"] = "Термин должен быть не пустым"
+        else:
+            context["success"] = True
+            context["comment"] = "Ваше слово добавлено"
+            await async_data.write_term(new_term, new_definition)
+            # Сбрасываем только страницы, зависящие от словаря
+            invalidate("terms")
+        if context["success"]:
+            context["success-title"] = ""
+        return await _render(request, "term_request.html", context)
+    return await async_data.run_read(add_term, request)
+
+
+@acached_page("terms", "results")
+async def show_stats(request):
+    """
+    Асинхронная версия `views.show_stats`: статистика по терминам и результатам теста.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "stats.html".
+
+    Пример:
+        await show_stats(request)
+    """
+    stats = await async_data.get_terms_stats()
+    stats["tests"] = await async_data.get_results_stats()
+    return await _render(request, "stats.html", stats)
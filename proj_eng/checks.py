@@ -0,0 +1,72 @@
+"""
+Модуль системных проверок Django (`python manage.py check`, запуск runserver).
+
+Тест (`/test-input/`) и карточки повторения (`/review/`) хранят состояние в
+сессии пользователя. С сессиями в базе данных (SESSION_ENGINE по умолчанию)
+таблица `django_session` создается командой `python manage.py migrate`; без нее
+эти страницы отвечают ошибкой 500 "no such table: django_session".
+
+Функции:
+- check_session_table(app_configs, **kwargs): Проверяет, что таблица сессий создана.
+"""
+
+import os
+
+from django.conf import settings
+from django.core import checks
+from django.db import DatabaseError, connections, router
+
+# Движки сессий, которые хранят сессии в базе данных
+_DB_SESSION_ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+)
+
+
+def _session_tables(alias, table):
+    """Возвращает список таблиц базы alias и причину, по которой в нем нет таблицы table."""
+    try:
+        with connections[alias].cursor() as cursor:
+            tables = connections[alias].introspection.table_names(cursor)
+    except DatabaseError as exc:
+        return [], f"база данных {alias!r} недоступна: {exc}"
+    return tables, f"в базе данных {alias!r} нет таблицы {table}"
+
+
+def check_session_table(app_configs, **kwargs):
+    """
+    Проверяет, что таблица сессий создана, если сессии хранятся в базе данных.
+
+    Эта функция:
+    - Ничего не проверяет, если сессии хранятся не в базе (например, signed_cookies).
+    - Читает список таблиц базы, в которую пишутся сессии, и ищет среди них `django_session`.
+    - Если базу нельзя открыть или таблицы нет, возвращает предупреждение с подсказкой
+      выполнить `python manage.py migrate` (ошибка помешала бы выполнить саму команду migrate).
+
+    Аргументы:
+        app_configs: Проверяемые приложения (None — все).
+        **kwargs: Прочие аргументы системных проверок.
+
+    Возвращает:
+        list: Пустой список или одно предупреждение checks.Warning.
+    """
+    if settings.SESSION_ENGINE not in _DB_SESSION_ENGINES:
+        return []
+    from django.contrib.sessions.models import Session
+
+    alias = router.db_for_write(Session)
+    database = connections[alias].settings_dict
+    # Подключение к SQLite создало бы пустой файл базы
+    if database["ENGINE"].endswith("sqlite3") and not os.path.exists(database["NAME"]):
+        tables = []
+        reason = f"файла базы данных {database['NAME']} нет"
+    else:
+        tables, reason = _session_tables(alias, Session._meta.db_table)
+    if Session._meta.db_table in tables:
+        return []
+    return [checks.Warning(
+        f"Сессии хранятся в базе данных, но {reason}. "
+        "Тест и карточки повторения будут отвечать ошибкой 500.",
+        hint="Выполните python manage.py migrate.",
+        id="proj_eng.W001",
+    )]
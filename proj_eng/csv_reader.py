@@ -0,0 +1,137 @@
+"""
+Модуль потокового чтения CSV файлов с данными.
+
+Файлы `./data/*.csv` читаются построчно генераторами: в памяти одновременно
+находится только текущая строка, а вызывающий код может остановиться в любой
+момент (например, взяв одну страницу через itertools.islice).
+
+Некорректная строка (с неверным количеством полей) не прерывает чтение:
+она пропускается, записывается в журнал и учитывается в счетчике `skipped_rows`.
+В файле тестов, как и раньше, допускаются лишние поля: берутся первые два.
+
+Функции:
+- parse_lines(lines, fields, path, extra): Разбирает строки CSV, пропуская некорректные.
+- iter_rows(path, fields, extra): Построчно читает CSV файл без заголовка.
+- iter_terms(path): Термины как записи Term.
+- iter_texts(path): Тексты как записи Text.
+- iter_tests(path): Тесты как записи Question.
+"""
+
+import logging
+import threading
+from collections import Counter
+
+from . import metrics
+from .records import Question, Term, Text
+
+logger = logging.getLogger(__name__)
+
+# Количество пропущенных некорректных строк по пути к файлу
+skipped_rows = Counter()
+_skipped_lock = threading.Lock()
+
+
+def parse_lines(lines, fields, path="", extra=False):
+    """
+    Разбирает строки CSV с разделителем ";".
+
+    Эта функция:
+    - Пропускает пустые строки.
+    - Пропускает строки, в которых количество полей не равно fields (при extra — меньше fields),
+      и учитывает их в `skipped_rows`.
+    - Для остальных строк возвращает номер строки и список из первых fields полей.
+    - Учитывает количество разобранных строк в метрике proj_eng_rows_parsed_total.
+
+    Аргументы:
+        lines (iterable): Строки файла (без заголовка).
+        fields (int): Ожидаемое количество полей.
+        path (str): Путь к файлу (для журнала и счетчика пропусков).
+        extra (bool): Допускать лишние поля в конце строки (они отбрасываются).
+
+    Возвращает:
+        generator: Пары (номер строки начиная с 1, список полей).
+    """
+    parsed = 0
+    try:
+        for number, line in enumerate(lines, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            parts = line.split(";")
+            if len(parts) < fields or (len(parts) > fields and not extra):
+                with _skipped_lock:
+                    skipped_rows[path] += 1
+                logger.warning("Пропущена некорректная строка %s в файле %s", number, path)
+                continue
+            parsed += 1
+            yield number, parts[:fields]
+    finally:
+        # Счетчик обновляется один раз, даже если чтение остановлено раньше конца файла
+        metrics.inc("proj_eng_rows_parsed_total", parsed, file=path)
+
+
+def iter_rows(path, fields, extra=False):
+    """
+    Построчно читает CSV файл, пропуская заголовок.
+
+    Аргументы:
+        path (str): Путь к файлу.
+        fields (int): Ожидаемое количество полей.
+        extra (bool): Допускать лишние поля (см. `parse_lines`).
+
+    Возвращает:
+        generator: Пары (номер строки, список полей), см. `parse_lines`.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            next(f, None)  # Пропускаем заголовок
+            yield from parse_lines(f, fields, path, extra)
+        finally:
+            # Позиция буфера — сколько байт фактически прочитано из файла
+            metrics.inc("proj_eng_file_read_bytes_total", f.buffer.tell(), file=path)
+
+
+def iter_terms(path):
+    """
+    Читает термины из CSV файла.
+
+    Аргументы:
+        path (str): Путь к файлу терминов.
+
+    Возвращает:
+        generator: Записи Term (термин, определение, источник) в порядке следования в файле.
+    """
+    for _, (term, definition, source) in iter_rows(path, 3):
+        yield Term(term, definition, source.strip())
+
+
+def iter_texts(path):
+    """
+    Читает тексты из CSV файла.
+
+    Аргументы:
+        path (str): Путь к файлу текстов.
+
+    Возвращает:
+        generator: Записи Text (номер текста начиная с 1, текст, перевод).
+    """
+    for cnt, (_, (text, definition, source)) in enumerate(iter_rows(path, 3), 1):
+        yield Text(cnt, text, definition)
+
+
+def iter_tests(path):
+    """
+    Читает тесты из CSV файла.
+
+    Номер теста — номер строки в файле без заголовка, поэтому он не меняется,
+    если какая-то строка пропущена как некорректная. Строка должна содержать
+    не меньше двух полей; лишние поля отбрасываются.
+
+    Аргументы:
+        path (str): Путь к файлу тестов.
+
+    Возвращает:
+        generator: Записи Question (номер теста, текст, страна).
+    """
+    for number, (text, country) in iter_rows(path, 2, extra=True):
+        yield Question(number, text.strip(), country.strip())
@@ -0,0 +1,22 @@
+"""
+Команда manage.py для уплотнения файла терминов.
+
+`write_term` только дописывает новые строки в конец `data/terms.csv`. Эта команда
+переписывает файл в отсортированном виде с атомарной заменой. Ее удобно
+запускать периодически (например, из cron).
+
+Пример:
+    python manage.py compact_terms
+"""
+
+from django.core.management.base import BaseCommand
+
+from proj_eng import terms_work
+
+
+class Command(BaseCommand):
+    help = "Сортирует data/terms.csv и атомарно заменяет файл"
+
+    def handle(self, *args, **options):
+        count = terms_work.compact_terms()
+        self.stdout.write(self.style.SUCCESS(f"Файл терминов уплотнен: {count} терминов"))
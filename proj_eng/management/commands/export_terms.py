@@ -0,0 +1,44 @@
+"""
+Команда manage.py для выгрузки словаря в файл.
+
+Записывает все термины (термин, определение, источник) в формате CSV, TSV
+или JSONL. Выгрузку в формате csv можно загрузить обратно командой
+`import_terms`.
+
+Пример:
+    python manage.py export_terms words.jsonl
+    python manage.py export_terms - --format tsv > words.tsv
+"""
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proj_eng import term_formats
+from proj_eng.repositories import get_repository
+
+
+class Command(BaseCommand):
+    help = "Выгружает словарь в файл CSV, TSV или JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу или \"-\" для стандартного вывода")
+        parser.add_argument("--format", choices=term_formats.FORMATS,
+                            help="Формат файла (по умолчанию определяется по расширению)")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or (term_formats.detect_format(path) if path != "-" else None)
+        if fmt is None:
+            raise CommandError("Не удалось определить формат файла, укажите --format")
+
+        started = time.perf_counter()
+        records = get_repository().get_term_rows()
+        if path == "-":
+            term_formats.write_terms(records, sys.stdout, fmt)
+            return
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            count = term_formats.write_terms(records, f, fmt)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Выгружено терминов: {count} за {elapsed:.2f} с"))
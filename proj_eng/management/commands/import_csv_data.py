@@ -0,0 +1,32 @@
+"""
+Команда manage.py для переноса данных из CSV файлов в базу SQLite.
+
+Читает `data/terms.csv`, `data/texts.csv` и `data/tests.csv` и заменяет ими
+содержимое базы, указанной в настройке `DATA_SQLITE_PATH`. После импорта
+можно переключить хранилище настройкой `DATA_BACKEND=sqlite`.
+
+Пример:
+    python manage.py import_csv_data
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from proj_eng.repositories import CsvRepository, SqliteRepository
+
+
+class Command(BaseCommand):
+    help = "Импортирует данные из data/*.csv в базу SQLite"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=str(settings.DATA_SQLITE_PATH),
+            help="Путь к базе SQLite (по умолчанию DATA_SQLITE_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        counts = SqliteRepository(options["database"]).import_from(CsvRepository())
+        self.stdout.write(self.style.SUCCESS(
+            f"Импортировано: {counts['terms']} терминов, {counts['texts']} текстов, {counts['tests']} тестов"
+        ))
@@ -0,0 +1,77 @@
+"""
+Команда manage.py для массового импорта терминов.
+
+Читает файл CSV, TSV или JSONL построчно, нормализует термины, отклоняет
+некорректные строки и добавляет остальные в словарь одним проходом
+(см. `terms_work.import_terms`). Термины, которые уже есть в словаре,
+пропускаются. В конце печатает количество добавленных, пропущенных и
+отклоненных строк и скорость импорта.
+
+Пример:
+    python manage.py import_terms words.tsv
+    python manage.py import_terms - --format jsonl < words.jsonl
+"""
+
+import sys
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proj_eng import term_formats
+from proj_eng import terms_work
+
+# Сколько отклоненных строк печатать подробно
+REJECTED_SHOWN = 20
+
+
+class Command(BaseCommand):
+    help = "Импортирует термины из файла CSV, TSV или JSONL в словарь"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу или \"-\" для стандартного ввода")
+        parser.add_argument("--format", choices=term_formats.FORMATS,
+                            help="Формат файла (по умолчанию определяется по расширению)")
+        parser.add_argument("--source", default="db", help="Источник новых терминов (по умолчанию db)")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or (term_formats.detect_format(path) if path != "-" else None)
+        if fmt is None:
+            raise CommandError("Не удалось определить формат файла, укажите --format")
+
+        rejected = Counter()
+        read = 0
+
+        def valid_records(f):
+            nonlocal read
+            for number, term, definition, error in term_formats.read_terms(f, fmt):
+                read += 1
+                if error is None:
+                    term, definition, error = terms_work.clean_term(term, definition)
+                if error is not None:
+                    rejected[error] += 1
+                    if sum(rejected.values()) <= REJECTED_SHOWN:
+                        self.stderr.write(f"Строка {number} отклонена: {error}")
+                    continue
+                yield term, definition
+
+        started = time.perf_counter()
+        try:
+            f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+        except OSError as exc:
+            raise CommandError(f"Не удалось открыть файл: {exc}")
+        try:
+            result = terms_work.import_terms(valid_records(f), options["source"])
+        finally:
+            if f is not sys.stdin:
+                f.close()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Прочитано строк: {read}, добавлено: {result['added']}, "
+            f"дубликатов: {result['duplicates']}, отклонено: {sum(rejected.values())}"
+        ))
+        for reason, count in rejected.most_common():
+            self.stdout.write(f"  {reason}: {count}")
+        self.stdout.write(f"Время: {elapsed:.2f} с, {read / elapsed if elapsed else 0:.0f} строк/с")
@@ -0,0 +1,43 @@
+"""
+Команда manage.py для подготовки снимка разобранных данных.
+
+Читает словарь и индекс текстов (из актуальных частей снимка или из CSV
+файлов) и записывает снимок `data/snapshot.bin` (см. модуль `snapshot`),
+а при общей таблице терминов — строит файл `data/terms.csv.table`.
+После этого процессы сервера при старте загружают данные из снимка, не
+разбирая CSV. Сами процессы сервера перезаписывают снимок, только если он
+устарел; команды manage.py при запуске его не трогают. Команду удобно запускать после развертывания и после
+`import_terms` или `compact_terms`, до перезапуска воркеров.
+
+Пример:
+    python manage.py warm_cache
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proj_eng import snapshot
+from proj_eng.repositories import CsvRepository, get_repository
+
+
+class Command(BaseCommand):
+    help = "Записывает снимок разобранных данных data/snapshot.bin для быстрого старта процессов"
+
+    def handle(self, *args, **options):
+        repository = get_repository()
+        if not isinstance(repository, CsvRepository):
+            raise CommandError("Снимок нужен только для хранилища CSV (DATA_BACKEND=csv)")
+
+        started = time.perf_counter()
+        loaded, stale = snapshot.load_snapshot(repository)
+        loaded_at = time.perf_counter()
+        size = snapshot.write_snapshot(repository)
+        if repository.shared_table:
+            # Общая таблица терминов строится отдельно от снимка (см. CsvRepository._load_terms)
+            repository.count_terms()
+        written_at = time.perf_counter()
+
+        self.stdout.write(f"Из снимка: {', '.join(loaded) or '-'}; из CSV: {', '.join(stale) or '-'}")
+        self.stdout.write(f"Загрузка: {loaded_at - started:.2f} с, запись снимка: {written_at - loaded_at:.2f} с")
+        self.stdout.write(self.style.SUCCESS(f"Снимок записан: {snapshot.SNAPSHOT_FILE}, {size / 1024:.0f} КБ"))
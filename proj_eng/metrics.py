@@ -0,0 +1,321 @@
+"""
+Модуль метрик производительности в формате Prometheus.
+
+Метрики хранятся в памяти процесса и отдаются страницей `/metrics` в
+текстовом формате Prometheus. Собираются:
+- proj_eng_request_duration_seconds — время обработки запроса по представлениям (гистограмма);
+- proj_eng_requests_total — количество запросов по представлениям, методам и кодам ответа;
+- proj_eng_data_call_duration_seconds — время функций модулей `*_work` (гистограмма);
+- proj_eng_template_render_duration_seconds — время рендеринга шаблонов (гистограмма);
+- proj_eng_file_read_bytes_total — прочитано байт из файлов данных;
+- proj_eng_rows_parsed_total, proj_eng_rows_skipped_total — разобрано и пропущено строк CSV;
+- proj_eng_cache_requests_total — попадания и промахи кэшей (страниц, словаря, банка тестов)
+  и доля попаданий proj_eng_cache_hit_ratio.
+
+Страница `/metrics` доступна только клиентам с адресами из `METRICS_ALLOWED_IPS`
+(по умолчанию локальным) или с токеном `METRICS_TOKEN` в заголовке Authorization.
+
+При `PROFILE_REQUESTS = True` запрос с параметром `?profile=1` возвращает
+вместо страницы отчет cProfile о ее обработке.
+
+Функции и классы:
+- inc(name, value, **labels): Увеличивает счетчик.
+- observe(name, value, **labels): Добавляет наблюдение в гистограмму.
+- timed(func): Декоратор, измеряющий время функции модуля данных.
+- MetricsMiddleware: Промежуточное ПО, измеряющее время запросов.
+- TimedDjangoTemplates: Шаблонизатор Django, измеряющий время рендеринга.
+- metrics_view(request): Страница `/metrics`.
+"""
+
+import asyncio
+import bisect
+import cProfile
+import functools
+import hmac
+import io
+import pstats
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates
+from django.utils.deprecation import MiddlewareMixin
+
+# Границы корзин гистограмм времени, секунд
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Количество строк отчета профилировщика
+PROFILE_LINES = 40
+
+_HELP = {
+    "proj_eng_request_duration_seconds": ("histogram", "Время обработки запроса."),
+    "proj_eng_requests_total": ("counter", "Количество обработанных запросов."),
+    "proj_eng_data_call_duration_seconds": ("histogram", "Время выполнения функций модулей данных."),
+    "proj_eng_template_render_duration_seconds": ("histogram", "Время рендеринга шаблонов."),
+    "proj_eng_file_read_bytes_total": ("counter", "Прочитано байт из файлов данных."),
+    "proj_eng_rows_parsed_total": ("counter", "Разобрано строк CSV."),
+    "proj_eng_rows_skipped_total": ("counter", "Пропущено некорректных строк CSV."),
+    "proj_eng_cache_requests_total": ("counter", "Обращения к кэшам: попадания и промахи."),
+    "proj_eng_cache_hit_ratio": ("gauge", "Доля попаданий в кэш."),
+}
+
+_lock = threading.Lock()
+_counters = {}  # (имя, метки) -> значение
+_histograms = {}  # (имя, метки) -> [количества по корзинам, сумма, количество]
+
+
+def _key(name, labels):
+    """Возвращает ключ метрики: имя и отсортированные пары меток."""
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """
+    Увеличивает счетчик.
+
+    Аргументы:
+        name (str): Имя метрики.
+        value (int | float): Приращение.
+        **labels: Метки метрики.
+
+    Пример:
+        inc("proj_eng_rows_parsed_total", 100, file="./data/terms.csv")
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """
+    Добавляет наблюдение в гистограмму с корзинами `DURATION_BUCKETS`.
+
+    Аргументы:
+        name (str): Имя метрики.
+        value (float): Наблюдаемое значение, секунд.
+        **labels: Метки метрики.
+    """
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(DURATION_BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(DURATION_BUCKETS, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+
+def cache_access(cache_name, hit):
+    """
+    Учитывает обращение к кэшу.
+
+    Аргументы:
+        cache_name (str): Название кэша: "page", "terms_store", "test_bank".
+        hit (bool): Найдено ли значение в кэше.
+    """
+    inc("proj_eng_cache_requests_total", cache=cache_name, result="hit" if hit else "miss")
+
+
+def timed(func):
+    """
+    Декоратор: измеряет время выполнения функции модуля данных.
+
+    Время записывается в гистограмму proj_eng_data_call_duration_seconds
+    с меткой function="<модуль>.<функция>".
+
+    Пример:
+        @timed
+        def get_terms_stats(): ...
+    """
+    label = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            observe("proj_eng_data_call_duration_seconds", time.perf_counter() - started, function=label)
+
+    return wrapper
+
+
+class _TimedTemplate:
+    """Обертка шаблона, измеряющая время его рендеринга."""
+
+    def __init__(self, template, name):
+        self.template = template
+        self.name = name
+
+    @property
+    def origin(self):
+        return self.template.origin
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            observe("proj_eng_template_render_duration_seconds", time.perf_counter() - started,
+                    template=self.name)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Шаблонизатор Django, измеряющий время рендеринга каждого шаблона.
+
+    Подключается в настройке TEMPLATES вместо
+    "django.template.backends.django.DjangoTemplates".
+    """
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name), template_name)
+
+
+def _profile(view_func, request, args, kwargs):
+    """
+    Выполняет представление под cProfile.
+
+    Возвращает:
+        HttpResponse: Отчет профилировщика (текст), отсортированный по суммарному времени.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        if asyncio.iscoroutinefunction(view_func):
+            # Асинхронное представление выполняется в отдельном цикле событий этого потока
+            asyncio.run(view_func(request, *args, **kwargs))
+        else:
+            view_func(request, *args, **kwargs)
+    finally:
+        profiler.disable()
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return HttpResponse(output.getvalue(), content_type="text/plain; charset=utf-8")
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Промежуточное ПО: измеряет время обработки каждого запроса.
+
+    Должно стоять первым в списке MIDDLEWARE, чтобы учитывать время всех
+    остальных обработчиков. Имя представления берется из разрешенного маршрута
+    (`request.resolver_match.view_name`).
+    """
+
+    def process_request(self, request):
+        request._metrics_started = time.perf_counter()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(settings, "PROFILE_REQUESTS", False) and request.GET.get("profile") == "1":
+            return _profile(view_func, request, view_args, view_kwargs)
+        return None
+
+    def process_response(self, request, response):
+        started = getattr(request, "_metrics_started", None)
+        if started is not None:
+            match = getattr(request, "resolver_match", None)
+            view = match.view_name if match else "unmatched"
+            observe("proj_eng_request_duration_seconds", time.perf_counter() - started, view=view)
+            inc("proj_eng_requests_total", view=view, method=request.method, status=str(response.status_code))
+        return response
+
+
+def _format_labels(labels, extra=()):
+    """Форматирует метки Prometheus: {a="1",b="2"}."""
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _collect():
+    """
+    Возвращает снимок метрик с вычисляемыми значениями (пропущенные строки, доля попаданий).
+
+    Возвращает:
+        tuple: (счетчики и датчики, гистограммы) — словари вида {(имя, метки): значение}.
+    """
+    # Импорт здесь, чтобы модуль чтения CSV мог сам импортировать этот модуль
+    from .csv_reader import skipped_rows
+
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: (list(value[0]), value[1], value[2]) for key, value in _histograms.items()}
+    for path, count in skipped_rows.items():
+        counters[_key("proj_eng_rows_skipped_total", {"file": path})] = count
+    totals = {}
+    for (name, labels), value in list(counters.items()):
+        if name == "proj_eng_cache_requests_total":
+            labels = dict(labels)
+            hits, requests = totals.get(labels["cache"], (0, 0))
+            totals[labels["cache"]] = (hits + (value if labels["result"] == "hit" else 0), requests + value)
+    for cache_name, (hits, requests) in totals.items():
+        counters[_key("proj_eng_cache_hit_ratio", {"cache": cache_name})] = hits / requests
+    return counters, histograms
+
+
+def render_metrics():
+    """
+    Формирует текст метрик в формате Prometheus.
+
+    Возвращает:
+        str: Текст для ответа страницы `/metrics`.
+    """
+    counters, histograms = _collect()
+    lines = []
+    for name, (kind, help_text) in _HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind != "histogram":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+            continue
+        for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket in zip(DURATION_BUCKETS + ("+Inf",), buckets):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_allowed(request):
+    """
+    Проверяет доступ к метрикам: адрес клиента из `METRICS_ALLOWED_IPS` или токен `METRICS_TOKEN`.
+
+    За обратным прокси REMOTE_ADDR — адрес прокси, поэтому в этом случае доступ
+    нужно ограничивать на прокси или по токену.
+    """
+    if request.META.get("REMOTE_ADDR") in getattr(settings, "METRICS_ALLOWED_IPS", ()):
+        return True
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        return False
+    scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), token.encode())
+
+
+def metrics_view(request):
+    """
+    Отдает метрики процесса в текстовом формате Prometheus.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса.
+
+    Возвращает:
+        HttpResponse: Текст метрик (Content-Type text/plain; version=0.0.4)
+        или ответ 403, если клиенту метрики недоступны (см. `_metrics_allowed`).
+
+    Пример:
+        GET /metrics
+        curl -H "Authorization: Bearer $METRICS_TOKEN" https://example.org/metrics
+    """
+    if not _metrics_allowed(request):
+        return HttpResponseForbidden("Метрики недоступны")
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
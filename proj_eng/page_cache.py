@@ -0,0 +1,222 @@
+"""
+Модуль кэширования отрендеренных страниц.
+
+Страница кэшируется вместе с версиями данных, от которых она зависит
+(словарь, тексты, тесты, журнал результатов теста). Версия данных берется у
+репозитория (для CSV — время изменения и размер файла), а версия журнала
+результатов — у модуля `results_work`, поэтому изменение файла любым процессом
+делает старые записи кэша недействительными.
+
+Дополнительно у каждого вида данных есть счетчик поколений в кэше: функция
+`invalidate("terms")` сбрасывает только страницы, зависящие от словаря,
+не трогая остальные записи кэша.
+
+По ETag и Last-Modified, вычисленным из версий данных, повторный условный
+GET-запрос получает ответ 304 без рендеринга страницы.
+
+Ключ страницы строится из пути запроса и значения функции `key` представления
+(например, номера страницы таблицы после проверки), а не из строки запроса
+целиком: `?page=2&utm=x`, `?page=02` и `?page=2` — одна запись кэша, а
+неизвестные параметры не плодят новые записи.
+
+Функции:
+- cached_page(*resources): Декоратор представления, кэширующий GET-ответы.
+- acached_page(*resources): То же для асинхронных представлений.
+- invalidate(resource): Сбрасывает страницы, зависящие от вида данных.
+"""
+
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import metrics
+from . import results_work
+from .async_data import run_read
+from .repositories import get_repository
+
+
+def _data_version(repository, resource):
+    """Возвращает версию вида данных: "results" — журнала результатов теста, остальные — у репозитория."""
+    if resource == "results":
+        return results_work.data_version()
+    return repository.data_version(resource)
+
+
+def _data_modified(repository, resource):
+    """Возвращает время изменения вида данных (см. `_data_version`)."""
+    if resource == "results":
+        return results_work.data_modified()
+    return repository.data_modified(resource)
+
+
+def _generation(resource):
+    """
+    Возвращает номер поколения вида данных в кэше.
+
+    Аргументы:
+        resource (str): Вид данных: "terms", "texts", "tests" или "results".
+    """
+    return cache.get(f"page-generation:{resource}", 0)
+
+
+def invalidate(resource):
+    """
+    Сбрасывает закэшированные страницы, зависящие от вида данных.
+
+    Новое поколение меняет ключи и ETag всех таких страниц, старые записи
+    просто перестают использоваться и удаляются кэшем по истечении срока.
+
+    Аргументы:
+        resource (str): Вид данных: "terms", "texts", "tests" или "results".
+
+    Пример:
+        invalidate("terms")  # после добавления термина
+    """
+    key = f"page-generation:{resource}"
+    try:
+        cache.incr(key)
+    except ValueError:  # ключа еще нет в кэше
+        cache.set(key, 1, None)
+
+
+def _page_etag(request, resources, key):
+    """
+    Вычисляет ETag страницы по пути запроса, ключу страницы, версиям и поколениям данных.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса.
+        resources (tuple): Виды данных, от которых зависит страница.
+        key (callable | None): Функция, возвращающая по запросу параметры, от которых
+                               зависит страница (None — страница зависит только от пути).
+
+    Возвращает:
+        str: Хэш, однозначно определяющий содержимое страницы.
+    """
+    repository = get_repository()
+    state = [request.path, key(request) if key else None]
+    for resource in resources:
+        state.append((resource, _data_version(repository, resource), _generation(resource)))
+    return hashlib.md5(repr(state).encode("utf-8")).hexdigest()
+
+
+def _page_last_modified(request, resources):
+    """
+    Возвращает время последнего изменения данных, от которых зависит страница.
+    """
+    repository = get_repository()
+    modified = [_data_modified(repository, resource) for resource in resources]
+    modified = [value for value in modified if value is not None]
+    return max(modified) if modified else None
+
+
+def _page_validators(request, resources, key):
+    """
+    Возвращает ETag страницы и время ее изменения как метку времени в секундах (или None).
+    """
+    modified = _page_last_modified(request, resources)
+    return _page_etag(request, resources, key), int(modified.timestamp()) if modified else None
+
+
+def cached_page(*resources, key=None):
+    """
+    Декоратор представления: кэширует GET-ответы и отвечает 304 на условные запросы.
+
+    Эта функция:
+    - Для GET и HEAD один раз вычисляет ETag и Last-Modified по версиям данных `resources`
+      (см. `_page_validators`); ETag служит и ключом кэша.
+    - Если клиент прислал совпадающий If-None-Match или If-Modified-Since, возвращает 304.
+    - Иначе ищет готовый ответ в кэше по ETag и, если его нет, вызывает представление
+      и сохраняет ответ на `PAGE_CACHE_TIMEOUT` секунд.
+    - Остальные методы (POST) передает представлению без кэширования.
+
+    Аргументы:
+        *resources (str): Виды данных, от которых зависит страница: "terms", "texts", "tests", "results".
+        key (callable): Функция key(request), возвращающая нормализованные параметры запроса,
+                        от которых зависит страница (см. `_page_etag`). Без нее строка
+                        запроса не учитывается.
+
+    Пример:
+        @cached_page("terms", key=_terms_page_key)
+        def terms_list(request): ...
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def cached_view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            # ETag вычисляется один раз: он же служит ключом кэша
+            etag, last_modified = _page_validators(request, resources, key)
+            quoted_etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=quoted_etag, last_modified=last_modified)
+            if response is None:
+                cache_key = f"page:{etag}"
+                response = cache.get(cache_key)
+                metrics.cache_access("page", response is not None)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                    if response.status_code == 200 and not response.streaming:
+                        # Страницу нужно перепроверять при каждом запросе (ответ 304, если данные не менялись)
+                        response["Cache-Control"] = "no-cache"
+                        cache.set(cache_key, response, settings.PAGE_CACHE_TIMEOUT)
+            if not response.has_header("ETag"):
+                response["ETag"] = quoted_etag
+            if last_modified and not response.has_header("Last-Modified"):
+                response["Last-Modified"] = http_date(last_modified)
+            return response
+
+        return cached_view
+
+    return decorator
+
+
+def acached_page(*resources, key=None):
+    """
+    Асинхронный вариант декоратора `cached_page` для представлений `async def`.
+
+    Эта функция:
+    - Вычисляет ETag и Last-Modified в пуле потоков доступа к данным (см. модуль `async_data`),
+      не блокируя цикл событий обращением к файлам.
+    - Отвечает 304 на совпадающий условный запрос.
+    - Берет готовый ответ из того же кэша, что и `cached_page`, или вызывает представление
+      и сохраняет ответ.
+
+    Аргументы:
+        *resources (str): Виды данных, от которых зависит страница: "terms", "texts", "tests", "results".
+        key (callable): Функция нормализованных параметров запроса (как в `cached_page`).
+
+    Пример:
+        @acached_page("terms", key=_terms_page_key)
+        async def terms_list(request): ...
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def cached_view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return await view(request, *args, **kwargs)
+            etag, last_modified = await run_read(_page_validators, request, resources, key)
+            quoted_etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=quoted_etag, last_modified=last_modified)
+            if response is None:
+                # Ключ совпадает с ключом `cached_page`: синхронная и асинхронная версии
+                # представления отдают одну и ту же страницу
+                cache_key = f"page:{etag}"
+                response = cache.get(cache_key)
+                metrics.cache_access("page", response is not None)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code == 200 and not response.streaming:
+                        response["Cache-Control"] = "no-cache"
+                        cache.set(cache_key, response, settings.PAGE_CACHE_TIMEOUT)
+            if not response.has_header("ETag"):
+                response["ETag"] = quoted_etag
+            if last_modified and not response.has_header("Last-Modified"):
+                response["Last-Modified"] = http_date(last_modified)
+            return response
+
+        return cached_view
+
+    return decorator
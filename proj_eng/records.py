@@ -0,0 +1,438 @@
+"""
+Модуль типов записей для терминов, текстов и тестов.
+
+Вместо списков и кортежей без имен полей данные передаются компактными
+именованными кортежами (NamedTuple не хранит словарь атрибутов у каждого
+экземпляра). Распаковка `cnt, term, definition = row` при этом продолжает работать.
+
+Для словаря целиком используется колоночное представление TermTable: все
+термины и все определения хранятся двумя сплошными строками со смещениями
+в массивах array, а источник ("db", "user") — однобайтовым кодом.
+
+Классы:
+- Term: Термин из файла (термин, определение, источник).
+- TermRow: Строка таблицы словаря (номер, термин, определение).
+- Text: Строка таблицы текстов (номер, текст, перевод).
+- Question: Вопрос теста (номер, текст, страна).
+- Card: Состояние карточки интервального повторения (термин, легкость, интервал, повторения, срок).
+- TextLinks: Слова словаря, найденные в тексте (участки текста и покрытие).
+- LinkedText: Строка таблицы текстов с подсвеченными словами словаря.
+- TermTable: Колоночная таблица терминов, отсортированная по термину.
+- MappedTermTable: Та же таблица поверх буфера (отображенного в память файла) без копирования.
+- TailedTermTable: Таблица с несколькими записями, дописанными после нее, без копирования таблицы.
+"""
+
+import bisect
+import struct
+import sys
+from array import array
+from typing import NamedTuple
+
+
+def _array_from_bytes(typecode, data):
+    """Создает массив array из байтового представления (array(typecode, bytes) разбирает байты как числа)."""
+    result = array(typecode)
+    result.frombytes(data)
+    return result
+
+
+# Заголовок содержимого MappedTermTable: длины семи частей (см. `MappedTermTable.encode`)
+_MAPPED_PARTS = struct.Struct("<7Q")
+# Части выравниваются по 8 байт, чтобы массивы смещений читались через memoryview.cast
+_MAPPED_ALIGN = 8
+
+
+class Term(NamedTuple):
+    """Термин в том виде, в каком он хранится в файле."""
+    term: str
+    definition: str
+    source: str
+
+
+class TermRow(NamedTuple):
+    """Строка таблицы словаря: номер в отсортированном словаре (с 1), термин и определение."""
+    cnt: int
+    term: str
+    definition: str
+
+
+class Text(NamedTuple):
+    """Строка таблицы текстов: номер текста (с 1), текст и перевод."""
+    cnt: int
+    text: str
+    definition: str
+
+
+class Question(NamedTuple):
+    """Вопрос теста: номер вопроса (с 1), текст и правильный ответ (страна)."""
+    cnt: int
+    text: str
+    country: str
+
+
+class Card(NamedTuple):
+    """Карточка интервального повторения: термин, коэффициент легкости, интервал в днях,
+    количество успешных повторений подряд и срок следующего повторения (Unix-время)."""
+    term: str
+    ease: float
+    interval: int
+    repetitions: int
+    due: int
+
+
+class TextLinks(NamedTuple):
+    """Слова словаря в тексте: участки (начало, конец, термин, определение) в порядке текста,
+    количество разных терминов, количество слов текста внутри участков и всего слов в тексте."""
+    spans: tuple
+    terms: int
+    covered: int
+    words: int
+
+
+class LinkedText(NamedTuple):
+    """Строка таблицы текстов с подсветкой: номер, текст (HTML с подсвеченными словами словаря),
+    перевод и покрытие текста словарем (см. TextLinks)."""
+    cnt: int
+    text: str
+    definition: str
+    terms: int
+    covered: int
+    words: int
+
+
+class TermTable:
+    """
+    Колоночная таблица терминов.
+
+    Хранение:
+    - термины и определения — две сплошные строки, границы записей — в массивах смещений;
+    - источники — массив однобайтовых кодов и список уникальных (интернированных) названий;
+    - порядок сортировки по термину без учета регистра — массив номеров записей.
+
+    Записи нумеруются в порядке следования в файле, позиции — в порядке сортировки.
+
+    Аргументы:
+        records (iterable): Записи Term (или кортежи из трех строк) в порядке следования в файле.
+    """
+
+    __slots__ = ("_terms", "_term_offsets", "_definitions", "_definition_offsets",
+                 "_source_codes", "_source_names", "_order")
+
+    def __init__(self, records):
+        terms = []
+        definitions = []
+        term_offsets = array("I", [0])
+        definition_offsets = array("I", [0])
+        source_codes = array("B")
+        source_names = []
+        codes = {}
+        term_end = definition_end = 0
+        for term, definition, source in records:
+            terms.append(term)
+            term_end += len(term)
+            term_offsets.append(term_end)
+            definitions.append(definition)
+            definition_end += len(definition)
+            definition_offsets.append(definition_end)
+            code = codes.get(source)
+            if code is None:
+                code = codes[source] = len(source_names)
+                source_names.append(sys.intern(source))
+            source_codes.append(code)
+
+        self._terms = "".join(terms)
+        self._definitions = "".join(definitions)
+        self._term_offsets = term_offsets
+        self._definition_offsets = definition_offsets
+        self._source_codes = source_codes
+        self._source_names = source_names
+        # Сортировка только по термину, .lower() для регистронезависимой сортировки
+        self._order = array("I", sorted(range(len(source_codes)), key=lambda i: self.term(i).lower()))
+
+    def to_parts(self):
+        """
+        Возвращает содержимое таблицы как список байтовых строк (для снимка данных).
+
+        Строки кодируются в UTF-8, массивы записываются как есть, поэтому при
+        восстановлении (`from_parts`) таблица не сортируется заново.
+        """
+        return [
+            self._terms.encode("utf-8"),
+            self._definitions.encode("utf-8"),
+            "\x1f".join(self._source_names).encode("utf-8"),
+            self._term_offsets.tobytes(),
+            self._definition_offsets.tobytes(),
+            self._source_codes.tobytes(),
+            self._order.tobytes(),
+        ]
+
+    @classmethod
+    def from_parts(cls, parts):
+        """
+        Восстанавливает таблицу из списка байтовых строк, полученного `to_parts`.
+
+        Аргументы:
+            parts (list): Байтовые строки (bytes или memoryview).
+
+        Возвращает:
+            TermTable: Таблица с тем же содержимым и порядком сортировки.
+        """
+        terms, definitions, names, term_offsets, definition_offsets, source_codes, order = parts
+        table = cls.__new__(cls)
+        table._terms = str(terms, "utf-8")
+        table._definitions = str(definitions, "utf-8")
+        names = str(names, "utf-8")
+        table._source_names = [sys.intern(name) for name in names.split("\x1f")] if names else []
+        table._term_offsets = _array_from_bytes("I", term_offsets)
+        table._definition_offsets = _array_from_bytes("I", definition_offsets)
+        table._source_codes = _array_from_bytes("B", source_codes)
+        table._order = _array_from_bytes("I", order)
+        return table
+
+    def __len__(self):
+        return len(self._source_codes)
+
+    def __iter__(self):
+        """Перебирает записи Term в порядке следования в файле."""
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def term(self, i):
+        """Возвращает термин записи с номером i."""
+        return self._terms[self._term_offsets[i]:self._term_offsets[i + 1]]
+
+    def definition(self, i):
+        """Возвращает определение записи с номером i."""
+        return self._definitions[self._definition_offsets[i]:self._definition_offsets[i + 1]]
+
+    def source(self, i):
+        """Возвращает источник записи с номером i."""
+        return self._source_names[self._source_codes[i]]
+
+    def record(self, i):
+        """Возвращает запись с номером i как Term."""
+        return Term(self.term(i), self.definition(i), self.source(i))
+
+    def row(self, position):
+        """Возвращает строку таблицы словаря на позиции position (в порядке сортировки)."""
+        i = self._order[position]
+        return TermRow(position + 1, self.term(i), self.definition(i))
+
+    def rows(self, start, stop):
+        """Возвращает строки таблицы словаря на позициях от start до stop (не включая stop)."""
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        return [self.row(position) for position in range(start, stop)]
+
+    def key(self, position):
+        """Возвращает термин в нижнем регистре на позиции position."""
+        return self.term(self._order[position]).lower()
+
+    def bisect_left(self, key):
+        """Возвращает первую позицию, термин на которой (в нижнем регистре) не меньше key."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(self, key):
+        """Возвращает первую позицию, термин на которой (в нижнем регистре) больше key."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < self.key(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+
+class MappedTermTable(TermTable):
+    """
+    Колоночная таблица терминов поверх буфера — обычно mmap общего файла таблицы.
+
+    Хранение отличается от TermTable тем, что ничего не копируется в память процесса:
+    - массивы смещений, порядок сортировки и коды источников — memoryview на буфер;
+    - термины и определения — байты UTF-8 в буфере (смещения в байтах), строка
+      декодируется только при обращении к записи.
+
+    Если буфер — mmap файла, все процессы, открывшие этот файл, используют одни и те же
+    страницы кэша ОС, поэтому каждый следующий процесс почти не добавляет памяти.
+
+    Содержимое буфера: заголовок с длинами частей и сами части (см. `encode`).
+
+    Аргументы:
+        buffer: Буфер (mmap или bytes) с содержимым, записанным `encode` или `extend`.
+        offset (int): Смещение содержимого таблицы в буфере (кратно 8).
+    """
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer, offset=0):
+        view = memoryview(buffer)
+        parts = []
+        position = offset + _MAPPED_PARTS.size
+        for length in _MAPPED_PARTS.unpack_from(view, offset):
+            parts.append(view[position:position + length])
+            position += length + -length % _MAPPED_ALIGN
+        term_offsets, definition_offsets, order, source_codes, terms, definitions, names = parts
+        self._buffer = buffer
+        self._term_offsets = term_offsets.cast("I")
+        self._definition_offsets = definition_offsets.cast("I")
+        self._order = order.cast("I")
+        self._source_codes = source_codes
+        self._terms = terms
+        self._definitions = definitions
+        names = str(names, "utf-8")
+        self._source_names = [sys.intern(name) for name in names.split("\x1f")] if names else []
+
+    @staticmethod
+    def _chunks(term_offsets, definition_offsets, order, source_codes, terms, definitions, names):
+        """Возвращает байтовые строки содержимого таблицы: заголовок, части и выравнивание."""
+        parts = [term_offsets, definition_offsets, order, source_codes, terms, definitions,
+                 "\x1f".join(names).encode("utf-8")]
+        chunks = [_MAPPED_PARTS.pack(*(len(part) for part in parts))]
+        for part in parts:
+            chunks += [part, bytes(-len(part) % _MAPPED_ALIGN)]
+        return chunks
+
+    @classmethod
+    def encode(cls, table):
+        """
+        Возвращает содержимое таблицы в формате MappedTermTable.
+
+        Аргументы:
+            table (TermTable): Таблица (порядок сортировки берется из нее).
+
+        Возвращает:
+            list: Байтовые строки, которые нужно записать подряд.
+        """
+        terms = bytearray()
+        definitions = bytearray()
+        term_offsets = array("I", [0])
+        definition_offsets = array("I", [0])
+        for i in range(len(table)):
+            terms += table.term(i).encode("utf-8")
+            term_offsets.append(len(terms))
+            definitions += table.definition(i).encode("utf-8")
+            definition_offsets.append(len(definitions))
+        return cls._chunks(term_offsets.tobytes(), definition_offsets.tobytes(), bytes(table._order),
+                           bytes(table._source_codes), terms, definitions, table._source_names)
+
+    def extend(self, records):
+        """
+        Возвращает содержимое таблицы с записями, добавленными в конец (в формате `encode`).
+
+        Байты терминов и определений копируются без декодирования, а новые записи
+        вставляются в порядок сортировки двоичным поиском (после записей с тем же
+        ключом — как при устойчивой сортировке), поэтому таблица не сортируется заново.
+
+        Аргументы:
+            records (iterable): Новые записи Term в порядке следования в файле.
+
+        Возвращает:
+            list: Байтовые строки, которые нужно записать подряд.
+        """
+        terms = bytearray(self._terms)
+        definitions = bytearray(self._definitions)
+        term_offsets = _array_from_bytes("I", self._term_offsets.tobytes())
+        definition_offsets = _array_from_bytes("I", self._definition_offsets.tobytes())
+        order = _array_from_bytes("I", self._order.tobytes())
+        source_codes = bytearray(self._source_codes)
+        source_names = list(self._source_names)
+        codes = {name: code for code, name in enumerate(source_names)}
+
+        def key(i):
+            return terms[term_offsets[i]:term_offsets[i + 1]].decode("utf-8").lower()
+
+        for term, definition, source in records:
+            i = len(source_codes)
+            terms += term.encode("utf-8")
+            term_offsets.append(len(terms))
+            definitions += definition.encode("utf-8")
+            definition_offsets.append(len(definitions))
+            code = codes.get(source)
+            if code is None:
+                code = codes[source] = len(source_names)
+                source_names.append(source)
+            source_codes.append(code)
+            new_key = term.lower()
+            lo, hi = 0, len(order)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if new_key < key(order[mid]):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            order.insert(lo, i)
+        return self._chunks(term_offsets.tobytes(), definition_offsets.tobytes(), order.tobytes(),
+                            source_codes, terms, definitions, source_names)
+
+    def term(self, i):
+        return str(self._terms[self._term_offsets[i]:self._term_offsets[i + 1]], "utf-8")
+
+    def definition(self, i):
+        return str(self._definitions[self._definition_offsets[i]:self._definition_offsets[i + 1]], "utf-8")
+
+
+class TailedTermTable(TermTable):
+    """
+    Таблица терминов base с записями tail, дописанными после нее в файл.
+
+    Таблица base не копируется: записи tail хранятся в небольшой TermTable, а для
+    каждой из них двоичным поиском находится место в порядке сортировки base (после
+    записей с тем же ключом — как при устойчивой сортировке). Так процесс видит новые
+    термины общей таблицы, не дожидаясь построения ее нового поколения.
+
+    Записи нумеруются как в файле: сначала записи base, затем записи tail.
+
+    Аргументы:
+        base (TermTable): Таблица (обычно MappedTermTable).
+        tail (iterable): Записи Term, дописанные после записей base, в порядке следования в файле.
+    """
+
+    __slots__ = ("_base", "_tail", "_tail_positions")
+
+    def __init__(self, base, tail):
+        self._base = base
+        self._tail = TermTable(tail)
+        # Позиции записей tail (в порядке их сортировки) в общем порядке сортировки, по возрастанию
+        self._tail_positions = array("I", (base.bisect_right(self._tail.key(k)) + k for k in range(len(self._tail))))
+
+    def __len__(self):
+        return len(self._base) + len(self._tail)
+
+    def _split(self, i):
+        """Возвращает таблицу, в которой хранится запись с номером i, и номер записи в ней."""
+        size = len(self._base)
+        return (self._base, i) if i < size else (self._tail, i - size)
+
+    def term(self, i):
+        table, i = self._split(i)
+        return table.term(i)
+
+    def definition(self, i):
+        table, i = self._split(i)
+        return table.definition(i)
+
+    def source(self, i):
+        table, i = self._split(i)
+        return table.source(i)
+
+    def _index(self, position):
+        """Возвращает номер записи на позиции position (в порядке сортировки)."""
+        k = bisect.bisect_left(self._tail_positions, position)
+        if k < len(self._tail_positions) and self._tail_positions[k] == position:
+            return len(self._base) + self._tail._order[k]
+        return self._base._order[position - k]
+
+    def row(self, position):
+        i = self._index(position)
+        return TermRow(position + 1, self.term(i), self.definition(i))
+
+    def key(self, position):
+        return self.term(self._index(position)).lower()
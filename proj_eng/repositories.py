@@ -0,0 +1,1488 @@
+"""
+Модуль хранилищ данных (репозиториев) для терминов, текстов и тестов.
+
+Модули `terms_work`, `texts_work` и `tests_work` не работают с файлами напрямую,
+а обращаются к репозиторию, который возвращает функция `get_repository()`.
+Реализация выбирается настройкой `DATA_BACKEND`:
+- "csv" (по умолчанию): CsvRepository, данные хранятся в файлах `./data/*.csv`.
+- "sqlite": SqliteRepository, данные хранятся в индексированной базе SQLite
+  (путь задается настройкой `DATA_SQLITE_PATH`).
+
+Перенести данные из CSV в SQLite можно командой:
+    python manage.py import_csv_data
+
+Классы:
+- BaseRepository: Интерфейс репозитория.
+- CsvRepository: Репозиторий поверх CSV файлов.
+- SqliteRepository: Репозиторий поверх SQLite (WAL, индекс по ключу сортировки термина).
+"""
+
+import bisect
+import contextlib
+import datetime
+import heapq
+import itertools
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import uuid
+from array import array
+
+from django.conf import settings
+
+from . import csv_reader
+from . import metrics
+from .records import MappedTermTable, Question, TailedTermTable, Term, TermRow, TermTable, Text
+
+try:
+    import fcntl
+except ImportError:  # Windows: межпроцессная блокировка недоступна
+    fcntl = None
+
+# Пути к CSV файлам с данными
+TERMS_FILE = "./data/terms.csv"
+TEXTS_FILE = "./data/texts.csv"
+TESTS_FILE = "./data/tests.csv"
+# Файл блокировки. Отдельный файл нужен потому, что compact_terms подменяет сам CSV файл.
+TERMS_LOCK_FILE = "./data/terms.csv.lock"
+# Количество строк в одном отсортированном отрезке при слиянии (ограничивает память при импорте)
+MERGE_RUN_SIZE = 100_000
+# Суффикс файла индекса смещений рядом с CSV файлом текстов или тестов (./data/texts.csv.idx)
+TEXTS_INDEX_SUFFIX = ".idx"
+# Заголовок файла индекса: метка формата, st_mtime_ns и st_size CSV файла, количество строк
+_TEXTS_INDEX_HEADER = struct.Struct("<4sQQQ")
+_TEXTS_INDEX_MAGIC = b"TIX1"
+# Индекс тестов хранит еще и номера строк (номера вопросов)
+_TESTS_INDEX_MAGIC = b"QIX2"
+# Суффикс файла общей таблицы терминов рядом с CSV файлом терминов (./data/terms.csv.table)
+TERMS_TABLE_SUFFIX = ".table"
+# Заголовок файла таблицы: метка формата, номер поколения, st_ino, st_size и st_mtime_ns файла терминов
+_TERMS_TABLE_HEADER = struct.Struct("<8sQQQQ")
+_TERMS_TABLE_MAGIC = b"PETABLE1"
+# Новое поколение таблицы дополняется строками из конца файла, если их не больше этой доли
+# таблицы; иначе (и после подмены файла) таблица строится из CSV заново
+TERMS_TABLE_EXTEND_RATIO = 0.1
+# Сколько строк, дописанных в файл терминов после поколения общей таблицы, процессы читают
+# поверх него (TailedTermTable), прежде чем строится новое поколение
+TERMS_TABLE_MAX_TAIL = 1000
+# Суффикс файла с меткой эпохи ленты изменений словаря (./data/terms.csv.epoch)
+TERMS_EPOCH_SUFFIX = ".epoch"
+
+
+class BaseRepository:
+    """
+    Интерфейс репозитория данных.
+
+    Термины в методах, возвращающих таблицу, представлены записями TermRow
+    (номер, термин, определение), где номер — позиция термина в словаре,
+    отсортированном по термину без учета регистра (начиная с 1).
+    Типы записей описаны в модуле `records`.
+    """
+
+    def terms_version(self):
+        """Возвращает значение, которое меняется при каждом изменении словаря."""
+        raise NotImplementedError
+
+    def data_version(self, name):
+        """
+        Возвращает значение, которое меняется при каждом изменении данных.
+
+        Аргументы:
+            name (str): Вид данных: "terms", "texts" или "tests".
+        """
+        raise NotImplementedError
+
+    def data_modified(self, name):
+        """
+        Возвращает время последнего изменения данных (datetime в UTC) или None, если оно неизвестно.
+
+        Аргументы:
+            name (str): Вид данных: "terms", "texts" или "tests".
+        """
+        raise NotImplementedError
+
+    def get_terms(self):
+        """Возвращает весь словарь в формате таблицы."""
+        raise NotImplementedError
+
+    def get_term_rows(self):
+        """Возвращает все термины как записи Term (термин, определение, источник)."""
+        raise NotImplementedError
+
+    def get_term_rows_since(self, position):
+        """
+        Возвращает термины, добавленные после позиции position.
+
+        Позиция — непрозрачное значение, которое вернул предыдущий вызов (None
+        при первом вызове). Если позиция больше недействительна (файл уплотнен
+        или база импортирована заново), возвращаются все термины.
+
+        Строки — итерируемые записи Term; хранилище может читать их лениво, поэтому
+        их нужно перебрать один раз, не сохраняя список целиком без необходимости.
+
+        Возвращает:
+            tuple: (строки, новая позиция, True если возвращены все термины с начала).
+        """
+        raise NotImplementedError
+
+    def get_term_changes(self, since, limit):
+        """
+        Возвращает изменения словаря с номером больше since (ленту изменений).
+
+        Каждый добавленный термин получает порядковый номер изменения (начиная с 1),
+        номера только растут в пределах эпохи. Эпоха меняется, когда порядок
+        терминов в хранилище перестраивается (импорт или уплотнение CSV файла,
+        повторный импорт базы SQLite): прежние номера тогда недействительны, и клиент
+        должен заново загрузить словарь целиком (`get_terms_snapshot`).
+
+        Аргументы:
+            since (int): Номер последнего изменения, которое уже есть у клиента (0 — ни одного).
+            limit (int): Максимальное количество изменений.
+
+        Возвращает:
+            tuple: (эпоха (str), номер последнего изменения в хранилище,
+                    список пар (номер изменения, Term) в порядке номеров).
+        """
+        raise NotImplementedError
+
+    def get_terms_snapshot(self):
+        """
+        Возвращает словарь целиком для первой синхронизации по ленте изменений.
+
+        Возвращает:
+            tuple: (эпоха, номер последнего изменения, итерируемые записи Term в порядке номеров).
+        """
+        raise NotImplementedError
+
+    def count_terms(self):
+        """Возвращает количество терминов в словаре."""
+        raise NotImplementedError
+
+    def get_terms_page(self, offset, limit):
+        """Возвращает не более limit строк таблицы, начиная с позиции offset."""
+        raise NotImplementedError
+
+    def get_terms_after(self, term, limit, position=None):
+        """
+        Возвращает не более limit строк таблицы, следующих за термином term.
+
+        position — номер термина term в словаре (номер последней строки предыдущей
+        страницы), если он известен: строки нумеруются с position + 1. Хранилище,
+        которое не может дешево найти номер термина (SQLite), без position
+        возвращает строки без номеров (cnt=None).
+        """
+        raise NotImplementedError
+
+    def search_terms(self, prefix, limit):
+        """
+        Возвращает не более limit строк таблицы, термины которых начинаются с prefix.
+
+        Номера строк, как и в `get_terms_after` без position, могут быть None.
+        """
+        raise NotImplementedError
+
+    def add_term(self, term, definition, source="user"):
+        """Добавляет термин в словарь."""
+        raise NotImplementedError
+
+    def add_terms(self, records, source="db"):
+        """
+        Добавляет много терминов за один проход, пропуская дубликаты.
+
+        Дубликатом считается термин, ключ которого (`term_key`) совпадает с ключом
+        термина, уже имеющегося в словаре или встретившегося раньше в records.
+
+        Аргументы:
+            records (iterable): Пары (термин, определение).
+            source (str): Источник новых терминов.
+
+        Возвращает:
+            dict: {"added": добавлено, "duplicates": пропущено дубликатов}.
+        """
+        raise NotImplementedError
+
+    def compact_terms(self):
+        """Уплотняет хранилище терминов и возвращает их количество."""
+        raise NotImplementedError
+
+    def get_texts(self):
+        """Возвращает тексты как записи Text (номер, текст, перевод)."""
+        raise NotImplementedError
+
+    def count_texts(self):
+        """Возвращает количество текстов."""
+        raise NotImplementedError
+
+    def get_texts_page(self, offset, limit):
+        """Возвращает не более limit текстов, начиная с позиции offset."""
+        raise NotImplementedError
+
+    def get_text(self, number):
+        """Возвращает текст с номером number (начиная с 1) как запись Text или None."""
+        raise NotImplementedError
+
+    def get_tests(self):
+        """Возвращает тесты как записи Question (номер, текст, страна)."""
+        raise NotImplementedError
+
+    def count_tests(self):
+        """Возвращает количество вопросов теста."""
+        raise NotImplementedError
+
+    def get_tests_at(self, positions):
+        """
+        Возвращает вопросы на позициях positions как записи Question в порядке positions.
+
+        Позиция — место вопроса среди всех вопросов, упорядоченных по номеру (с 0).
+
+        Читаются только эти вопросы, без загрузки всех тестов. Позиции вне
+        диапазона пропускаются.
+        """
+        raise NotImplementedError
+
+    def get_tests_by_numbers(self, numbers):
+        """Возвращает вопросы с номерами numbers как записи Question (отсутствующие пропускаются)."""
+        raise NotImplementedError
+
+
+@contextlib.contextmanager
+def _terms_file_lock(exclusive):
+    """
+    Захватывает межпроцессную блокировку файла терминов.
+
+    Писатели берут исключительную блокировку, читатели — разделяемую, поэтому
+    читатель никогда не увидит наполовину дописанную строку.
+
+    Аргументы:
+        exclusive (bool): True для записи, False для чтения.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(TERMS_LOCK_FILE, "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def _file_key(path):
+    """
+    Возвращает ключ версии файла: время модификации (в наносекундах) и размер.
+
+    Аргументы:
+        path (str): Путь к файлу.
+
+    Возвращает:
+        tuple: Пара (st_mtime_ns, st_size).
+    """
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def term_key(term):
+    """
+    Возвращает ключ термина для поиска дубликатов: без лишних пробелов и без учета регистра.
+
+    Пример:
+        term_key("  New   York ")  # "new york"
+    """
+    return " ".join(term.split()).casefold()
+
+
+def _write_run(entries, directory):
+    """
+    Сортирует отрезок строк и записывает его во временный файл.
+
+    Аргументы:
+        entries (list): Тройки (ключ, происхождение, строка файла).
+        directory (str): Каталог временных файлов.
+
+    Возвращает:
+        str: Путь к файлу отрезка.
+    """
+    entries.sort()
+    fd, path = tempfile.mkstemp(suffix=".run.tmp", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines(line for _, _, line in entries)
+    return path
+
+
+def _write_runs(lines, origin, directory):
+    """
+    Разбивает строки на отсортированные отрезки по `MERGE_RUN_SIZE` строк.
+
+    Аргументы:
+        lines (iterable): Строки файла терминов (с переводом строки в конце).
+        origin (int): Происхождение строк: 0 — словарь, 1 — новые термины.
+        directory (str): Каталог временных файлов.
+
+    Возвращает:
+        list: Пути к файлам отрезков.
+    """
+    paths = []
+    entries = []
+    for line in lines:
+        entries.append((term_key(line.split(";", 1)[0]), origin, line))
+        if len(entries) >= MERGE_RUN_SIZE:
+            paths.append(_write_run(entries, directory))
+            entries = []
+    if entries:
+        paths.append(_write_run(entries, directory))
+    return paths
+
+
+def _read_run(path, origin):
+    """Читает отрезок как тройки (ключ, происхождение, строка) в порядке сортировки."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield term_key(line.split(";", 1)[0]), origin, line
+
+
+def _read_terms(path):
+    """
+    Разбирает CSV файл с терминами.
+
+    Аргументы:
+        path (str): Путь к файлу.
+
+    Возвращает:
+        TermTable: Колоночная таблица терминов.
+    """
+    with _terms_file_lock(exclusive=False):
+        return TermTable(csv_reader.iter_terms(path))
+
+
+def _build_line_index(path, fields, extra=False):
+    """
+    Строит индекс смещений строк CSV файла текстов или тестов.
+
+    Эта функция:
+    - Читает файл в двоичном режиме и запоминает начало и конец каждой строки в байтах.
+    - Проверяет строки так же, как `csv_reader.parse_lines`: пустые и некорректные
+      строки в индекс не попадают, поэтому номер текста совпадает с номером в `iter_texts`.
+    - Запоминает номер каждой строки в файле (номер вопроса в `iter_tests`).
+
+    Аргументы:
+        path (str): Путь к CSV файлу.
+        fields (int): Количество полей в строке.
+        extra (bool): Допускать лишние поля (как в `iter_tests`).
+
+    Возвращает:
+        tuple: Массивы array("Q") начал, концов и номеров строк.
+    """
+    starts = array("Q")
+    ends = array("Q")
+    numbers = array("Q")
+    bounds = [0, 0]
+
+    def lines(f):
+        position = len(f.readline())  # Пропускаем заголовок
+        for raw in f:
+            bounds[0] = position
+            position += len(raw)
+            bounds[1] = position
+            yield raw.decode("utf-8")
+
+    with open(path, "rb") as f:
+        # parse_lines разбирает строку сразу после того, как получит ее, поэтому
+        # bounds в момент yield — границы именно этой строки
+        for number, _ in csv_reader.parse_lines(lines(f), fields, path, extra):
+            starts.append(bounds[0])
+            ends.append(bounds[1])
+            numbers.append(number)
+    return starts, ends, numbers
+
+
+def _load_line_index(index_path, key, magic=_TEXTS_INDEX_MAGIC, parts=2):
+    """
+    Читает индекс смещений из файла, если он построен для версии key CSV файла.
+
+    Аргументы:
+        index_path (str): Путь к файлу индекса.
+        key (tuple): Ключ версии CSV файла (см. `_file_key`).
+        magic (bytes): Метка формата индекса.
+        parts (int): Количество массивов в индексе.
+
+    Возвращает:
+        tuple | None: Массивы индекса или None, если файла нет или он устарел.
+    """
+    try:
+        with open(index_path, "rb") as f:
+            found, mtime_ns, size, count = _TEXTS_INDEX_HEADER.unpack(f.read(_TEXTS_INDEX_HEADER.size))
+            if found != magic or (mtime_ns, size) != key:
+                return None
+            arrays = tuple(array("Q") for _ in range(parts))
+            for part in arrays:
+                part.fromfile(f, count)
+    except (OSError, struct.error, EOFError):
+        return None
+    return arrays
+
+
+def _save_line_index(index_path, key, arrays, magic=_TEXTS_INDEX_MAGIC):
+    """
+    Записывает массивы индекса смещений в файл через временный файл и атомарную замену.
+
+    Если каталог недоступен для записи, индекс остается только в памяти процесса.
+    """
+    directory = os.path.dirname(index_path) or "."
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_TEXTS_INDEX_HEADER.pack(magic, *key, len(arrays[0])))
+            for part in arrays:
+                part.tofile(f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+
+
+def _read_epoch(path):
+    """Возвращает метку эпохи из файла или пустую строку, если файла нет."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def _write_epoch(path):
+    """
+    Записывает новую случайную метку эпохи через временный файл и атомарную замену.
+
+    Возвращает:
+        str: Новая метка или "0", если каталог недоступен для записи.
+    """
+    token = uuid.uuid4().hex
+    directory = os.path.dirname(path) or "."
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    except OSError:
+        return "0"
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(token)
+        os.replace(tmp_path, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        return "0"
+    return token
+
+
+def _source_key(st):
+    """Возвращает ключ версии файла терминов для заголовка таблицы: (st_ino, st_size, st_mtime_ns)."""
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _open_terms_table(path):
+    """
+    Отображает файл общей таблицы терминов в память (только для чтения).
+
+    Возвращает:
+        tuple | None: (номер поколения, ключ версии файла терминов, MappedTermTable)
+                      или None, если файла нет или он записан в другом формате.
+    """
+    try:
+        with open(path, "rb") as f:
+            # Отображение остается действительным после закрытия файла и после его подмены
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # ValueError: файл пустой
+        return None
+    try:
+        magic, generation, *source = _TERMS_TABLE_HEADER.unpack_from(buffer)
+        if magic != _TERMS_TABLE_MAGIC:
+            return None
+        return generation, tuple(source), MappedTermTable(buffer, _TERMS_TABLE_HEADER.size)
+    except (struct.error, ValueError, TypeError):
+        return None
+
+
+def _save_terms_table(path, generation, source, chunks):
+    """
+    Записывает новое поколение таблицы во временный файл и атомарно подменяет им прежний.
+
+    Процессы, которые отобразили прежнее поколение, продолжают читать его, пока не
+    заметят подмену (файл удаляется ОС после закрытия последнего отображения).
+
+    Возвращает:
+        bool: True, если файл записан; False, если каталог недоступен для записи.
+    """
+    directory = os.path.dirname(path) or "."
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_TERMS_TABLE_HEADER.pack(_TERMS_TABLE_MAGIC, generation, *source))
+            f.writelines(chunks)
+        os.replace(tmp_path, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        return False
+    return True
+
+
+class CsvRepository(BaseRepository):
+    """
+    Репозиторий поверх CSV файлов в каталоге `./data`.
+
+    Разобранное содержимое файла терминов хранится в памяти процесса в виде
+    колоночной таблицы TermTable (хранилище терминов) и переиспользуется всеми запросами, пока у файла не
+    изменятся время модификации или размер, либо пока не будет вызван `add_term`.
+
+    Новые термины дописываются в конец файла под межпроцессной блокировкой,
+    сортировка выполняется при чтении. Метод `compact_terms` переписывает файл
+    в отсортированном виде через атомарную замену.
+
+    Для файла текстов рядом с ним хранится индекс смещений строк (`texts.csv.idx`),
+    который перестраивается при изменении файла. Страница текстов и отдельный
+    текст читаются через mmap по смещениям из индекса, без разбора остальных строк.
+    Так же (индекс `tests.csv.idx` с номерами вопросов) читаются отдельные вопросы
+    теста для сессии теста.
+
+    При shared_table=True таблица терминов не разбирается в каждом процессе, а хранится
+    в общем файле `terms.csv.table` (MappedTermTable), который все процессы отображают
+    в память. Термины, дописанные `add_term`, процессы читают из конца CSV файла поверх
+    отображенного поколения (TailedTermTable), поэтому запись одного термина не
+    переписывает таблицу. Новое поколение строится и атомарно подменяет прежнее, когда
+    таких строк становится больше `TERMS_TABLE_MAX_TAIL`, а также после `add_terms`,
+    `compact_terms` и импорта, которые переписывают CSV файл целиком.
+    """
+
+    def __init__(self, terms_file=TERMS_FILE, texts_file=TEXTS_FILE, tests_file=TESTS_FILE, shared_table=False):
+        self.terms_file = terms_file
+        self.shared_table = shared_table
+        self.terms_table_file = terms_file + TERMS_TABLE_SUFFIX
+        self.terms_epoch_file = terms_file + TERMS_EPOCH_SUFFIX
+        self.texts_file = texts_file
+        self.tests_file = tests_file
+        self.texts_index_file = texts_file + TEXTS_INDEX_SUFFIX
+        self.tests_index_file = tests_file + TEXTS_INDEX_SUFFIX
+        # Индекс смещений текстов: ключ версии файла текстов и массивы начал и концов строк
+        self._texts_index = {"key": None, "starts": array("Q"), "ends": array("Q")}
+        self._texts_index_lock = threading.Lock()
+        # Индекс смещений тестов: то же и номера вопросов (по возрастанию)
+        self._tests_index = {"key": None, "starts": array("Q"), "ends": array("Q"), "numbers": array("Q")}
+        self._tests_index_lock = threading.Lock()
+        # Хранилище терминов: ключ версии файла и колоночная таблица. Словарь целиком
+        # заменяется новым при перезагрузке, поэтому читатели без блокировки
+        # всегда видят согласованное состояние.
+        self._store = {"key": None, "table": TermTable(())}
+        self._store_lock = threading.Lock()
+        # Блокировка записи между потоками одного процесса (fcntl работает на уровне процессов)
+        self._write_lock = threading.Lock()
+
+    def _get_store(self):
+        """
+        Возвращает актуальное хранилище терминов, перечитывая файл только при его изменении.
+
+        Эта функция:
+        - Сравнивает ключ версии файла с ключом, под которым были разобраны данные.
+        - Если ключи совпадают, возвращает уже разобранные данные без обращения к файлу.
+        - Иначе под блокировкой перечитывает файл и строит отсортированную таблицу
+          (или отображает общую таблицу, см. `_load_terms`).
+
+        Возвращает:
+            dict: Хранилище с ключами "key" и "table".
+        """
+        key = _file_key(self.terms_file)
+        store = self._store
+        if store["key"] == key:
+            metrics.cache_access("terms_store", True)
+            return store
+        with self._store_lock:
+            metrics.cache_access("terms_store", self._store["key"] == key)
+            if self._store["key"] != key:
+                # Таблица сортируется при построении, поэтому порядок строк в файле не важен
+                self._store = {"key": key, "table": self._load_terms()}
+            return self._store
+
+    def _load_terms(self):
+        """
+        Возвращает таблицу терминов для хранилища.
+
+        Эта функция:
+        - Без общей таблицы разбирает CSV файл в памяти процесса (TermTable).
+        - С общей таблицей отображает файл таблицы, если он построен для текущей версии
+          CSV файла. Если после поколения в CSV файл только дописывались строки и их
+          не больше `TERMS_TABLE_MAX_TAIL`, читает их поверх поколения (TailedTermTable).
+          Иначе строит новое поколение (см. `_write_terms_table`).
+
+        Возвращает:
+            TermTable: Таблица терминов (MappedTermTable или TailedTermTable для общей таблицы).
+        """
+        if not self.shared_table:
+            return _read_terms(self.terms_file)
+        with _terms_file_lock(exclusive=False):
+            f = open(self.terms_file, "rb")
+            st = os.fstat(f.fileno())
+            opened = _open_terms_table(self.terms_table_file)
+        if opened is not None and opened[1] == _source_key(st):
+            f.close()
+            metrics.cache_access("terms_table", True)
+            return opened[2]
+        if opened is not None and opened[1][0] == st.st_ino and 0 < opened[1][1] <= st.st_size:
+            # Файл закрывает генератор `_read_tail`, в том числе при досрочной остановке
+            rows = self._read_tail(f, opened[1][1], st.st_size, False)
+            with contextlib.closing(rows):
+                tail = list(itertools.islice(rows, TERMS_TABLE_MAX_TAIL + 1))
+            if len(tail) <= TERMS_TABLE_MAX_TAIL:
+                metrics.cache_access("terms_table", True)
+                return TailedTermTable(opened[2], tail)
+        else:
+            f.close()
+        with self._write_lock, _terms_file_lock(exclusive=True):
+            return self._write_terms_table()
+
+    def _write_terms_table(self):
+        """
+        Строит новое поколение общей таблицы терминов для текущей версии CSV файла.
+
+        Эта функция:
+        - Вызывается под исключительной блокировкой файла терминов.
+        - Если другой процесс уже построил таблицу для этой версии файла, возвращает ее.
+        - Если в CSV файл с прежнего поколения только дописывались строки (тот же inode),
+          а новых строк немного (`TERMS_TABLE_EXTEND_RATIO`), дополняет прежнее поколение
+          строками из конца файла без разбора и сортировки всего файла.
+        - Иначе разбирает CSV файл целиком.
+        - Записывает поколение во временный файл и атомарно подменяет им прежнее.
+          Если записать файл нельзя, таблица остается только в памяти процесса.
+
+        Возвращает:
+            MappedTermTable: Таблица нового поколения.
+        """
+        st = os.stat(self.terms_file)
+        source = _source_key(st)
+        current = _open_terms_table(self.terms_table_file)
+        if current is not None and current[1] == source:
+            metrics.cache_access("terms_table", True)
+            return current[2]
+        metrics.cache_access("terms_table", False)
+        chunks = None
+        generation = 1
+        if current is not None:
+            generation = current[0] + 1
+            inode, size, _ = current[1]
+            table = current[2]
+            if inode == st.st_ino and 0 < size <= st.st_size:
+                tail = list(self._read_tail(open(self.terms_file, "rb"), size, st.st_size, False))
+                if len(tail) <= len(table) * TERMS_TABLE_EXTEND_RATIO:
+                    chunks = table.extend(tail)
+        if chunks is None:
+            chunks = MappedTermTable.encode(TermTable(csv_reader.iter_terms(self.terms_file)))
+        if _save_terms_table(self.terms_table_file, generation, source, chunks):
+            opened = _open_terms_table(self.terms_table_file)
+            if opened is not None:
+                return opened[2]
+        return MappedTermTable(b"".join(chunks))
+
+    def _invalidate_store(self):
+        """
+        Сбрасывает хранилище терминов, чтобы следующий запрос перечитал файл.
+        """
+        with self._store_lock:
+            self._store = {"key": None, "table": TermTable(())}
+
+    def terms_version(self):
+        return self._get_store()["key"]
+
+    def data_file(self, name):
+        """
+        Возвращает путь к CSV файлу с данными.
+
+        Аргументы:
+            name (str): Вид данных: "terms", "texts" или "tests".
+        """
+        return {"terms": self.terms_file, "texts": self.texts_file, "tests": self.tests_file}[name]
+
+    def export_state(self, name):
+        """
+        Возвращает разобранные данные из памяти процесса для снимка (см. модуль `snapshot`).
+
+        Если данные еще не разобраны или файл изменился, файл читается как обычно.
+
+        Аргументы:
+            name (str): Вид данных: "terms" (таблица TermTable) или "texts" (индекс смещений).
+
+        Возвращает:
+            tuple: (ключ версии файла, данные): TermTable или пара массивов начал и концов строк.
+        """
+        if name == "terms":
+            store = self._get_store()
+            return store["key"], store["table"]
+        index = self._get_texts_index()
+        return index["key"], (index["starts"], index["ends"])
+
+    def import_state(self, name, key, data):
+        """
+        Подставляет разобранные данные из снимка вместо чтения CSV файла.
+
+        Аргументы:
+            name (str): Вид данных: "terms" или "texts".
+            key (tuple): Ключ версии файла (см. `data_version`), которому соответствуют данные.
+            data: Данные в том же виде, что возвращает `export_state`.
+        """
+        if name == "terms":
+            with self._store_lock:
+                self._store = {"key": key, "table": data}
+            return
+        starts, ends = data
+        with self._texts_index_lock:
+            self._texts_index = {"key": key, "starts": starts, "ends": ends}
+
+    def data_version(self, name):
+        # Для версии достаточно os.stat: файл не перечитывается
+        return _file_key(self.data_file(name))
+
+    def data_modified(self, name):
+        return datetime.datetime.fromtimestamp(os.stat(self.data_file(name)).st_mtime, tz=datetime.timezone.utc)
+
+    def get_terms(self):
+        table = self._get_store()["table"]
+        return table.rows(0, len(table))
+
+    def get_term_rows(self):
+        return list(self._get_store()["table"])
+
+    def get_term_rows_since(self, position):
+        # Позиция — (inode файла, смещение в байтах). Новые термины только дописываются
+        # в конец, поэтому достаточно дочитать хвост файла. Уплотнение подменяет файл
+        # (меняется inode) — тогда файл читается с начала.
+        # Если файл не менялся, достаточно os.stat: файл не открывается и не блокируется
+        if isinstance(position, tuple):
+            st = os.stat(self.terms_file)
+            if (st.st_ino, st.st_size) == position:
+                return [], position, False
+        with _terms_file_lock(exclusive=False):
+            f = open(self.terms_file, "rb")
+            st = os.fstat(f.fileno())
+        reset = (not isinstance(position, tuple) or position[0] != st.st_ino
+                 or position[1] > st.st_size)
+        if not reset and position[1] == st.st_size:
+            f.close()
+            return [], position, False
+        rows = self._read_tail(f, 0 if reset else position[1], st.st_size, reset)
+        return rows, (st.st_ino, st.st_size), reset
+
+    def _read_tail(self, f, start, end, skip_header):
+        """
+        Лениво читает термины из открытого файла от смещения start до end.
+
+        Блокировка для чтения не нужна: в файл только дописываются целые строки,
+        а уплотнение и импорт подменяют файл новым (открытый дескриптор продолжает
+        указывать на прежний), поэтому до размера end, зафиксированного под
+        блокировкой, содержимое не меняется.
+        """
+        def lines():
+            remaining = end - start
+            for line in f:
+                if remaining <= 0:
+                    break
+                line = line[:remaining]
+                remaining -= len(line)
+                yield line.decode("utf-8")
+
+        with f:
+            f.seek(start)
+            tail = lines()
+            if skip_header:
+                next(tail, None)
+            try:
+                for _, (term, definition, source) in csv_reader.parse_lines(tail, 3, self.terms_file):
+                    yield Term(term, definition, source.strip())
+            finally:
+                metrics.inc("proj_eng_file_read_bytes_total", f.tell() - start, file=self.terms_file)
+
+    def _terms_epoch(self):
+        """
+        Возвращает эпоху ленты изменений: метку из файла `terms.csv.epoch` и inode файла терминов.
+
+        Метка меняется при импорте и уплотнении (они переписывают файл в другом порядке),
+        inode — при любой подмене файла, в том числе вручную. Если файла метки нет,
+        он создается.
+        """
+        token = _read_epoch(self.terms_epoch_file)
+        if not token:
+            with self._write_lock, _terms_file_lock(exclusive=True):
+                token = _read_epoch(self.terms_epoch_file) or _write_epoch(self.terms_epoch_file)
+        return f"{token}.{os.stat(self.terms_file).st_ino}"
+
+    def _terms_feed(self):
+        """
+        Возвращает эпоху и таблицу терминов, относящиеся к одной версии файла.
+
+        Номер изменения — номер записи в порядке следования в файле плюс 1: новые
+        термины только дописываются в конец, поэтому номера записей не меняются
+        до подмены файла (смены эпохи). Если файл подменили во время чтения
+        таблицы, эпоха до и после чтения различается, и чтение повторяется.
+        """
+        while True:
+            epoch = self._terms_epoch()
+            table = self._get_store()["table"]
+            if self._terms_epoch() == epoch:
+                return epoch, table
+
+    def get_term_changes(self, since, limit):
+        epoch, table = self._terms_feed()
+        start = max(since, 0)
+        stop = min(start + limit, len(table))
+        return epoch, len(table), [(i + 1, table.record(i)) for i in range(start, stop)]
+
+    def get_terms_snapshot(self):
+        epoch, table = self._terms_feed()
+        return epoch, len(table), iter(table)
+
+    def count_terms(self):
+        return len(self._get_store()["table"])
+
+    def get_terms_page(self, offset, limit):
+        return self._get_store()["table"].rows(offset, offset + limit)
+
+    def get_terms_after(self, term, limit, position=None):
+        # Номер термина находится бинарным поиском, переданная позиция не нужна
+        table = self._get_store()["table"]
+        start = table.bisect_right(term.lower())
+        return table.rows(start, start + limit)
+
+    def search_terms(self, prefix, limit):
+        table = self._get_store()["table"]
+        prefix = prefix.lower()
+        start = table.bisect_left(prefix)
+        found = []
+        for row in table.rows(start, start + limit):
+            if not row.term.lower().startswith(prefix):
+                break
+            found.append(row)
+        return found
+
+    def add_term(self, term, definition, source="user"):
+        """
+        Добавляет новый термин в конец файла CSV.
+
+        Эта функция:
+        - Захватывает исключительную блокировку файла терминов (между процессами и потоками).
+        - Дописывает одну строку в конец файла, не перечитывая и не сортируя остальные.
+        - Сбрасывает данные на диск (fsync) до снятия блокировки.
+        - Сбрасывает хранилище терминов, чтобы страницы увидели новое слово. Общая таблица
+          терминов не переписывается: новая строка читается поверх нее (см. `_load_terms`).
+        """
+        new_term_line = f"{term};{definition};{source}\n"
+        with self._write_lock, _terms_file_lock(exclusive=True):
+            with open(self.terms_file, "ab+") as f:
+                # Файл может заканчиваться без перевода строки — тогда добавляем его перед новой строкой
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        new_term_line = "\n" + new_term_line
+                f.write(new_term_line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+        self._invalidate_store()
+
+    def add_terms(self, records, source="db"):
+        """
+        Добавляет много терминов одним проходом внешнего слияния.
+
+        Эта функция:
+        - Разбивает новые термины на отсортированные по ключу отрезки во временных файлах
+          (в памяти одновременно не больше `MERGE_RUN_SIZE` строк).
+        - Под исключительной блокировкой так же разбивает на отрезки текущий файл терминов.
+        - Сливает все отрезки (heapq.merge) в новый отсортированный файл. Одинаковые ключи
+          оказываются рядом, поэтому дубликаты отбрасываются без индекса в памяти:
+          строки словаря сохраняются все, новая строка пропускается, если ее ключ совпал
+          с предыдущей строкой.
+        - Сбрасывает файл на диск и атомарно подменяет им файл терминов.
+        """
+        directory = os.path.dirname(os.path.abspath(self.terms_file))
+        tmp_path = self.terms_file + ".tmp"
+        new_lines = (f"{term};{definition};{source}\n" for term, definition in records)
+        new_runs = _write_runs(new_lines, 1, directory)
+        existing_runs = []
+        added = duplicates = 0
+        try:
+            with self._write_lock, _terms_file_lock(exclusive=True):
+                with open(self.terms_file, "r", encoding="utf-8") as f:
+                    title = f.readline()
+                    existing = (line if line.endswith("\n") else line + "\n" for line in f if line.strip())
+                    existing_runs = _write_runs(existing, 0, directory)
+                readers = [_read_run(path, 0) for path in existing_runs] + [_read_run(path, 1) for path in new_runs]
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(title if title.endswith("\n") else title + "\n")
+                    last_key = None
+                    for key, origin, line in heapq.merge(*readers):
+                        if origin == 1:
+                            if key == last_key:
+                                duplicates += 1
+                                continue
+                            added += 1
+                        f.write(line)
+                        last_key = key
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.terms_file)
+                # Термины перемешаны со словарем: номера ленты изменений начинаются заново
+                _write_epoch(self.terms_epoch_file)
+                if self.shared_table:
+                    self._write_terms_table()
+        finally:
+            for path in existing_runs + new_runs:
+                os.remove(path)
+        self._invalidate_store()
+        return {"added": added, "duplicates": duplicates}
+
+    def compact_terms(self):
+        """
+        Переписывает файл терминов в отсортированном виде.
+
+        Эта функция:
+        - Захватывает исключительную блокировку файла терминов.
+        - Сортирует все строки по термину без учета регистра.
+        - Записывает результат во временный файл рядом с исходным и сбрасывает его на диск.
+        - Атомарно подменяет исходный файл (os.replace), поэтому читатели видят
+          либо старую, либо новую версию файла целиком.
+        """
+        tmp_path = self.terms_file + ".tmp"
+        with self._write_lock, _terms_file_lock(exclusive=True):
+            with open(self.terms_file, "r", encoding="utf-8") as f:
+                lines = [l.strip("\n") for l in f.readlines()]
+            title = lines[0]
+            terms_sorted = [l for l in lines[1:] if l.strip()]
+            terms_sorted.sort(key=lambda l: l.split(";", 1)[0].lower())
+
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join([title] + terms_sorted) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.terms_file)
+            _write_epoch(self.terms_epoch_file)
+            if self.shared_table:
+                self._write_terms_table()
+        self._invalidate_store()
+        return len(terms_sorted)
+
+    def get_texts(self):
+        return list(csv_reader.iter_texts(self.texts_file))
+
+    def _get_texts_index(self):
+        """
+        Возвращает актуальный индекс смещений текстов.
+
+        Эта функция:
+        - Если ключ версии файла текстов не изменился, возвращает индекс из памяти.
+        - Иначе читает индекс из файла `texts_index_file`, а если он устарел или
+          отсутствует — строит индекс заново и сохраняет его в файл.
+
+        Возвращает:
+            dict: Индекс с ключами "key", "starts" и "ends".
+        """
+        key = _file_key(self.texts_file)
+        index = self._texts_index
+        if index["key"] == key:
+            metrics.cache_access("texts_index", True)
+            return index
+        with self._texts_index_lock:
+            metrics.cache_access("texts_index", self._texts_index["key"] == key)
+            if self._texts_index["key"] != key:
+                bounds = _load_line_index(self.texts_index_file, key)
+                if bounds is None:
+                    bounds = _build_line_index(self.texts_file, 3)[:2]
+                    _save_line_index(self.texts_index_file, key, bounds)
+                self._texts_index = {"key": key, "starts": bounds[0], "ends": bounds[1]}
+            return self._texts_index
+
+    def _read_texts(self, first, last):
+        """
+        Читает тексты с позиции first до last (не включая) по смещениям из индекса.
+
+        Через mmap читается только участок файла от начала первого до конца
+        последнего нужного текста.
+        """
+        index = self._get_texts_index()
+        starts, ends = index["starts"], index["ends"]
+        last = min(last, len(starts))
+        if first >= last:
+            return []
+        texts = []
+        with open(self.texts_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Файл мог измениться после построения индекса: такие смещения не читаются
+            if ends[last - 1] > len(mm):
+                return []
+            for number in range(first, last):
+                line = mm[starts[number]:ends[number]].decode("utf-8").rstrip("\r\n")
+                text, definition, _ = line.split(";")
+                texts.append(Text(number + 1, text, definition))
+        metrics.inc("proj_eng_file_read_bytes_total", ends[last - 1] - starts[first], file=self.texts_file)
+        return texts
+
+    def count_texts(self):
+        return len(self._get_texts_index()["starts"])
+
+    def get_texts_page(self, offset, limit):
+        return self._read_texts(offset, offset + limit)
+
+    def get_text(self, number):
+        if number < 1:
+            return None
+        texts = self._read_texts(number - 1, number)
+        return texts[0] if texts else None
+
+    def get_tests(self):
+        return list(csv_reader.iter_tests(self.tests_file))
+
+    def _get_tests_index(self):
+        """
+        Возвращает актуальный индекс смещений тестов (как `_get_texts_index`).
+
+        Возвращает:
+            dict: Индекс с ключами "key", "starts", "ends" и "numbers".
+        """
+        key = _file_key(self.tests_file)
+        index = self._tests_index
+        if index["key"] == key:
+            metrics.cache_access("tests_index", True)
+            return index
+        with self._tests_index_lock:
+            metrics.cache_access("tests_index", self._tests_index["key"] == key)
+            if self._tests_index["key"] != key:
+                bounds = _load_line_index(self.tests_index_file, key, _TESTS_INDEX_MAGIC, 3)
+                if bounds is None:
+                    bounds = _build_line_index(self.tests_file, 2, extra=True)
+                    _save_line_index(self.tests_index_file, key, bounds, _TESTS_INDEX_MAGIC)
+                self._tests_index = {"key": key, "starts": bounds[0], "ends": bounds[1], "numbers": bounds[2]}
+            return self._tests_index
+
+    def _read_tests(self, index, positions):
+        """Читает вопросы на позициях positions индекса через mmap, в порядке позиций."""
+        starts, ends, numbers = index["starts"], index["ends"], index["numbers"]
+        positions = [position for position in positions if 0 <= position < len(starts)]
+        if not positions:
+            return []
+        tests = []
+        with open(self.tests_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Файл мог измениться после построения индекса: такие смещения не читаются
+            if max(ends[position] for position in positions) > len(mm):
+                return []
+            for position in positions:
+                line = mm[starts[position]:ends[position]].decode("utf-8").rstrip("\r\n")
+                # Лишние поля отбрасываются, как в `csv_reader.iter_tests`
+                text, country = line.split(";")[:2]
+                tests.append(Question(numbers[position], text.strip(), country.strip()))
+        metrics.inc("proj_eng_file_read_bytes_total",
+                    sum(ends[position] - starts[position] for position in positions), file=self.tests_file)
+        return tests
+
+    def count_tests(self):
+        return len(self._get_tests_index()["starts"])
+
+    def get_tests_at(self, positions):
+        return self._read_tests(self._get_tests_index(), positions)
+
+    def get_tests_by_numbers(self, numbers):
+        index = self._get_tests_index()
+        indexed = index["numbers"]
+        positions = []
+        for number in numbers:
+            position = bisect.bisect_left(indexed, number)
+            if position < len(indexed) and indexed[position] == number:
+                positions.append(position)
+        return self._read_tests(index, positions)
+
+
+# Схема базы SQLite. Ключи терминов считаются в Python, как в CSV хранилище
+# (lower() SQLite меняет регистр только у латиницы):
+# - sort_key — термин в нижнем регистре (str.lower), ключ сортировки: индекс по нему
+#   используется для сортировки, постраничного вывода, курсоров и поиска по префиксу;
+# - term_key — ключ дубликатов (`term_key`), индекс по нему — для поиска дубликатов.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    source TEXT NOT NULL,
+    sort_key TEXT NOT NULL,
+    term_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS terms_sort_key ON terms (sort_key, id);
+CREATE INDEX IF NOT EXISTS terms_term_key ON terms (term_key);
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    country TEXT NOT NULL
+);
+"""
+
+
+# Столбцы ключей терминов в SQLite и функции, которыми они считаются (см. SQLITE_SCHEMA)
+_KEY_COLUMNS = {"sort_key": str.lower, "term_key": term_key}
+# Количество терминов, которые читаются одним запросом при выдаче словаря целиком
+SQLITE_SNAPSHOT_CHUNK = 1000
+# Наибольшее количество номеров в одном запросе WHERE id IN (...) (ограничение SQLite на число параметров)
+SQLITE_MAX_PARAMS = 500
+
+
+class SqliteRepository(BaseRepository):
+    """
+    Репозиторий поверх базы SQLite.
+
+    - База открывается в режиме WAL: читатели не блокируют писателя и друг друга.
+    - Для каждого потока открывается свое соединение.
+    - Все запросы параметризованы, поэтому sqlite3 кэширует их подготовленные выражения.
+    - Сортировка, страницы и поиск по префиксу идут по индексу sort_key
+      без просмотра всей таблицы. Номер строки в словаре SQLite может найти
+      только подсчетом всех предшествующих строк, поэтому курсоры
+      (`get_terms_after`, `search_terms`) его не считают.
+
+    Аргументы:
+        path (str): Путь к файлу базы данных.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._tests_ids = {"version": None, "ids": array("q")}
+        self._tests_ids_lock = threading.Lock()
+
+    def connection(self):
+        """
+        Возвращает соединение с базой для текущего потока, создавая схему при первом обращении.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._add_key_columns(conn)
+            conn.executescript(SQLITE_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _add_key_columns(conn):
+        """
+        Добавляет столбцы ключей (`_KEY_COLUMNS`) в таблицу терминов базы, созданной до их появления.
+
+        Старый индекс по lower(term) удаляется: он сортировал не так, как CSV хранилище.
+        """
+        def missing():
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(terms)")}
+            return [name for name in _KEY_COLUMNS if columns and name not in columns]
+
+        if not missing():
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name in missing():
+                conn.execute(f"ALTER TABLE terms ADD COLUMN {name} TEXT NOT NULL DEFAULT ''")
+                rows = conn.execute("SELECT id, term FROM terms").fetchall()
+                conn.executemany(f"UPDATE terms SET {name} = ? WHERE id = ?",
+                                 [(_KEY_COLUMNS[name](term), term_id) for term_id, term in rows])
+            conn.execute("DROP INDEX IF EXISTS terms_term_lower")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def _numbered(self, rows, first, record=TermRow):
+        return [record(cnt, term, definition) for cnt, (term, definition) in enumerate(rows, first)]
+
+    def terms_version(self):
+        # Термины только добавляются, поэтому пара (количество, максимальный id) меняется при каждой записи
+        return tuple(self.connection().execute("SELECT count(*), max(id) FROM terms").fetchone())
+
+    def data_version(self, name):
+        if name not in ("terms", "texts", "tests"):
+            raise KeyError(name)
+        return tuple(self.connection().execute(f"SELECT count(*), max(id) FROM {name}").fetchone())
+
+    def data_modified(self, name):
+        # В режиме WAL новые записи сначала попадают в файл журнала
+        mtimes = [os.stat(path).st_mtime for path in (self.path, self.path + "-wal") if os.path.exists(path)]
+        if not mtimes:
+            return None
+        return datetime.datetime.fromtimestamp(max(mtimes), tz=datetime.timezone.utc)
+
+    def get_terms(self):
+        rows = self.connection().execute(
+            "SELECT term, definition FROM terms ORDER BY sort_key, id"
+        ).fetchall()
+        return self._numbered(rows, 1)
+
+    def get_term_rows(self):
+        rows = self.connection().execute("SELECT term, definition, source FROM terms ORDER BY id")
+        return [Term(*row) for row in rows]
+
+    def get_term_rows_since(self, position):
+        # Позиция — последний прочитанный id. Если база импортирована заново, id начинаются сначала.
+        conn = self.connection()
+        last_id = conn.execute("SELECT coalesce(max(id), 0) FROM terms").fetchone()[0]
+        # Позиция другого хранилища (например, сохраненная CSV хранилищем) тоже считается недействительной
+        reset = not isinstance(position, int) or position > last_id
+        rows = conn.execute(
+            "SELECT term, definition, source FROM terms WHERE id > ? AND id <= ? ORDER BY id",
+            (0 if reset else position, last_id),
+        )
+        return [Term(*row) for row in rows], last_id, reset
+
+    def _terms_epoch(self, conn):
+        # Эпоха — user_version базы: import_from увеличивает его, когда id начинаются заново
+        return f"sqlite.{conn.execute('PRAGMA user_version').fetchone()[0]}"
+
+    def get_term_changes(self, since, limit):
+        # Номер изменения — id термина: термины только добавляются, id растут
+        conn = self.connection()
+        epoch = self._terms_epoch(conn)
+        last_id = conn.execute("SELECT coalesce(max(id), 0) FROM terms").fetchone()[0]
+        rows = conn.execute(
+            "SELECT id, term, definition, source FROM terms WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+            (since, last_id, limit),
+        ).fetchall()
+        return epoch, last_id, [(row[0], Term(*row[1:])) for row in rows]
+
+    def get_terms_snapshot(self):
+        conn = self.connection()
+        epoch = self._terms_epoch(conn)
+        last_id = conn.execute("SELECT coalesce(max(id), 0) FROM terms").fetchone()[0]
+        return epoch, last_id, self._iter_terms_until(last_id)
+
+    def _iter_terms_until(self, last_id):
+        """
+        Перебирает термины с id не больше last_id пачками по `SQLITE_SNAPSHOT_CHUNK`.
+
+        Каждая пачка читается отдельным запросом (по ключу id) через соединение того
+        потока, в котором идет перебор: ответ потоком под ASGI перебирается не в том
+        потоке, где был создан генератор, а объекты sqlite3 привязаны к потоку.
+        """
+        after = 0
+        while True:
+            rows = self.connection().execute(
+                "SELECT id, term, definition, source FROM terms WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                (after, last_id, SQLITE_SNAPSHOT_CHUNK),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield Term(*row[1:])
+            after = rows[-1][0]
+
+    def count_terms(self):
+        return self.connection().execute("SELECT count(*) FROM terms").fetchone()[0]
+
+    def get_terms_page(self, offset, limit):
+        rows = self.connection().execute(
+            "SELECT term, definition FROM terms ORDER BY sort_key, id LIMIT ? OFFSET ?",
+            (limit, offset),
+        ).fetchall()
+        return self._numbered(rows, offset + 1)
+
+    def _unnumbered(self, rows):
+        return [TermRow(None, term, definition) for term, definition in rows]
+
+    def get_terms_after(self, term, limit, position=None):
+        rows = self.connection().execute(
+            "SELECT term, definition FROM terms WHERE sort_key > ? ORDER BY sort_key, id LIMIT ?",
+            (term.lower(), limit),
+        ).fetchall()
+        if position is None and term:
+            return self._unnumbered(rows)
+        return self._numbered(rows, (position or 0) + 1)
+
+    def search_terms(self, prefix, limit):
+        key = prefix.lower()
+        rows = self.connection().execute(
+            "SELECT term, definition FROM terms WHERE sort_key >= ? AND sort_key < ? "
+            "ORDER BY sort_key, id LIMIT ?",
+            (key, key + "\U0010ffff", limit),
+        ).fetchall()
+        return self._unnumbered(rows)
+
+    def add_term(self, term, definition, source="user"):
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO terms (term, definition, source, sort_key, term_key) VALUES (?, ?, ?, ?, ?)",
+                (term, definition, source, term.lower(), term_key(term)),
+            )
+
+    def add_terms(self, records, source="db"):
+        # Все термины вставляются в одной транзакции; дубликаты отсекаются по индексу term_key,
+        # как в CSV хранилище
+        conn = self.connection()
+        total = 0
+
+        def rows():
+            nonlocal total
+            for term, definition in records:
+                total += 1
+                key = term_key(term)
+                yield term, definition, source, term.lower(), key, key
+
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO terms (term, definition, source, sort_key, term_key) SELECT ?, ?, ?, ?, ? "
+                "WHERE NOT EXISTS (SELECT 1 FROM terms WHERE term_key = ?)",
+                rows(),
+            )
+            added = conn.total_changes - before
+        return {"added": added, "duplicates": total - added}
+
+    def compact_terms(self):
+        conn = self.connection()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return self.count_terms()
+
+    def get_texts(self):
+        rows = self.connection().execute("SELECT text, definition FROM texts ORDER BY id").fetchall()
+        return self._numbered(rows, 1, Text)
+
+    def count_texts(self):
+        return self.connection().execute("SELECT count(*) FROM texts").fetchone()[0]
+
+    def get_texts_page(self, offset, limit):
+        rows = self.connection().execute(
+            "SELECT text, definition FROM texts ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return self._numbered(rows, offset + 1, Text)
+
+    def get_text(self, number):
+        if number < 1:
+            return None
+        row = self.connection().execute(
+            "SELECT text, definition FROM texts ORDER BY id LIMIT 1 OFFSET ?", (number - 1,)
+        ).fetchone()
+        return Text(number, *row) if row else None
+
+    def get_tests(self):
+        rows = self.connection().execute("SELECT id, text, country FROM tests ORDER BY id")
+        return [Question(*row) for row in rows]
+
+    def count_tests(self):
+        return self.connection().execute("SELECT count(*) FROM tests").fetchone()[0]
+
+    def _get_tests_ids(self):
+        """
+        Возвращает номера вопросов по позициям (индекс позиция -> id, как `CsvRepository._get_tests_index`).
+
+        Индекс строится одним запросом по первичному ключу и перестраивается, только
+        если тесты импортированы заново (`import_from` увеличивает user_version базы)
+        или изменился максимальный id. Проверка версии не просматривает таблицу.
+
+        Возвращает:
+            array: Номера (id) всех вопросов в порядке возрастания.
+        """
+        conn = self.connection()
+        version = (conn.execute("PRAGMA user_version").fetchone()[0],
+                   conn.execute("SELECT max(id) FROM tests").fetchone()[0])
+        index = self._tests_ids
+        if index["version"] == version:
+            metrics.cache_access("tests_index", True)
+            return index["ids"]
+        with self._tests_ids_lock:
+            metrics.cache_access("tests_index", self._tests_ids["version"] == version)
+            if self._tests_ids["version"] != version:
+                ids = array("q", (row[0] for row in conn.execute("SELECT id FROM tests ORDER BY id")))
+                self._tests_ids = {"version": version, "ids": ids}
+            return self._tests_ids["ids"]
+
+    def _select_tests(self, numbers):
+        """Читает вопросы с номерами numbers одним запросом на пачку и возвращает их в порядке numbers."""
+        conn = self.connection()
+        found = {}
+        numbers = list(numbers)
+        # Число параметров запроса в SQLite ограничено, поэтому номера передаются пачками
+        for start in range(0, len(numbers), SQLITE_MAX_PARAMS):
+            chunk = numbers[start:start + SQLITE_MAX_PARAMS]
+            rows = conn.execute(
+                f"SELECT id, text, country FROM tests WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for row in rows:
+                found[row[0]] = Question(*row)
+        return [found[number] for number in numbers if number in found]
+
+    def get_tests_at(self, positions):
+        ids = self._get_tests_ids()
+        return self._select_tests(ids[position] for position in positions if 0 <= position < len(ids))
+
+    def get_tests_by_numbers(self, numbers):
+        return self._select_tests(numbers)
+
+    def import_from(self, repository):
+        """
+        Заменяет содержимое базы данными другого репозитория в одной транзакции.
+
+        Аргументы:
+            repository (BaseRepository): Источник данных (обычно CsvRepository).
+
+        Возвращает:
+            dict: Количество импортированных терминов, текстов и тестов.
+        """
+        terms = repository.get_term_rows()
+        texts = repository.get_texts()
+        tests = repository.get_tests()
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM terms")
+            conn.execute("DELETE FROM texts")
+            conn.execute("DELETE FROM tests")
+            conn.executemany(
+                "INSERT INTO terms (term, definition, source, sort_key, term_key) VALUES (?, ?, ?, ?, ?)",
+                [(term, definition, source, term.lower(), term_key(term)) for term, definition, source in terms],
+            )
+            conn.executemany(
+                "INSERT INTO texts (text, definition, source) VALUES (?, ?, 'db')",
+                [(text, definition) for _, text, definition in texts],
+            )
+            conn.executemany("INSERT INTO tests (id, text, country) VALUES (?, ?, ?)", tests)
+            # id терминов начинаются заново: новая эпоха ленты изменений
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        return {"terms": len(terms), "texts": len(texts), "tests": len(tests)}
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_repository():
+    """
+    Возвращает репозиторий данных, выбранный настройкой `DATA_BACKEND`.
+
+    Репозиторий создается один раз на процесс и переиспользуется всеми запросами.
+
+    Возвращает:
+        BaseRepository: CsvRepository или SqliteRepository.
+
+    Исключения:
+        ValueError: Если в настройке указан неизвестный тип хранилища.
+    """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                backend = getattr(settings, "DATA_BACKEND", "csv")
+                if backend == "csv":
+                    _repository = CsvRepository(shared_table=getattr(settings, "DATA_SHARED_TABLE", False))
+                elif backend == "sqlite":
+                    _repository = SqliteRepository(settings.DATA_SQLITE_PATH)
+                else:
+                    raise ValueError(f"Неизвестное хранилище данных: {backend}")
+    return _repository
@@ -0,0 +1,349 @@
+"""
+Модуль журнала результатов теста и статистики сложности вопросов.
+
+Каждая проверенная попытка теста дописывается в конец двоичного файла
+`./data/test_results.log` и никогда не переписывается. Запись попытки —
+время и количество ответов, затем на каждый ответ номер вопроса, признак
+правильного ответа и (для неправильного) нормализованный ответ в UTF-8.
+
+Статистика ведется накопительно (агрегат), так же как статистика словаря в
+модуле `terms_work`: общее количество попыток и ответов, а по каждому вопросу —
+количество ответов, правильных ответов и самые частые неправильные ответы.
+Агрегат сохраняется в файл `./data/test_results.json` (не чаще раза в
+`SAVE_INTERVAL` секунд) вместе с позицией в журнале, до которой он посчитан,
+поэтому при каждом обновлении (в том числе после перезапуска процесса) из
+журнала читаются только новые записи.
+
+Частые неправильные ответы считаются алгоритмом Space-Saving: у вопроса хранится
+не больше `WRONG_ANSWERS_TRACKED` ответов, и новый ответ вытесняет самый редкий,
+наследуя его счетчик. Память не растет с количеством разных ответов, а ответы,
+которые дают часто, остаются в списке.
+
+Функции:
+- record_results(submissions, now): Дописывает проверенные попытки в журнал.
+- get_results_stats(limit): Общая статистика теста и самые сложные вопросы.
+- data_version(), data_modified(): Версия журнала для кэша страниц (см. модуль `page_cache`).
+"""
+
+import contextlib
+import datetime
+import heapq
+import json
+import os
+import struct
+import threading
+import time
+
+from .metrics import timed
+from .repositories import get_repository
+from .tests_work import normalize_answer
+
+try:
+    import fcntl
+except ImportError:  # Windows: межпроцессная блокировка недоступна
+    fcntl = None
+
+# Журнал результатов и файл с сохраненным агрегатом
+RESULTS_FILE = "./data/test_results.log"
+RESULTS_STATS_FILE = "./data/test_results.json"
+# Сколько неправильных ответов хранится у одного вопроса и сколько из них показывается
+WRONG_ANSWERS_TRACKED = 20
+WRONG_ANSWERS_SHOWN = 3
+# Вопросы с меньшим количеством ответов не попадают в список самых сложных
+MIN_ATTEMPTS = 3
+# Количество самых сложных вопросов на странице статистики
+HARDEST_LIMIT = 10
+# Минимальный интервал между сохранениями агрегата в файл, секунд: после перезапуска
+# процесса из журнала дочитываются записи, сделанные после последнего сохранения
+SAVE_INTERVAL = 60
+
+# Заголовок попытки: время (Unix-время) и количество ответов
+_SUBMISSION = struct.Struct("<II")
+# Ответ: номер вопроса, правильный ли ответ, длина неправильного ответа в байтах; за ним сам ответ
+_ANSWER = struct.Struct("<IBB")
+_MAX_ANSWER_BYTES = 255
+
+# Агрегат статистики в памяти процесса (None — еще не загружен) и время его последнего сохранения
+_aggregate = None
+_aggregate_lock = threading.Lock()
+_saved_at = 0.0
+# Статистика для страницы: ключ (позиция в журнале, версия тестов, limit) и результат
+_stats = {"key": None, "stats": None}
+
+
+@contextlib.contextmanager
+def _file_lock(f, exclusive):
+    """Захватывает межпроцессную блокировку журнала (исключительную для записи)."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def data_version():
+    """
+    Возвращает ключ версии журнала результатов: (st_ino, st_size) или None, если журнала еще нет.
+
+    Журнал только дописывается, поэтому любая новая попытка меняет его размер.
+    """
+    try:
+        st = os.stat(RESULTS_FILE)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size
+
+
+def data_modified():
+    """Возвращает время последней записи в журнал (datetime в UTC) или None, если журнала еще нет."""
+    try:
+        mtime = os.stat(RESULTS_FILE).st_mtime
+    except FileNotFoundError:
+        return None
+    return datetime.datetime.fromtimestamp(mtime, tz=datetime.timezone.utc)
+
+
+def _encode_answer(answer):
+    """Возвращает нормализованный ответ в UTF-8, обрезанный до `_MAX_ANSWER_BYTES` по границе символа."""
+    encoded = normalize_answer(answer).encode("utf-8")
+    if len(encoded) > _MAX_ANSWER_BYTES:
+        encoded = encoded[:_MAX_ANSWER_BYTES].decode("utf-8", "ignore").encode("utf-8")
+    return encoded
+
+
+@timed
+def record_results(submissions, now=None):
+    """
+    Дописывает проверенные попытки теста в журнал результатов.
+
+    Эта функция:
+    - Кодирует каждую попытку одной записью (см. описание модуля); для правильного
+      ответа сам ответ не хранится.
+    - Дописывает все записи в конец журнала одной операцией записи под
+      исключительной блокировкой.
+    - Агрегат не меняет: новые записи учитываются при следующем обновлении
+      статистики (см. `get_results_stats`), в том числе в других процессах.
+
+    Аргументы:
+        submissions (list): Списки кортежей (номер, текст, ответ, правильный ответ, верно ли),
+            как "submitted_data" в результате `tests_work.grade_submission`.
+        now (int): Время попыток (Unix-время), по умолчанию — time.time().
+
+    Пример:
+        record_results([result["submitted_data"]])
+    """
+    now = int(time.time()) if now is None else now
+    chunks = []
+    for submitted_data in submissions:
+        if not submitted_data:
+            continue
+        chunks.append(_SUBMISSION.pack(now, len(submitted_data)))
+        for cnt, _, user_input, _, is_correct in submitted_data:
+            encoded = b"" if is_correct else _encode_answer(user_input)
+            chunks.append(_ANSWER.pack(cnt, bool(is_correct), len(encoded)) + encoded)
+    if not chunks:
+        return
+    with open(RESULTS_FILE, "ab") as f, _file_lock(f, exclusive=True):
+        f.write(b"".join(chunks))
+
+
+def _empty_aggregate():
+    """
+    Возвращает пустой агрегат статистики теста.
+
+    Возвращает:
+        dict: Словарь с ключами:
+            - "inode", "offset": Файл журнала и позиция в нем, до которой учтены записи.
+            - "submissions", "answers", "correct": Количество попыток, ответов и правильных ответов.
+            - "questions": {номер вопроса: [ответов, правильных, {неправильный ответ: счетчик}]}.
+    """
+    return {"inode": None, "offset": 0, "submissions": 0, "answers": 0, "correct": 0, "questions": {}}
+
+
+def _load_aggregate():
+    """
+    Загружает агрегат из файла `RESULTS_STATS_FILE`.
+
+    Возвращает:
+        dict: Агрегат статистики. Если файла нет или он поврежден — пустой агрегат.
+    """
+    try:
+        with open(RESULTS_STATS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        aggregate = _empty_aggregate()
+        for key in ("inode", "offset", "submissions", "answers", "correct"):
+            aggregate[key] = data[key]
+        # В JSON ключи словаря — строки, а номера вопросов — числа
+        aggregate["questions"] = {int(cnt): entry for cnt, entry in data["questions"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return _empty_aggregate()
+    return aggregate
+
+
+def _save_aggregate(aggregate):
+    """Сохраняет агрегат в файл `RESULTS_STATS_FILE` через атомарную замену."""
+    tmp_path = f"{RESULTS_STATS_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(aggregate, f, ensure_ascii=False)
+    os.replace(tmp_path, RESULTS_STATS_FILE)
+
+
+def _track_wrong(wrong, answer):
+    """Учитывает неправильный ответ в сводке Space-Saving (не больше `WRONG_ANSWERS_TRACKED` ответов)."""
+    if answer in wrong:
+        wrong[answer] += 1
+    elif len(wrong) < WRONG_ANSWERS_TRACKED:
+        wrong[answer] = 1
+    else:
+        rare = min(wrong, key=wrong.get)
+        wrong[answer] = wrong.pop(rare) + 1
+
+
+def _replay(data, aggregate):
+    """
+    Учитывает в агрегате записи журнала из буфера data.
+
+    Возвращает:
+        int: Количество разобранных байт (неполная попытка в конце буфера не разбирается).
+    """
+    position = 0
+    size = len(data)
+    questions = aggregate["questions"]
+    while position + _SUBMISSION.size <= size:
+        _, count = _SUBMISSION.unpack_from(data, position)
+        cursor = position + _SUBMISSION.size
+        answers = []
+        for _ in range(count):
+            if cursor + _ANSWER.size > size:
+                return position
+            cnt, is_correct, length = _ANSWER.unpack_from(data, cursor)
+            cursor += _ANSWER.size
+            if cursor + length > size:
+                return position
+            answers.append((cnt, is_correct, data[cursor:cursor + length].decode("utf-8", "replace")))
+            cursor += length
+        for cnt, is_correct, answer in answers:
+            entry = questions.get(cnt)
+            if entry is None:
+                entry = questions[cnt] = [0, 0, {}]
+            entry[0] += 1
+            if is_correct:
+                entry[1] += 1
+            else:
+                _track_wrong(entry[2], answer)
+        aggregate["submissions"] += 1
+        aggregate["answers"] += count
+        aggregate["correct"] += sum(is_correct for _, is_correct, _ in answers)
+        position = cursor
+    return position
+
+
+def _refresh_aggregate():
+    """
+    Дополняет агрегат записями, дописанными в журнал с прошлого обновления.
+
+    Эта функция:
+    - При первом вызове загружает агрегат из файла `RESULTS_STATS_FILE`.
+    - Если журнал не вырос, возвращает агрегат без чтения журнала.
+    - Иначе под разделяемой блокировкой читает только хвост журнала после
+      сохраненной позиции и сохраняет дополненный агрегат в файл, если с прошлого
+      сохранения прошло не меньше `SAVE_INTERVAL` секунд.
+    - Если журнал заменен (другой inode) или стал короче, считает агрегат заново.
+
+    Возвращает:
+        dict: Актуальный агрегат.
+    """
+    global _aggregate, _saved_at
+    with _aggregate_lock:
+        if _aggregate is None:
+            _aggregate = _load_aggregate()
+        try:
+            st = os.stat(RESULTS_FILE)
+        except FileNotFoundError:
+            return _aggregate
+        aggregate = _aggregate
+        changed = False
+        if aggregate["inode"] != st.st_ino or st.st_size < aggregate["offset"]:
+            aggregate = _empty_aggregate()
+            aggregate["inode"] = st.st_ino
+            changed = True
+        if st.st_size > aggregate["offset"]:
+            with open(RESULTS_FILE, "rb") as f, _file_lock(f, exclusive=False):
+                f.seek(aggregate["offset"])
+                data = f.read()
+            parsed = _replay(data, aggregate)
+            aggregate["offset"] += parsed
+            changed = changed or parsed > 0
+        if changed and time.monotonic() - _saved_at >= SAVE_INTERVAL:
+            _save_aggregate(aggregate)
+            _saved_at = time.monotonic()
+        _aggregate = aggregate
+        return aggregate
+
+
+@timed
+def get_results_stats(limit=HARDEST_LIMIT):
+    """
+    Возвращает статистику теста из накопительного агрегата.
+
+    Эта функция:
+    - Дополняет агрегат новыми записями журнала (см. `_refresh_aggregate`).
+    - Если с прошлого вызова журнал и тесты не изменились, возвращает прежний результат.
+    - Выбирает не больше limit вопросов с самой низкой долей правильных ответов
+      (не меньше `MIN_ATTEMPTS` ответов, хотя бы один неправильный) за один проход
+      по агрегату, без сортировки всех вопросов.
+    - Читает из репозитория тексты только выбранных вопросов.
+
+    Аргументы:
+        limit (int): Количество самых сложных вопросов.
+
+    Возвращает:
+        dict: Словарь с ключами:
+            - "submissions": Количество попыток.
+            - "answers": Количество ответов.
+            - "correct_rate": Доля правильных ответов, в процентах.
+            - "hardest": Список словарей {"cnt", "text", "attempts", "correct_rate",
+              "wrong": [(ответ, счетчик), ...]} по возрастанию доли правильных ответов.
+
+    Пример возвращаемого значения:
+        {
+            "submissions": 120,
+            "answers": 1200,
+            "correct_rate": 64.5,
+            "hardest": [{"cnt": 17, "text": "...", "attempts": 40, "correct_rate": 12.5,
+                         "wrong": [("германия", 21), ("австрия", 9)]}, ...]
+        }
+    """
+    global _stats
+    aggregate = _refresh_aggregate()
+    repository = get_repository()
+    key = (aggregate["inode"], aggregate["offset"], repository.data_version("tests"), limit)
+    cached = _stats
+    if cached["key"] == key:
+        return cached["stats"]
+    candidates = ((cnt, entry) for cnt, entry in aggregate["questions"].items()
+                  if entry[0] >= MIN_ATTEMPTS and entry[1] < entry[0])
+    hardest = heapq.nsmallest(limit, candidates, key=lambda item: (item[1][1] / item[1][0], -item[1][0], item[0]))
+    texts = {question.cnt: question.text
+             for question in repository.get_tests_by_numbers([cnt for cnt, _ in hardest])}
+    answers = aggregate["answers"]
+    stats = {
+        "submissions": aggregate["submissions"],
+        "answers": answers,
+        "correct_rate": aggregate["correct"] / answers * 100 if answers else 0,
+        "hardest": [
+            {
+                "cnt": cnt,
+                "text": texts.get(cnt, ""),
+                "attempts": attempts,
+                "correct_rate": correct / attempts * 100,
+                "wrong": sorted(wrong.items(), key=lambda item: -item[1])[:WRONG_ANSWERS_SHOWN],
+            }
+            for cnt, (attempts, correct, wrong) in hardest
+        ],
+    }
+    _stats = {"key": key, "stats": stats}
+    return stats
@@ -0,0 +1,370 @@
+"""
+Модуль интервального повторения слов из словаря (алгоритм SM-2).
+
+Каждое слово словаря — карточка "термин → определение". Ученик оценивает,
+насколько хорошо вспомнил определение, по шкале от 0 до 5, и по этой оценке
+вычисляется срок следующего повторения: чем лучше ответ, тем дольше интервал.
+
+Хранение:
+- История оценок дописывается в конец двоичного файла `./data/reviews.log`
+  (несколько байт заголовка и термин в UTF-8 на одну оценку) и никогда не переписывается.
+- Состояние карточек восстанавливается повторным применением истории при первом
+  обращении; затем из файла дочитываются только новые записи (в том числе
+  записанные другими процессами).
+- У каждого ученика карточки, которые он уже видел, лежат в куче (heapq) по сроку
+  повторения, поэтому N ближайших карточек выбираются за O(N log n).
+- Новые слова — термины словаря, которых нет среди карточек ученика. Чтобы не
+  просматривать каждый раз уже изученное начало словаря, у колоды хранится
+  граница: термин, до которого включительно ученик видел все слова словаря.
+  Граница действительна, пока словарь не изменился (новый термин мог встать
+  перед ней), иначе просмотр начинается с начала словаря.
+
+Функции:
+- sm2(card, grade, now): Вычисляет новое состояние карточки после оценки.
+- get_due_cards(learner, limit): Карточки, которые пора повторить, и новые слова.
+- grade_card(learner, term, grade): Записывает оценку и возвращает новое состояние карточки.
+"""
+
+import contextlib
+import hashlib
+import heapq
+import os
+import struct
+import threading
+import time
+
+from .metrics import timed
+from .records import Card
+from .repositories import get_repository
+
+try:
+    import fcntl
+except ImportError:  # Windows: межпроцессная блокировка недоступна
+    fcntl = None
+
+# Файл истории оценок
+REVIEWS_FILE = "./data/reviews.log"
+# Допустимые оценки: 0 — не вспомнил, 5 — вспомнил сразу; 3 и выше — успешное повторение
+MIN_GRADE = 0
+MAX_GRADE = 5
+PASS_GRADE = 3
+# Начальный и минимальный коэффициент легкости SM-2
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+DAY_SECONDS = 24 * 60 * 60
+# Сколько терминов словаря читается за один запрос при поиске новых слов
+NEW_CARDS_BATCH = 100
+
+# Запись истории: хэш ученика (8 байт), время оценки (Unix-время), оценка, длина термина в байтах;
+# за заголовком следует сам термин в UTF-8
+_RECORD = struct.Struct("<8sIBH")
+# Наибольшая длина термина в байтах, которая помещается в запись истории
+MAX_TERM_BYTES = 0xFFFF
+
+# Колоды учеников и позиция, до которой прочитан файл истории
+_schedule = {"inode": None, "offset": 0, "decks": {}}
+_schedule_lock = threading.Lock()
+
+
+class _Deck:
+    """
+    Карточки одного ученика.
+
+    Атрибуты:
+        cards (dict): Состояние карточек по ключу термина (термин в нижнем регистре).
+        heap (list): Куча пар (срок, ключ). При повторной оценке старая пара не удаляется,
+                     а пропускается при выборке, если ее срок не совпадает со сроком карточки.
+        frontier (str): Термин, до которого включительно ученик уже видел все слова
+                        словаря: новые слова ищутся после него.
+        frontier_version: Версия словаря (`terms_version` репозитория), для которой
+                          посчитана граница.
+    """
+
+    __slots__ = ("cards", "heap", "frontier", "frontier_version")
+
+    def __init__(self):
+        self.cards = {}
+        self.heap = []
+        self.frontier = ""
+        self.frontier_version = None
+
+    def apply(self, term, grade, now, push=True):
+        """
+        Применяет оценку к карточке и возвращает ее новое состояние.
+
+        При push=False куча не обновляется: после применения пачки записей ее
+        нужно пересобрать методом `rebuild`.
+        """
+        key = term.lower()
+        card = self.cards.get(key)
+        card = sm2(card or Card(term, INITIAL_EASE, 0, 0, now), grade, now)
+        self.cards[key] = card
+        if push:
+            heapq.heappush(self.heap, (card.due, key))
+            # Устаревших пар в куче стало больше, чем карточек — пересобираем кучу
+            if len(self.heap) > 2 * len(self.cards) + 64:
+                self.rebuild()
+        return card
+
+    def rebuild(self):
+        """Пересобирает кучу по текущему состоянию карточек за O(n)."""
+        self.heap = [(card.due, key) for key, card in self.cards.items()]
+        heapq.heapify(self.heap)
+
+    def due(self, now, limit):
+        """Возвращает не более limit карточек со сроком не позже now в порядке срока."""
+        taken = []
+        seen = set()
+        while self.heap and len(taken) < limit and self.heap[0][0] <= now:
+            due, key = heapq.heappop(self.heap)
+            if self.cards[key].due == due and key not in seen:
+                seen.add(key)
+                taken.append((due, key))
+        # Выбранные карточки остаются в колоде до следующей оценки
+        for entry in taken:
+            heapq.heappush(self.heap, entry)
+        return [self.cards[key] for _, key in taken]
+
+
+def sm2(card, grade, now):
+    """
+    Вычисляет новое состояние карточки после оценки по алгоритму SM-2.
+
+    Эта функция:
+    - При оценке ниже `PASS_GRADE` начинает повторение заново: интервал 1 день.
+    - При успешной оценке назначает интервал 1 день, затем 6 дней, затем
+      предыдущий интервал, умноженный на коэффициент легкости.
+    - Изменяет коэффициент легкости в зависимости от оценки (не ниже `MIN_EASE`).
+
+    Аргументы:
+        card (Card): Текущее состояние карточки.
+        grade (int): Оценка от 0 до 5.
+        now (int): Время оценки (Unix-время).
+
+    Возвращает:
+        Card: Новое состояние карточки.
+
+    Пример:
+        sm2(Card("cat", 2.5, 0, 0, 0), 5, 0)  # Card(term='cat', ease=2.6, interval=1, repetitions=1, due=86400)
+    """
+    if grade >= PASS_GRADE:
+        if card.repetitions == 0:
+            interval = 1
+        elif card.repetitions == 1:
+            interval = 6
+        else:
+            interval = round(card.interval * card.ease)
+        repetitions = card.repetitions + 1
+    else:
+        interval = 1
+        repetitions = 0
+    miss = MAX_GRADE - grade
+    ease = max(MIN_EASE, card.ease + 0.1 - miss * (0.08 + miss * 0.02))
+    return Card(card.term, round(ease, 4), interval, repetitions, now + interval * DAY_SECONDS)
+
+
+def _learner_hash(learner):
+    """Возвращает 8-байтовый хэш идентификатора ученика для записи в историю."""
+    return hashlib.blake2b(learner.encode("utf-8"), digest_size=8).digest()
+
+
+@contextlib.contextmanager
+def _file_lock(f, exclusive):
+    """Захватывает межпроцессную блокировку файла истории (исключительную для записи)."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _replay(data, decks):
+    """
+    Применяет записи истории из буфера data к колодам.
+
+    Короткий хвост истории добавляется в кучи по одной записи; если записей
+    больше, чем карточек в колоде (первая загрузка), куча колоды
+    пересобирается один раз в конце.
+
+    Возвращает:
+        int: Количество разобранных байт (неполная запись в конце буфера не разбирается).
+    """
+    position = 0
+    size = len(data)
+    header = _RECORD.size
+    unpack = _RECORD.unpack_from
+    applied = {}
+    while position + header <= size:
+        learner, now, grade, length = unpack(data, position)
+        end = position + header + length
+        if end > size:
+            break
+        deck = decks.get(learner)
+        if deck is None:
+            deck = decks[learner] = _Deck()
+        term = data[position + header:end].decode("utf-8")
+        deck.apply(term, grade, now, push=False)
+        applied.setdefault(learner, set()).add(term.lower())
+        position = end
+    for learner, keys in applied.items():
+        deck = decks[learner]
+        if len(keys) * 2 > len(deck.cards):
+            deck.rebuild()
+        else:
+            for key in keys:
+                heapq.heappush(deck.heap, (deck.cards[key].due, key))
+    return position
+
+
+def _get_schedule():
+    """
+    Возвращает колоды учеников, дочитав из файла истории новые записи.
+
+    Эта функция:
+    - Сравнивает размер файла истории с уже прочитанной позицией.
+    - Если файл не менялся, возвращает колоды без чтения файла.
+    - Иначе под разделяемой блокировкой читает хвост файла и применяет новые записи.
+      Если файл был заменен (другой inode), колоды строятся заново.
+
+    Вызывается под `_schedule_lock`.
+
+    Возвращает:
+        dict: Колоды по хэшу ученика.
+    """
+    global _schedule
+    try:
+        st = os.stat(REVIEWS_FILE)
+    except FileNotFoundError:
+        return _schedule["decks"]
+    schedule = _schedule
+    if schedule["inode"] != st.st_ino:
+        schedule = {"inode": st.st_ino, "offset": 0, "decks": {}}
+    if st.st_size > schedule["offset"]:
+        with open(REVIEWS_FILE, "rb") as f, _file_lock(f, exclusive=False):
+            f.seek(schedule["offset"])
+            data = f.read()
+        schedule["offset"] += _replay(data, schedule["decks"])
+    _schedule = schedule
+    return schedule["decks"]
+
+
+def _find_term(term):
+    """Возвращает строку словаря TermRow для термина (без учета регистра) или None."""
+    rows = get_repository().search_terms(term, 1)
+    if rows and rows[0].term.lower() == term.lower():
+        return rows[0]
+    return None
+
+
+@timed
+def get_due_cards(learner, limit, now=None):
+    """
+    Возвращает карточки для повторения.
+
+    Эта функция:
+    - Берет из кучи ученика не более limit карточек, срок повторения которых наступил.
+    - Если таких карточек меньше limit, добавляет новые слова из словаря, которые
+      ученик еще не видел (по порядку словаря), начиная с границы колоды. Слово,
+      оцененное не по порядку, не сдвигает границу через непросмотренные слова,
+      а термины, добавленные в словарь перед границей, снова попадают в просмотр.
+
+    Аргументы:
+        learner (str): Идентификатор ученика.
+        limit (int): Максимальное количество карточек.
+        now (int): Текущее время (Unix-время), по умолчанию — time.time().
+
+    Возвращает:
+        list: Словари {"term", "definition", "new", "due", "interval", "repetitions"}.
+
+    Пример:
+        get_due_cards("a1b2c3", 10)
+    """
+    now = int(time.time()) if now is None else now
+    with _schedule_lock:
+        deck = _get_schedule().get(_learner_hash(learner)) or _Deck()
+        due = deck.due(now, limit)
+        repository = get_repository()
+        version = repository.terms_version()
+        frontier = deck.frontier if deck.frontier_version == version else ""
+
+    cards = []
+    for card in due:
+        row = _find_term(card.term)
+        if row is not None:
+            cards.append({"term": row.term, "definition": row.definition, "new": False,
+                          "due": card.due, "interval": card.interval, "repetitions": card.repetitions})
+    # Новые слова: словарь после границы, пропуская уже оцененные. Граница сдвигается,
+    # пока подряд идут оцененные слова, и останавливается на первом новом.
+    # Оцененные слова проверяются по колоде пачками под блокировкой, без копии всех ключей колоды
+    cursor = frontier
+    contiguous = True
+    while len(cards) < limit:
+        rows = repository.get_terms_after(cursor, max(limit, NEW_CARDS_BATCH))
+        if not rows:
+            break
+        with _schedule_lock:
+            known = [row.term.lower() in deck.cards for row in rows]
+        for row, seen in zip(rows, known):
+            if seen:
+                if contiguous:
+                    frontier = row.term
+                continue
+            contiguous = False
+            if len(cards) < limit:
+                cards.append({"term": row.term, "definition": row.definition, "new": True,
+                              "due": now, "interval": 0, "repetitions": 0})
+        cursor = rows[-1].term
+    with _schedule_lock:
+        deck.frontier = frontier
+        deck.frontier_version = version
+    return cards
+
+
+@timed
+def grade_card(learner, term, grade, now=None):
+    """
+    Записывает оценку карточки в историю и возвращает новое состояние карточки.
+
+    Эта функция:
+    - Проверяет оценку и наличие термина в словаре.
+    - Дописывает запись в конец файла истории под исключительной блокировкой
+      (одна операция записи в режиме добавления).
+    - Обновляет колоду ученика в памяти по алгоритму SM-2 (см. `sm2`).
+
+    Аргументы:
+        learner (str): Идентификатор ученика.
+        term (str): Термин из словаря.
+        grade (int): Оценка от 0 до 5.
+        now (int): Время оценки (Unix-время), по умолчанию — time.time().
+
+    Возвращает:
+        Card: Новое состояние карточки.
+
+    Исключения:
+        ValueError: Если оценка вне диапазона, термина нет в словаре или он длиннее
+                    `MAX_TERM_BYTES` байт в UTF-8.
+
+    Пример:
+        grade_card("a1b2c3", "cat", 4)
+    """
+    # bool — подкласс int, но True/False не оценка
+    if isinstance(grade, bool) or not isinstance(grade, int) or not MIN_GRADE <= grade <= MAX_GRADE:
+        raise ValueError(f"Оценка должна быть целым числом от {MIN_GRADE} до {MAX_GRADE}")
+    row = _find_term(term)
+    if row is None:
+        raise ValueError("Термина нет в словаре")
+    now = int(time.time()) if now is None else now
+    encoded = row.term.encode("utf-8")
+    if len(encoded) > MAX_TERM_BYTES:
+        raise ValueError(f"Термин длиннее {MAX_TERM_BYTES} байт нельзя оценить")
+    record = _RECORD.pack(_learner_hash(learner), now, grade, len(encoded)) + encoded
+
+    with _schedule_lock:
+        with open(REVIEWS_FILE, "ab") as f, _file_lock(f, exclusive=True):
+            f.write(record)
+        # Колоды дочитывают файл по порядку, включая записи других процессов перед нашей
+        decks = _get_schedule()
+    return decks[_learner_hash(learner)].cards[row.term.lower()]
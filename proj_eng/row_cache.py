@@ -0,0 +1,127 @@
+"""
+Модуль кэша готовых HTML-фрагментов строк таблиц словаря и текстов.
+
+Страницы `term_list.html` и `text_list.html` не перебирают строки циклом
+{% for %}: представление склеивает готовые фрагменты строк. Каждая строка
+рендерится шаблоном из `templates/rows/` (с экранированием) один раз и
+хранится по хэшу своего содержимого, поэтому:
+- после `write_term` рендерится только новая строка — остальные строки
+  словаря не изменились, и их фрагменты остаются в кэше;
+- номер строки термина (он сдвигается при вставке) в хэш не входит и
+  подставляется в готовый фрагмент при склейке.
+
+Кэш хранится в памяти процесса и ограничен `ROW_CACHE_SIZE` фрагментами
+(вытесняются давно не использованные).
+
+Функции:
+- render_rows(kind, rows): HTML строк таблицы "terms" или "texts".
+- clear(): Очищает кэш фрагментов.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from . import metrics
+
+# Максимальное количество фрагментов в кэше
+ROW_CACHE_SIZE = 200_000
+
+# Шаблон строки и входит ли номер строки в ключ кэша. Номер текста нужен в ссылке
+# на страницу текста, а тексты не добавляются через сайт, поэтому номер в ключе не мешает.
+# Текст строки — HTML с подсветкой слов словаря, поэтому после добавления слова, которое
+# встречается в тексте, у строки меняется ключ и она рендерится заново.
+ROW_KINDS = {
+    "terms": ("rows/term_row.html", False),
+    "texts": ("rows/text_row.html", True),
+}
+
+# Метка, вместо которой при рендеринге фрагмента выводится номер строки
+_NUMBER_MARK = "\x00row-number\x00"
+
+_fragments = OrderedDict()
+_lock = threading.Lock()
+
+
+def _row_key(kind, fields):
+    """Возвращает ключ фрагмента: хэш вида таблицы и полей строки."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(kind.encode("utf-8"))
+    for field in fields:
+        digest.update(b"\x1f")
+        digest.update(str(field).encode("utf-8"))
+    return digest.digest()
+
+
+def _render(template, row, numbered):
+    """
+    Рендерит строку шаблоном и возвращает фрагмент как кортеж частей.
+
+    Для строк, номер которых не входит в ключ, шаблон рендерится с меткой вместо
+    номера, и фрагмент разбивается по первой метке: ячейка номера идет в строке
+    раньше содержимого, поэтому метка в самом тексте термина не мешает.
+    """
+    if numbered:
+        return (template.render({"row": row}),)
+    html = template.render({"row": row._replace(cnt=_NUMBER_MARK)})
+    return tuple(html.split(_NUMBER_MARK, 1))
+
+
+def render_rows(kind, rows):
+    """
+    Возвращает HTML строк таблицы, собранный из готовых фрагментов.
+
+    Эта функция:
+    - Для каждой строки ищет фрагмент в кэше по хэшу содержимого.
+    - Отсутствующие фрагменты рендерит шаблоном из `ROW_KINDS` и сохраняет в кэш.
+    - Подставляет номер строки и склеивает фрагменты в одну строку.
+    - Учитывает попадания и промахи в метрике proj_eng_cache_requests_total{cache="row_fragment"}.
+
+    Аргументы:
+        kind (str): Вид таблицы: "terms" (записи TermRow) или "texts" (записи LinkedText).
+        rows (iterable): Строки таблицы.
+
+    Возвращает:
+        SafeString: HTML строк <tr>…</tr> для вставки в <tbody>.
+
+    Пример:
+        render_rows("terms", terms_work.get_terms_page(1, 50))
+    """
+    template_name, numbered = ROW_KINDS[kind]
+    template = None
+    parts = []
+    hits = misses = 0
+    for row in rows:
+        key = _row_key(kind, row if numbered else row[1:])
+        with _lock:
+            fragment = _fragments.get(key)
+            if fragment is not None:
+                _fragments.move_to_end(key)
+        if fragment is None:
+            misses += 1
+            if template is None:
+                template = get_template(template_name)
+            fragment = _render(template, row, numbered)
+            with _lock:
+                _fragments[key] = fragment
+                if len(_fragments) > ROW_CACHE_SIZE:
+                    _fragments.popitem(last=False)
+        else:
+            hits += 1
+        # Строки курсора в SQLite приходят без номеров (cnt=None)
+        parts.append(("" if row[0] is None else str(row[0])).join(fragment))
+    if hits:
+        metrics.inc("proj_eng_cache_requests_total", hits, cache="row_fragment", result="hit")
+    if misses:
+        metrics.inc("proj_eng_cache_requests_total", misses, cache="row_fragment", result="miss")
+    # Фрагменты отрендерены шаблонами с автоэкранированием, номер строки — целое число или пусто
+    return mark_safe("".join(parts))
+
+
+def clear():
+    """Очищает кэш фрагментов (например, после изменения шаблонов строк)."""
+    with _lock:
+        _fragments.clear()
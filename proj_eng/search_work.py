@@ -0,0 +1,238 @@
+"""
+Модуль поиска по словарю.
+
+Здесь реализованы:
+- Поиск терминов по префиксу (автодополнение) с помощью префиксного дерева (trie).
+- Обратный поиск: по началу слова из русского перевода.
+- Поиск с опечатками по индексу триграмм.
+
+Индекс строится в памяти процесса при его старте (`build_index` из
+`snapshot.preload`), а не первым запросом поиска, и затем дополняется только
+новыми терминами (см. `BaseRepository.get_term_rows_since`), поэтому
+добавление слова через `write_term` не требует перестроения индекса.
+
+Функции:
+- build_index(): Строит индекс словаря заранее.
+- search_terms(query, limit): Ищет термины и возвращает список совпадений.
+"""
+
+import re
+import threading
+from collections import Counter
+
+from .metrics import timed
+from .repositories import get_repository
+
+# Порог похожести (коэффициент Дайса по триграммам) для поиска с опечатками
+FUZZY_THRESHOLD = 0.4
+
+# Слова в переводе: последовательности букв и цифр
+_WORD_RE = re.compile(r"\w+")
+
+
+def _trigrams(word):
+    """
+    Возвращает множество триграмм слова, дополненного пробелами по краям.
+
+    Триграмма из одной первой буквы ("  c") не используется: она есть у каждого
+    двадцатого слова словаря и только замедляет поиск.
+
+    Аргументы:
+        word (str): Слово в нижнем регистре.
+
+    Возвращает:
+        set: Множество строк длиной 3.
+
+    Пример:
+        _trigrams("cat")  # {" ca", "cat", "at "}
+    """
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Trie:
+    """
+    Префиксное дерево: каждый узел — словарь {символ: узел}, а номера записей,
+    ключ которых заканчивается в узле, хранятся под ключом None.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, key, entry_id):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        node.setdefault(None, []).append(entry_id)
+
+    def find(self, prefix, limit):
+        """
+        Возвращает не более limit номеров записей с ключом, начинающимся с prefix,
+        в алфавитном порядке ключей.
+        """
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        found = []
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            found.extend(node.get(None, ()))
+            # Дети кладутся в стек в обратном порядке, чтобы обойти их по алфавиту
+            stack.extend(node[char] for char in sorted((c for c in node if c is not None), reverse=True))
+        return found[:limit]
+
+
+class TermIndex:
+    """
+    Индекс словаря для поиска: префиксные деревья по терминам и по словам
+    перевода, а также индекс триграмм терминов.
+    """
+
+    def __init__(self):
+        self.entries = []  # (термин, определение) по номеру записи
+        self.terms_trie = _Trie()
+        self.definitions_trie = _Trie()
+        self.trigrams = {}  # триграмма -> список номеров записей
+        self.trigram_counts = []  # количество триграмм термина по номеру записи
+        self.position = None  # позиция в репозитории, до которой учтены термины
+
+    def add(self, term, definition):
+        """
+        Добавляет термин в индекс.
+
+        Аргументы:
+            term (str): Термин.
+            definition (str): Перевод термина.
+        """
+        entry_id = len(self.entries)
+        self.entries.append((term, definition))
+        key = term.lower()
+        self.terms_trie.add(key, entry_id)
+        for word in set(_WORD_RE.findall(definition.lower())):
+            self.definitions_trie.add(word, entry_id)
+        grams = _trigrams(key)
+        self.trigram_counts.append(len(grams))
+        for gram in grams:
+            self.trigrams.setdefault(gram, []).append(entry_id)
+
+    def fuzzy(self, query, limit):
+        """
+        Ищет термины, похожие на query (с учетом опечаток).
+
+        Похожесть — коэффициент Дайса по множествам триграмм: 2·|A∩B| / (|A| + |B|).
+
+        Возвращает:
+            list: Номера записей, отсортированные по убыванию похожести.
+        """
+        grams = _trigrams(query)
+        common = Counter()
+        for gram in grams:
+            common.update(self.trigrams.get(gram, ()))
+        # У любого термина не меньше двух триграмм, отсюда минимальное число общих триграмм
+        min_shared = FUZZY_THRESHOLD * (len(grams) + 2) / 2
+        scored = []
+        for entry_id, shared in common.items():
+            if shared < min_shared:
+                continue
+            score = 2 * shared / (len(grams) + self.trigram_counts[entry_id])
+            if score >= FUZZY_THRESHOLD:
+                scored.append((-score, entry_id))
+        scored.sort()
+        return [entry_id for _, entry_id in scored[:limit]]
+
+    def search(self, query, limit):
+        """
+        Ищет термины по запросу.
+
+        Порядок результатов:
+        - термины, начинающиеся с запроса ("prefix");
+        - термины, в переводе которых есть слово, начинающееся с запроса ("definition");
+        - термины, похожие на запрос с учетом опечаток ("fuzzy").
+
+        Возвращает:
+            list: Не более limit словарей с ключами "term", "definition" и "match".
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        results = []
+        seen = set()
+
+        def collect(entry_ids, match):
+            for entry_id in entry_ids:
+                if entry_id not in seen and len(results) < limit:
+                    seen.add(entry_id)
+                    term, definition = self.entries[entry_id]
+                    results.append({"term": term, "definition": definition, "match": match})
+
+        collect(self.terms_trie.find(query, limit), "prefix")
+        if len(results) < limit:
+            collect(self.definitions_trie.find(query, limit), "definition")
+        if len(results) < limit:
+            collect(self.fuzzy(query, limit), "fuzzy")
+        return results
+
+
+_index = TermIndex()
+_index_lock = threading.Lock()
+
+
+def _get_index():
+    """
+    Возвращает индекс, дополненный терминами, добавленными с прошлого обращения.
+
+    Если репозиторий вернул термины с начала (файл уплотнен или база
+    импортирована заново), индекс строится заново.
+
+    Возвращает:
+        TermIndex: Актуальный индекс словаря.
+    """
+    global _index
+    with _index_lock:
+        rows, position, reset = get_repository().get_term_rows_since(_index.position)
+        if reset:
+            _index = TermIndex()
+        for term, definition, _ in rows:
+            _index.add(term, definition)
+        _index.position = position
+        return _index
+
+
+def build_index():
+    """
+    Строит индекс словаря заранее, чтобы первый запрос поиска не ждал его построения.
+
+    Вызывается при старте процесса сервера (см. `snapshot.preload`).
+
+    Возвращает:
+        int: Количество терминов в индексе.
+
+    Пример:
+        build_index()  # 42
+    """
+    return len(_get_index().entries)
+
+
+@timed
+def search_terms(query, limit=10):
+    """
+    Ищет термины в словаре по префиксу, по слову перевода и с учетом опечаток.
+
+    Аргументы:
+        query (str): Строка запроса (английский термин или русское слово).
+        limit (int): Максимальное количество результатов.
+
+    Возвращает:
+        list: Список словарей с ключами:
+            - "term": Термин.
+            - "definition": Перевод термина.
+            - "match": Вид совпадения: "prefix", "definition" или "fuzzy".
+
+    Пример:
+        search_terms("arch")
+        # [{"term": "architecture", "definition": "архитектура, зодчество", "match": "prefix"}]
+    """
+    return _get_index().search(query, limit)
@@ -41,10 +41,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',  # Сессии
     'django.contrib.messages',  # Сообщения
     'django.contrib.staticfiles',  # Статические файлы
+    'proj_eng',  # Приложение проекта (команды manage.py)
 ]
 
 # Промежуточное ПО (middleware), которое обрабатывает запросы
 MIDDLEWARE = [
+    'proj_eng.metrics.MetricsMiddleware',  # Метрики времени запросов (первым, чтобы учитывать остальные)
     'django.middleware.security.SecurityMiddleware',  # Средства безопасности
     'django.contrib.sessions.middleware.SessionMiddleware',  # Сессии
     'django.middleware.common.CommonMiddleware',  # Общие настройки
@@ -57,15 +59,23 @@ MIDDLEWARE = [
 # Основной файл URL-ов
 ROOT_URLCONF = 'proj_eng.urls'
 
+# Загрузчики шаблонов: каталоги из DIRS и каталоги templates приложений
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 # Настройки шаблонов
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',  # Используем DjangoTemplates для рендеринга
+        'BACKEND': 'proj_eng.metrics.TimedDjangoTemplates',  # DjangoTemplates с измерением времени рендеринга
         'DIRS': [
             os.path.join(BASE_DIR, 'templates')  # Путь к директории с шаблонами
         ],
-        'APP_DIRS': True,  # Автоматически ищем шаблоны в каталогах приложений
         'OPTIONS': {
+            # Загрузчики: каталог templates и каталоги приложений. Без режима отладки разобранные
+            # шаблоны кэшируются в памяти (cached.Loader), в режиме отладки — перечитываются при изменении.
+            'loaders': TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
             'context_processors': [  # Контекст-процессоры для обработки данных в шаблонах
                 'django.template.context_processors.debug',  # Отладочная информация
                 'django.template.context_processors.request',  # Доступ к запросу
@@ -87,6 +97,39 @@ DATABASES = {
     }
 }
 
+# Кэш: отрендеренные страницы (см. модуль page_cache) хранятся в памяти процесса
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',  # Кэш в памяти процесса
+        'LOCATION': 'proj-eng-pages',
+    }
+}
+# Время хранения страницы в кэше, секунд
+PAGE_CACHE_TIMEOUT = 300
+
+# Хранилище данных словаря, текстов и тестов: "csv" (файлы ./data/*.csv) или "sqlite"
+DATA_BACKEND = os.getenv("DATA_BACKEND", "csv")
+# Путь к базе SQLite для DATA_BACKEND = "sqlite" (заполняется командой import_csv_data)
+DATA_SQLITE_PATH = BASE_DIR / 'data' / 'data.sqlite3'
+
+# Загрузка разобранных данных из снимка ./data/snapshot.bin при старте процесса сервера (модуль snapshot)
+DATA_SNAPSHOT = os.getenv("DATA_SNAPSHOT", "1") != "0"
+# Общая для всех процессов таблица терминов ./data/terms.csv.table, отображаемая в память (mmap)
+DATA_SHARED_TABLE = os.getenv("DATA_SHARED_TABLE", "1") != "0"
+
+# Асинхронные представления (модуль async_views) для запуска под ASGI-сервером
+ASYNC_VIEWS = bool(os.getenv("ASYNC_VIEWS"))
+# Количество потоков, в которых асинхронные представления читают данные
+DATA_THREADS = int(os.getenv("DATA_THREADS", "8"))
+
+# Отчет профилировщика по параметру запроса ?profile=1 (по умолчанию только в режиме отладки)
+PROFILE_REQUESTS = DEBUG or bool(os.getenv("PROFILE_REQUESTS"))
+
+# Доступ к странице /metrics: адреса клиентов через запятую (по умолчанию только локальные)
+# и токен для заголовка "Authorization: Bearer <токен>" (пустой — доступ по токену отключен)
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 # Валидация паролей — набор проверок для паролей пользователей
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -115,7 +158,12 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'  # Путь к директории с с
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),  # Путь к статическим файлам проекта
 ]
-STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'  # Хранилище для статических файлов
+# Хранилище для collectstatic: очистка CSS, хэш содержимого в именах файлов, сжатые варианты .gz/.br
+STATICFILES_STORAGE = 'proj_eng.static_assets.CompressedManifestStaticFilesStorage'
+# CSS файлы, из которых удаляются правила с классами, не используемыми в шаблонах
+STATIC_PRUNE_CSS = ['bootstrap.min.css']
+# SVG не больше этого размера встраиваются в страницу тегом {% inline_static %}
+STATIC_INLINE_MAX_BYTES = 4096
 
 # Тип поля для основного первичного ключа
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'  # Используем BigAutoField для первичных ключей
@@ -0,0 +1,263 @@
+"""
+Модуль двоичного снимка разобранных данных для быстрого старта процесса.
+
+Каждый процесс сервера (воркер gunicorn или uvicorn) начинает с пустыми
+кэшами, и первые запросы платят за разбор CSV файлов и сортировку словаря.
+Снимок `./data/snapshot.bin` хранит уже разобранные данные:
+- "terms": колоночную таблицу словаря TermTable (вместе с порядком сортировки).
+  При общей таблице терминов (`DATA_SHARED_TABLE`) эта часть не пишется: ее роль
+  выполняет файл `./data/terms.csv.table`, который процессы отображают в память;
+- "texts": индекс смещений строк файла текстов.
+
+Вопросы теста в снимок не входят: сессия теста читает только свои вопросы
+по индексу `tests.csv.idx`, а банк тестов целиком загружается лишь при первой
+проверке ответов.
+
+Каждая часть снимка помечена хэшем содержимого своего CSV файла. При старте
+процесса сервера (`preload()` из модулей `wsgi` и `asgi`, но не из команд
+manage.py) части с совпадающим хэшем подставляются в репозиторий, а части с
+изменившимся хэшем читаются из CSV как обычно, после чего снимок перезаписывается.
+
+Формат файла: метка `SNAPSHOT_MAGIC`, версия формата `SNAPSHOT_VERSION` и
+части (имя, хэш CSV файла, длина и содержимое). Снимок другой версии
+игнорируется и перестраивается.
+
+Функции:
+- load_snapshot(repository): Подставляет актуальные части снимка.
+- write_snapshot(repository): Записывает снимок из разобранных данных.
+- preload(): Загрузка данных и индекса поиска при старте процесса сервера.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import struct
+import tempfile
+import time
+from array import array
+
+from django.conf import settings
+
+from . import search_work
+from .records import TermTable
+from .repositories import CsvRepository, get_repository
+
+logger = logging.getLogger(__name__)
+
+# Файл снимка
+SNAPSHOT_FILE = "./data/snapshot.bin"
+SNAPSHOT_MAGIC = b"PESNAP"
+# Версия формата: увеличивается при любом изменении содержимого частей
+SNAPSHOT_VERSION = 2
+# Части снимка в порядке записи
+SECTIONS = ("terms", "texts")
+
+_HEADER = struct.Struct("<6sHH")
+# Заголовок части: длина имени, хэш CSV файла (16 байт), длина содержимого
+_SECTION = struct.Struct("<H16sQ")
+_HASH_CHUNK = 1024 * 1024
+
+
+def _sections(repository):
+    """Возвращает части снимка для репозитория (без "terms" при общей таблице терминов)."""
+    if repository.shared_table:
+        return tuple(name for name in SECTIONS if name != "terms")
+    return SECTIONS
+
+
+def _file_hash(path):
+    """Возвращает 16-байтовый хэш содержимого файла."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _pack_parts(parts):
+    """Склеивает байтовые строки с длинами в одну строку."""
+    return struct.pack(f"<I{len(parts)}Q", len(parts), *(len(part) for part in parts)) + b"".join(parts)
+
+
+def _unpack_parts(data):
+    """Разбирает строку, записанную `_pack_parts`, на части (memoryview без копирования)."""
+    data = memoryview(data)
+    count = struct.unpack_from("<I", data)[0]
+    lengths = struct.unpack_from(f"<{count}Q", data, 4)
+    position = 4 + 8 * count
+    parts = []
+    for length in lengths:
+        parts.append(data[position:position + length])
+        position += length
+    return parts
+
+
+def _encode(name, data):
+    """Сериализует данные части снимка."""
+    if name == "terms":
+        return _pack_parts(data.to_parts())
+    starts, ends = data
+    return _pack_parts([starts.tobytes(), ends.tobytes()])
+
+
+def _decode(name, payload):
+    """Восстанавливает данные части снимка."""
+    if name == "terms":
+        return TermTable.from_parts(_unpack_parts(payload))
+    starts, ends = array("Q"), array("Q")
+    for target, part in zip((starts, ends), _unpack_parts(payload)):
+        target.frombytes(part)
+    return starts, ends
+
+
+def _read_sections(path):
+    """
+    Читает части снимка.
+
+    Возвращает:
+        dict: {имя части: (хэш CSV файла, содержимое)} или пустой словарь, если снимка нет
+              или он записан другой версией формата.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    try:
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            return {}
+        sections = {}
+        position = _HEADER.size
+        for _ in range(count):
+            name_length, digest, size = _SECTION.unpack_from(data, position)
+            position += _SECTION.size
+            name = data[position:position + name_length].decode("utf-8")
+            position += name_length
+            sections[name] = (digest, memoryview(data)[position:position + size])
+            position += size
+    except (struct.error, UnicodeDecodeError):
+        logger.warning("Снимок данных %s поврежден и будет перестроен", path)
+        return {}
+    return sections
+
+
+def load_snapshot(repository, path=SNAPSHOT_FILE):
+    """
+    Подставляет в репозиторий части снимка, хэш которых совпадает с CSV файлом.
+
+    Эта функция:
+    - Для каждой части вычисляет хэш соответствующего CSV файла.
+    - Если хэш совпадает с хэшем в снимке, восстанавливает данные без разбора CSV.
+    - Если файл изменился во время проверки, часть считается устаревшей.
+
+    Аргументы:
+        repository (CsvRepository): Репозиторий.
+        path (str): Путь к файлу снимка.
+
+    Возвращает:
+        tuple: (список загруженных частей, список устаревших или отсутствующих частей).
+
+    Пример:
+        load_snapshot(get_repository())  # (["terms", "texts"], [])
+    """
+    sections = _read_sections(path)
+    loaded, stale = [], []
+    for name in _sections(repository):
+        source = repository.data_file(name)
+        key = repository.data_version(name)
+        digest = _file_hash(source)
+        entry = sections.get(name)
+        if entry is None or entry[0] != digest or repository.data_version(name) != key:
+            stale.append(name)
+            continue
+        repository.import_state(name, key, _decode(name, entry[1]))
+        loaded.append(name)
+    return loaded, stale
+
+
+def write_snapshot(repository, path=SNAPSHOT_FILE):
+    """
+    Записывает снимок разобранных данных.
+
+    Эта функция:
+    - Берет разобранные данные из памяти процесса (при необходимости читает CSV файлы).
+    - Помечает каждую часть хэшем CSV файла, из которого она разобрана. Если файл
+      изменился во время записи, часть пропускается и будет прочитана из CSV при следующем старте.
+    - Записывает снимок во временный файл и атомарно заменяет им прежний.
+
+    Аргументы:
+        repository (CsvRepository): Репозиторий.
+        path (str): Путь к файлу снимка.
+
+    Возвращает:
+        int: Размер снимка в байтах.
+    """
+    chunks = []
+    count = 0
+    for name in _sections(repository):
+        key, data = repository.export_state(name)
+        digest = _file_hash(repository.data_file(name))
+        if repository.data_version(name) != key:
+            logger.warning("Файл %s изменился во время записи снимка", repository.data_file(name))
+            continue
+        encoded_name = name.encode("utf-8")
+        payload = _encode(name, data)
+        chunks += [_SECTION.pack(len(encoded_name), digest, len(payload)), encoded_name, payload]
+        count += 1
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, count))
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+
+def preload():
+    """
+    Загружает разобранные данные при старте процесса сервера.
+
+    Вызывается из модулей `wsgi` и `asgi`, поэтому команды manage.py (migrate,
+    check, collectstatic) и наблюдающий процесс автоперезагрузки runserver не
+    читают, не хэшируют и не перезаписывают данные.
+
+    Эта функция:
+    - Ничего не делает, если загрузка отключена настройкой `DATA_SNAPSHOT`.
+    - Для CSV хранилища подставляет актуальные части снимка (см. `load_snapshot`);
+      если какие-то части устарели, читает их из CSV и перезаписывает снимок.
+      SQLite не требует разбора при старте.
+    - При общей таблице терминов отображает ее в память (и строит, если ее еще нет).
+    - Строит индекс поиска (`search_work.build_index`), чтобы его не строил
+      первый запрос поиска.
+    - Ошибки (например, нет каталога ./data в рабочем каталоге) записываются в журнал
+      и не мешают запуску: данные будут прочитаны при первом запросе.
+
+    Пример:
+        preload()
+    """
+    if not settings.DATA_SNAPSHOT:
+        return
+    repository = get_repository()
+    started = time.perf_counter()
+    loaded, stale = [], []
+    try:
+        if isinstance(repository, CsvRepository):
+            loaded, stale = load_snapshot(repository)
+            if stale:
+                write_snapshot(repository)
+            if repository.shared_table:
+                repository.count_terms()
+        indexed = search_work.build_index()
+    except (OSError, sqlite3.Error) as exc:
+        logger.warning("Данные не загружены при старте: %s", exc)
+        return
+    logger.info("Данные загружены за %.3f с: из снимка %s, из CSV %s, терминов в индексе поиска %d",
+                time.perf_counter() - started, loaded, stale, indexed)
@@ -0,0 +1,336 @@
+"""
+Модуль подготовки и раздачи статических файлов.
+
+При `python manage.py collectstatic` хранилище `CompressedManifestStaticFilesStorage`:
+- удаляет из CSS файлов `STATIC_PRUNE_CSS` (Bootstrap) правила с классами,
+  которые не встречаются в шаблонах из `templates/`;
+- записывает файлы с хэшем содержимого в имени (bootstrap.min.3f2a….css) и
+  манифест staticfiles.json (как ManifestStaticFilesStorage);
+- рядом с текстовыми файлами записывает сжатые варианты .gz и, если установлен
+  пакет brotli, .br.
+
+Представление `serve_static` отдает собранные файлы: выбирает сжатый вариант
+по заголовку Accept-Encoding, а файлам с хэшем в имени ставит
+`Cache-Control: immutable` на год — их содержимое никогда не меняется.
+
+Функции и классы:
+- template_classes(directories): Классы CSS, используемые в шаблонах.
+- prune_css(css, used): Удаляет из CSS правила с неиспользуемыми классами.
+- CompressedManifestStaticFilesStorage: Хранилище статических файлов для collectstatic.
+- serve_static(request, path): Раздача собранных статических файлов.
+"""
+
+import functools
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+
+try:
+    import brotli
+except ImportError:  # Сжатие brotli необязательно: без пакета пишутся только .gz
+    brotli = None
+
+# Расширения файлов, для которых имеет смысл сжатие
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".txt", ".html", ".json", ".map")
+# Файлы меньше этого размера не сжимаются: выигрыш меньше накладных расходов
+COMPRESS_MIN_SIZE = 256
+# Срок кэширования файлов с хэшем в имени, секунд (год)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Атрибут class="..." в шаблоне (значение может содержать теги шаблона)
+_CLASS_ATTR_RE = re.compile(r'class\s*=\s*"([^"]*)"', re.DOTALL)
+_CLASS_TOKEN_RE = re.compile(r"[\w-]+")
+# Класс в селекторе CSS и псевдокласс :not(...), классы внутри которого не обязаны быть в шаблонах
+_SELECTOR_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_NOT_RE = re.compile(r":not\([^()]*\)")
+# At-правила, содержимое которых состоит из обычных правил и может быть очищено
+_NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+
+def template_classes(directories):
+    """
+    Собирает имена классов CSS из атрибутов class всех шаблонов.
+
+    Значения с тегами шаблона ({% if %}…) разбиваются на слова целиком, поэтому
+    в результат попадают все классы, которые шаблон может вывести.
+
+    Аргументы:
+        directories (list): Каталоги шаблонов.
+
+    Возвращает:
+        set: Имена классов.
+
+    Пример:
+        template_classes(["./templates"])  # {"container", "btn", "btn-primary", ...}
+    """
+    used = set()
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if not name.endswith(".html"):
+                    continue
+                with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                    for value in _CLASS_ATTR_RE.findall(f.read()):
+                        used.update(_CLASS_TOKEN_RE.findall(value))
+    return used
+
+
+def _skip_string(css, i):
+    """Возвращает индекс после строки в кавычках, начинающейся в позиции i."""
+    quote = css[i]
+    i += 1
+    while css[i] != quote:
+        i += 2 if css[i] == "\\" else 1
+    return i + 1
+
+
+def _scan_to(css, i, stops):
+    """Возвращает индекс первого символа из stops вне строк и комментариев, начиная с i."""
+    while i < len(css):
+        char = css[i]
+        if char in "\"'":
+            i = _skip_string(css, i)
+        elif css.startswith("/*", i):
+            i = css.index("*/", i) + 2
+        elif char in stops:
+            return i
+        else:
+            i += 1
+    return len(css)
+
+
+def _block_end(css, i):
+    """Возвращает индекс закрывающей скобки блока, открывающая скобка которого стоит перед i."""
+    depth = 1
+    while True:
+        i = _scan_to(css, i, "{}")
+        depth += 1 if css[i] == "{" else -1
+        if depth == 0:
+            return i
+        i += 1
+
+
+def _split_selectors(prelude):
+    """Разбивает список селекторов по запятым вне скобок."""
+    selectors = []
+    depth = start = 0
+    for i, char in enumerate(prelude):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def _selector_used(selector, used):
+    """Проверяет, что все классы селектора (кроме классов внутри :not()) есть в шаблонах."""
+    if "\\" in selector:  # экранированные имена классов не разбираются — правило сохраняется
+        return True
+    return all(name in used for name in _SELECTOR_CLASS_RE.findall(_NOT_RE.sub("", selector)))
+
+
+def prune_css(css, used):
+    """
+    Удаляет из CSS правила, селекторы которых ссылаются на неиспользуемые классы.
+
+    Эта функция:
+    - Оставляет в списке селекторов правила только те, все классы которых есть в used.
+    - Удаляет правило, если в нем не осталось селекторов.
+    - Очищает содержимое @media, @supports и подобных блоков и удаляет пустые блоки.
+    - Сохраняет @charset, @font-face, @keyframes и комментарии /*! (лицензия),
+      остальные комментарии (в том числе sourceMappingURL) удаляет.
+
+    Аргументы:
+        css (str): Текст CSS.
+        used (set): Имена используемых классов.
+
+    Возвращает:
+        str: Очищенный текст CSS.
+
+    Пример:
+        prune_css(".a{color:red}.b{color:blue}", {"a"})  # ".a{color:red}"
+    """
+    out = []
+    i = 0
+    while i < len(css):
+        if css[i].isspace():
+            i += 1
+            continue
+        if css.startswith("/*", i):
+            end = css.index("*/", i) + 2
+            if css.startswith("/*!", i):
+                out.append(css[i:end])
+            i = end
+            continue
+        stop = _scan_to(css, i, "{;}")
+        prelude = css[i:stop].strip()
+        if stop >= len(css) or css[stop] != "{":
+            # Оператор без блока (@charset, @import) или лишняя закрывающая скобка
+            if prelude:
+                out.append(prelude + ";")
+            i = stop + 1
+            continue
+        end = _block_end(css, stop + 1)
+        body = css[stop + 1:end]
+        i = end + 1
+        if prelude.startswith(_NESTED_AT_RULES):
+            body = prune_css(body, used)
+            if body:
+                out.append(f"{prelude}{{{body}}}")
+        elif prelude.startswith("@"):
+            out.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [s.strip() for s in _split_selectors(prelude) if _selector_used(s, used)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{body}}}")
+    return "".join(out)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статических файлов: очистка CSS, хэш в именах и сжатые варианты.
+
+    Подключается настройкой STATICFILES_STORAGE.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        paths = dict(paths)
+        prune = getattr(settings, "STATIC_PRUNE_CSS", ())
+        if prune:
+            used = template_classes([str(directory) for template in settings.TEMPLATES
+                                     for directory in template.get("DIRS", [])])
+            for path in prune:
+                if path in paths:
+                    self._prune(path, *paths[path], used)
+                    # Хэш и сжатые варианты считаются уже по очищенному файлу
+                    paths[path] = (self, path)
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        for hashed_name in set(self.hashed_files.values()):
+            self._compress(hashed_name)
+
+    def _prune(self, path, storage, source_path, used):
+        """
+        Записывает собранную копию CSS файла без неиспользуемых правил.
+
+        Файл читается из исходного каталога, а не из STATIC_ROOT: collectstatic не копирует
+        неизмененные файлы повторно, а набор классов в шаблонах мог измениться.
+        """
+        with storage.open(source_path) as f:
+            css = f.read().decode("utf-8")
+        with open(self.path(path), "w", encoding="utf-8") as f:
+            f.write(prune_css(css, used))
+
+    def _compress(self, name):
+        """Записывает рядом с файлом варианты .gz и .br (если доступен brotli)."""
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        path = self.path(name)
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return
+        # mtime=0 — одинаковый файл дает одинаковый архив при каждой сборке
+        with open(path + ".gz", "wb") as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + ".br", "wb") as f:
+                f.write(brotli.compress(data))
+
+
+@functools.lru_cache(maxsize=None)
+def _hashed_names():
+    """Возвращает множество имен файлов с хэшем из манифеста хранилища (или пустое)."""
+    return set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+
+def _accepted_encodings(header):
+    """
+    Разбирает заголовок Accept-Encoding в словарь "сжатие -> вес q".
+
+    Сжатие без q получает вес 1, некорректный q считается нулем. Имена приводятся
+    к нижнему регистру, "x-gzip" считается "gzip".
+
+    Пример:
+        _accepted_encodings("gzip;q=0.5, br;q=0, *")  # {"gzip": 0.5, "br": 0.0, "*": 1.0}
+    """
+    accepted = {}
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        coding = coding.lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted["gzip" if coding == "x-gzip" else coding] = quality
+    return accepted
+
+
+def serve_static(request, path):
+    """
+    Отдает собранный статический файл из `STATIC_ROOT`.
+
+    Эта функция:
+    - Выбирает вариант .br или .gz с наибольшим весом q в Accept-Encoding (при равных —
+      brotli), если вариант есть на диске. Сжатия с q=0 не используются.
+    - Для файлов с хэшем в имени ставит Cache-Control "public, max-age=<год>, immutable",
+      для остальных — "no-cache".
+    - Добавляет Vary: Accept-Encoding, чтобы прокси не отдавали сжатый вариант не тем клиентам.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса.
+        path (str): Путь к файлу относительно STATIC_URL.
+
+    Возвращает:
+        FileResponse: Содержимое файла.
+
+    Исключения:
+        Http404: Если файла нет.
+
+    Пример:
+        GET /static/bootstrap.min.3f2a1c9e8b7d.css
+    """
+    try:
+        full_path = safe_join(str(settings.STATIC_ROOT), path)
+    except ValueError:
+        raise Http404("Файл не найден")
+    if not os.path.isfile(full_path):
+        raise Http404("Файл не найден")
+
+    accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    encoding, best = None, 0.0
+    for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+        quality = accepted.get(candidate, accepted.get("*", 0.0))
+        if quality > best and os.path.isfile(full_path + suffix):
+            encoding, best = candidate, quality
+    if encoding:
+        full_path += ".br" if encoding == "br" else ".gz"
+
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Vary"] = "Accept-Encoding"
+    if path in _hashed_names():
+        response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        response["Cache-Control"] = "no-cache"
+    return response
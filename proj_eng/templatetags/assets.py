@@ -0,0 +1,59 @@
+"""
+Теги шаблонов для статических файлов.
+
+Теги:
+- inline_static: Адрес статического файла; небольшие SVG встраиваются в страницу как data: URI.
+"""
+
+import functools
+from urllib.parse import quote
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+register = template.Library()
+
+
+@functools.lru_cache(maxsize=None)
+def _data_uri(path):
+    """
+    Возвращает data: URI для небольшого SVG файла или None, если файл не подходит.
+
+    Аргументы:
+        path (str): Путь к файлу относительно каталогов статических файлов.
+    """
+    if not path.endswith(".svg"):
+        return None
+    full_path = finders.find(path)
+    if not full_path:
+        return None
+    with open(full_path, "r", encoding="utf-8") as f:
+        svg = f.read()
+    if len(svg.encode("utf-8")) > settings.STATIC_INLINE_MAX_BYTES:
+        return None
+    # Для SVG экранирование URL компактнее base64
+    return "data:image/svg+xml," + quote(" ".join(svg.split()), safe="/:=;,.#()-_")
+
+
+@register.simple_tag
+def inline_static(path):
+    """
+    Возвращает адрес статического файла для атрибута src.
+
+    Эта функция:
+    - Для SVG не больше `STATIC_INLINE_MAX_BYTES` байт возвращает data: URI с содержимым
+      файла — картинка приходит вместе со страницей, без отдельного запроса.
+    - Для остальных файлов возвращает адрес как тег {% static %} (с хэшем в имени).
+
+    Аргументы:
+        path (str): Путь к файлу относительно каталогов статических файлов.
+
+    Возвращает:
+        str: data: URI или адрес файла.
+
+    Пример:
+        <img src="{% inline_static 'flag.svg' %}" alt="..." width="32" height="32"/>
+    """
+    return _data_uri(path) or static(path)
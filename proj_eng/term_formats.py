@@ -0,0 +1,126 @@
+"""
+Модуль форматов файлов для импорта и экспорта словаря.
+
+Поддерживаются форматы:
+- "csv": поля через ";" (как `data/terms.csv`), строка заголовка необязательна;
+- "tsv": поля через табуляцию;
+- "jsonl": по одному объекту JSON в строке: {"term": "...", "definition": "..."}.
+
+Поля csv и tsv, как и в `data/terms.csv`, не заключаются в кавычки ни при
+экспорте, ни при импорте (csv.QUOTE_NONE): кавычка — обычный символ поля,
+поэтому экспортированный файл импортируется обратно без изменений.
+
+Файлы читаются и пишутся построчно, поэтому размер файла не ограничен памятью.
+
+Функции:
+- detect_format(path): Определяет формат по расширению файла.
+- read_terms(f, fmt): Построчно читает термины из файла.
+- write_terms(records, f, fmt): Записывает термины в файл.
+"""
+
+import csv
+import json
+import os
+
+FORMATS = ("csv", "tsv", "jsonl")
+
+_EXTENSIONS = {".csv": "csv", ".tsv": "tsv", ".tab": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+_DELIMITERS = {"csv": ";", "tsv": "\t"}
+# Первое поле строки заголовка
+_HEADER_FIELDS = ("term", "термин")
+
+
+def detect_format(path):
+    """
+    Определяет формат файла по расширению.
+
+    Аргументы:
+        path (str): Путь к файлу.
+
+    Возвращает:
+        str | None: "csv", "tsv", "jsonl" или None, если расширение неизвестно.
+
+    Пример:
+        detect_format("words.jsonl")  # "jsonl"
+    """
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def _read_delimited(f, delimiter):
+    reader = csv.reader(f, delimiter=delimiter, quoting=csv.QUOTE_NONE)
+    for fields in reader:
+        number = reader.line_num
+        if not "".join(fields).strip():
+            continue
+        if number == 1 and fields[0].strip().lower() in _HEADER_FIELDS:
+            continue
+        if len(fields) < 2:
+            yield number, None, None, "неверное количество полей"
+            continue
+        yield number, fields[0], fields[1], None
+
+
+def _read_jsonl(f):
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            term = item["term"]
+            definition = item.get("definition", item.get("explanation"))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            yield number, None, None, "некорректный JSON"
+            continue
+        if not isinstance(term, str) or not isinstance(definition, str):
+            yield number, None, None, "некорректный JSON"
+            continue
+        yield number, term, definition, None
+
+
+def read_terms(f, fmt):
+    """
+    Построчно читает термины из открытого текстового файла.
+
+    Аргументы:
+        f (file): Файл, открытый на чтение (для csv и tsv — с newline="").
+        fmt (str): Формат: "csv", "tsv" или "jsonl".
+
+    Возвращает:
+        generator: Четверки (номер строки, термин, определение, причина отказа или None).
+                   Для отклоненной строки термин и определение равны None.
+
+    Пример:
+        with open("words.tsv", newline="", encoding="utf-8") as f:
+            for number, term, definition, error in read_terms(f, "tsv"): ...
+    """
+    if fmt == "jsonl":
+        return _read_jsonl(f)
+    return _read_delimited(f, _DELIMITERS[fmt])
+
+
+def write_terms(records, f, fmt):
+    """
+    Записывает термины в открытый текстовый файл.
+
+    Аргументы:
+        records (iterable): Записи Term (термин, определение, источник).
+        f (file): Файл, открытый на запись.
+        fmt (str): Формат: "csv", "tsv" или "jsonl".
+
+    Возвращает:
+        int: Количество записанных терминов.
+    """
+    count = 0
+    if fmt == "jsonl":
+        for term, definition, source in records:
+            f.write(json.dumps({"term": term, "definition": definition, "source": source}, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+        return count
+    delimiter = _DELIMITERS[fmt]
+    # Заголовок и поля — как в data/terms.csv, чтобы экспорт можно было импортировать обратно
+    f.write(delimiter.join(("term", "explanation", "source")) + "\n")
+    for record in records:
+        f.write(delimiter.join(record) + "\n")
+        count += 1
+    return count
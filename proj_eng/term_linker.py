@@ -0,0 +1,427 @@
+"""
+Модуль подсветки слов словаря в текстах (автомат Ахо — Корасик).
+
+Из всех терминов словаря строится один автомат Ахо — Корасик: префиксное
+дерево терминов (в нижнем регистре) с суффиксными ссылками. Текст проходится
+автоматом один раз, и за этот проход находятся вхождения сразу всех терминов,
+поэтому время разметки текста линейно по длине текста и не зависит от
+количества терминов в словаре (в отличие от поиска каждого термина по очереди).
+
+Вхождение засчитывается только целыми словами: до и после него в тексте нет
+буквы или цифры. Из пересекающихся вхождений выбирается самое левое и самое
+длинное ("New York" вместо "York").
+
+Автомат строится в памяти процесса при первом запросе и затем дополняется
+только новыми терминами (см. `BaseRepository.get_term_rows_since`): новые
+термины добавляются в дерево, а перед следующей разметкой суффиксные ссылки
+считаются для новых состояний и перенаправляются только у тех состояний,
+строки которых оканчиваются строкой нового состояния (см. `TermAutomaton._link`).
+Разметка текстов хранится в кэше по хэшу текста и пересчитывается, только
+если с тех пор добавились термины.
+
+Функции:
+- annotate(text): Участки текста со словами словаря и покрытие текста.
+- highlight(text, links): HTML текста с подсвеченными словами словаря.
+- link_texts(texts): Строки таблицы текстов с подсветкой и покрытием.
+- linked_terms(links): Разные термины из разметки в порядке первого вхождения.
+"""
+
+import hashlib
+import re
+import threading
+from array import array
+from collections import OrderedDict
+
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+
+from . import metrics
+from .metrics import timed
+from .records import LinkedText, TextLinks
+from .repositories import get_repository
+
+# Максимальное количество разметок текстов в кэше
+LINKS_CACHE_SIZE = 10_000
+
+# Слова текста для подсчета покрытия (как в search_work)
+_WORD_RE = re.compile(r"\w+")
+# Ключ перехода в словаре переходов: номер состояния * _CODES + код символа
+_CODES = 0x110000
+
+
+def _fold(text):
+    """
+    Возвращает текст в нижнем регистре той же длины, что и исходный.
+
+    str.lower() для некоторых символов меняет длину строки ("İ" → "i̇"), и тогда
+    позиции в строке в нижнем регистре не совпадают с позициями в исходном тексте.
+    Такие символы остаются как есть.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(low if len(low) == 1 else char for char, low in zip(text, map(str.lower, text)))
+
+
+def _is_word_char(char):
+    """Возвращает True для буквы, цифры или "_" (символы, из которых состоят слова)."""
+    return char.isalnum() or char == "_"
+
+
+class TermAutomaton:
+    """
+    Автомат Ахо — Корасик по терминам словаря.
+
+    Состояние — узел префиксного дерева терминов, нумеруются с 0 (корень).
+    Вместо словаря переходов у каждого узла все переходы хранятся в одном словаре
+    с целыми ключами (состояние * _CODES + код символа), а остальные поля состояний —
+    в массивах array: так дерево из сотен тысяч узлов занимает в несколько раз меньше памяти.
+
+    Суффиксные ссылки образуют дерево (дерево ссылок), которое хранится в массивах
+    first_child/next_sibling/prev_sibling. Поддерево ссылок состояния — все
+    состояния, строки которых оканчиваются его строкой: по нему находятся
+    состояния, которые затрагивает новый термин.
+
+    Атрибуты:
+        entries (list): Пары (термин, определение) по номеру записи.
+        position: Позиция в репозитории, до которой учтены термины.
+        generation (int): Увеличивается при добавлении терминов (для кэша разметки).
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.edges = {}  # переходы: состояние * _CODES + код символа -> состояние
+        self.parent = array("I", [0])  # родитель состояния
+        self.code = array("I", [0])  # код символа перехода из родителя
+        self.depth = array("I", [0])  # длина строки состояния
+        self.output = array("i", [-1])  # номер записи, термин которой заканчивается в состоянии, или -1
+        self.fail = array("I", [0])  # суффиксная ссылка
+        self.out_link = array("I", [0])  # ближайшее по суффиксным ссылкам состояние с термином (0 — нет)
+        self.first_child = array("I", [0])  # первое состояние, ссылающееся на это (0 — нет)
+        self.next_sibling = array("I", [0])  # следующее состояние с той же суффиксной ссылкой
+        self.prev_sibling = array("I", [0])  # предыдущее состояние с той же суффиксной ссылкой
+        self.linked_states = 1  # суффиксные ссылки посчитаны для состояний с меньшими номерами
+        self.new_outputs = []  # связанные состояния, в которых с тех пор закончился новый термин
+        self.position = None
+        self.generation = 0
+
+    def add(self, term, definition):
+        """
+        Добавляет термин в дерево. Суффиксные ссылки пересчитываются перед следующим поиском.
+
+        Аргументы:
+            term (str): Термин.
+            definition (str): Перевод термина.
+        """
+        key = _fold(term.strip())
+        if not key:
+            return
+        state = 0
+        for char in key:
+            edge = state * _CODES + ord(char)
+            child = self.edges.get(edge)
+            if child is None:
+                child = len(self.parent)
+                self.edges[edge] = child
+                self.parent.append(state)
+                self.code.append(ord(char))
+                self.depth.append(self.depth[state] + 1)
+                self.output.append(-1)
+                self.fail.append(0)
+                self.out_link.append(0)
+                self.first_child.append(0)
+                self.next_sibling.append(0)
+                self.prev_sibling.append(0)
+            state = child
+        # Для повторяющегося термина (без учета регистра) остается первая запись
+        if self.output[state] < 0:
+            self.output[state] = len(self.entries)
+            self.entries.append((term, definition))
+            if state < self.linked_states:
+                self.new_outputs.append(state)
+
+    def _attach(self, state, link):
+        """Делает link суффиксной ссылкой состояния (добавляет его в дерево ссылок)."""
+        first = self.first_child[link]
+        self.next_sibling[state] = first
+        self.prev_sibling[state] = 0
+        if first:
+            self.prev_sibling[first] = state
+        self.first_child[link] = state
+        self.fail[state] = link
+
+    def _detach(self, state):
+        """Убирает состояние из дерева ссылок."""
+        prev, following = self.prev_sibling[state], self.next_sibling[state]
+        if prev:
+            self.next_sibling[prev] = following
+        else:
+            self.first_child[self.fail[state]] = following
+        if following:
+            self.prev_sibling[following] = prev
+
+    def _subtree(self, state):
+        """Перебирает поддерево ссылок состояния (без него самого), родители раньше потомков."""
+        first_child, next_sibling = self.first_child, self.next_sibling
+        stack = [state]
+        while stack:
+            child = first_child[stack.pop()]
+            while child:
+                yield child
+                stack.append(child)
+                child = next_sibling[child]
+
+    def _link_state(self, state):
+        """
+        Считает суффиксную ссылку состояния по ссылкам более коротких состояний.
+
+        Суффиксная ссылка состояния — самое длинное состояние, строка которого
+        является собственным суффиксом строки этого состояния.
+        """
+        edges, fail, output = self.edges, self.fail, self.output
+        link = 0
+        parent = self.parent[state]
+        if parent:
+            char = self.code[state]
+            link = fail[parent]
+            while link and link * _CODES + char not in edges:
+                link = fail[link]
+            link = edges.get(link * _CODES + char, 0)
+        self._attach(state, link)
+        self.out_link[state] = link if output[link] >= 0 else self.out_link[link]
+
+    def _update_out_links(self, state):
+        """Пересчитывает out_link в поддереве ссылок состояния."""
+        fail, output, out_link = self.fail, self.output, self.out_link
+        for child in self._subtree(state):
+            link = fail[child]
+            out_link[child] = link if output[link] >= 0 else out_link[link]
+
+    def _link(self):
+        """
+        Считает суффиксные ссылки для состояний, добавленных с прошлого вызова.
+
+        Эта функция:
+        - Если новых состояний больше, чем уже связанных (первое построение),
+          заново считает ссылки всех состояний в порядке длины строки: O(S log S).
+        - Иначе обходит новые состояния в порядке длины строки. Для каждого
+          нового состояния u (родитель p, символ c) считает его ссылку, затем
+          перебирает поддерево ссылок p — все состояния, оканчивающиеся строкой p, —
+          и их переходы по c: это состояния, которые оканчиваются строкой u.
+          Если их ссылка короче u, она перенаправляется на u, а out_link
+          пересчитывается в их поддеревьях.
+        - Для состояний, в которых закончился новый термин (термин — префикс уже
+          известного), пересчитывает out_link в их поддеревьях ссылок.
+
+        Стоимость дополнения — длина нового термина плюс размер поддеревьев
+        ссылок родителей новых состояний, а не размер всего автомата. Худший
+        случай — термин, начинающийся с символа, которого еще не было в начале
+        терминов: поддерево корня — весь автомат.
+        """
+        size = len(self.parent)
+        depth = self.depth
+        if (size - self.linked_states) * 2 > size:
+            for array_ in (self.first_child, self.next_sibling, self.prev_sibling):
+                array_[:] = array("I", bytes(4 * size))
+            for state in sorted(range(1, size), key=depth.__getitem__):
+                self._link_state(state)
+        else:
+            edges, code, fail = self.edges, self.code, self.fail
+            pending = set(range(self.linked_states, size))
+            for state in sorted(pending, key=depth.__getitem__):
+                self._link_state(state)
+                pending.discard(state)
+                parent, char = self.parent[state], code[state]
+                relinked = []
+                for suffix in self._subtree(parent):
+                    child = edges.get(suffix * _CODES + char)
+                    if child and child not in pending and depth[fail[child]] < depth[state]:
+                        relinked.append(child)
+                for child in relinked:
+                    self._detach(child)
+                    self._attach(child, state)
+                    self.out_link[child] = state if self.output[state] >= 0 else self.out_link[state]
+                    self._update_out_links(child)
+            for state in self.new_outputs:
+                self._update_out_links(state)
+        self.linked_states = size
+        self.new_outputs = []
+
+    def find(self, text):
+        """
+        Находит в тексте вхождения терминов целыми словами за один проход.
+
+        Аргументы:
+            text (str): Текст.
+
+        Возвращает:
+            list: Тройки (начало, конец, номер записи) без пересечений в порядке текста.
+        """
+        if self.linked_states < len(self.parent) or self.new_outputs:
+            self._link()
+        edges, fail, depth, output, out_link = self.edges, self.fail, self.depth, self.output, self.out_link
+        lowered = _fold(text)
+        size = len(lowered)
+        candidates = []
+        state = 0
+        for end, char in enumerate(lowered, 1):
+            char = ord(char)
+            while state and state * _CODES + char not in edges:
+                state = fail[state]
+            state = edges.get(state * _CODES + char, 0)
+            match = state if output[state] >= 0 else out_link[state]
+            while match:
+                start = end - depth[match]
+                if ((start == 0 or not _is_word_char(lowered[start - 1]))
+                        and (end == size or not _is_word_char(lowered[end]))):
+                    candidates.append((start, -end, output[match]))
+                match = out_link[match]
+        # Из пересекающихся вхождений — самое левое, из начинающихся в одном месте — самое длинное
+        candidates.sort()
+        spans = []
+        last_end = 0
+        for start, end, entry_id in candidates:
+            if start >= last_end:
+                spans.append((start, -end, entry_id))
+                last_end = -end
+        return spans
+
+
+_automaton = TermAutomaton()
+_automaton_lock = threading.Lock()
+# Разметка текстов: хэш текста -> (поколение автомата, TextLinks)
+_links = OrderedDict()
+_links_lock = threading.Lock()
+
+
+def _get_automaton():
+    """
+    Возвращает автомат, дополненный терминами, добавленными с прошлого обращения.
+
+    Если репозиторий вернул термины с начала (файл уплотнен или база
+    импортирована заново), автомат строится заново.
+
+    Вызывается под `_automaton_lock`.
+
+    Возвращает:
+        TermAutomaton: Актуальный автомат.
+    """
+    global _automaton
+    rows, position, reset = get_repository().get_term_rows_since(_automaton.position)
+    if reset:
+        generation = _automaton.generation
+        _automaton = TermAutomaton()
+        _automaton.generation = generation + 1
+    elif rows:
+        _automaton.generation += 1
+    for term, definition, _ in rows:
+        _automaton.add(term, definition)
+    _automaton.position = position
+    return _automaton
+
+
+@timed
+def annotate(text):
+    """
+    Находит в тексте слова из словаря и считает покрытие текста словарем.
+
+    Эта функция:
+    - Дополняет автомат терминами, добавленными в словарь с прошлого вызова.
+    - Ищет разметку текста в кэше; если ее нет или она построена до добавления
+      терминов, размечает текст одним проходом автомата (см. `TermAutomaton.find`).
+    - Учитывает попадания и промахи в метрике proj_eng_cache_requests_total{cache="text_links"}.
+
+    Аргументы:
+        text (str): Текст.
+
+    Возвращает:
+        TextLinks: Участки текста со словами словаря и покрытие текста.
+
+    Пример:
+        annotate("London is the capital of Great Britain")
+        # TextLinks(spans=((0, 6, 'London', 'Лондон'), ...), terms=3, covered=4, words=7)
+    """
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _automaton_lock:
+        automaton = _get_automaton()
+        with _links_lock:
+            cached = _links.get(key)
+            if cached is not None and cached[0] == automaton.generation:
+                _links.move_to_end(key)
+                metrics.cache_access("text_links", True)
+                return cached[1]
+        metrics.cache_access("text_links", False)
+        found = automaton.find(text)
+        entries = automaton.entries
+        generation = automaton.generation
+    spans = tuple((start, end) + entries[entry_id] for start, end, entry_id in found)
+    links = TextLinks(
+        spans=spans,
+        terms=len({entry_id for _, _, entry_id in found}),
+        covered=sum(len(_WORD_RE.findall(text, start, end)) for start, end, _ in found),
+        words=len(_WORD_RE.findall(text)),
+    )
+    with _links_lock:
+        _links[key] = (generation, links)
+        _links.move_to_end(key)
+        if len(_links) > LINKS_CACHE_SIZE:
+            _links.popitem(last=False)
+    return links
+
+
+def highlight(text, links):
+    """
+    Возвращает HTML текста, в котором слова словаря обернуты в <mark> с переводом в подсказке.
+
+    Аргументы:
+        text (str): Текст.
+        links (TextLinks): Разметка текста (см. `annotate`).
+
+    Возвращает:
+        SafeString: Экранированный текст с подсветкой.
+    """
+    parts = []
+    position = 0
+    for start, end, term, definition in links.spans:
+        parts.append(escape(text[position:start]))
+        parts.append(format_html('<mark class="term-link" title="{} — {}">{}</mark>',
+                                 term, definition, text[start:end]))
+        position = end
+    parts.append(escape(text[position:]))
+    return mark_safe("".join(parts))
+
+
+def link_texts(texts):
+    """
+    Возвращает строки таблицы текстов с подсвеченными словами словаря.
+
+    Аргументы:
+        texts (iterable): Записи Text (номер, текст, перевод).
+
+    Возвращает:
+        list: Записи LinkedText (номер, HTML текста, перевод, терминов, слов из словаря, всего слов).
+
+    Пример:
+        link_texts(texts_work.get_texts_page(1, 10))
+    """
+    rows = []
+    for cnt, text, definition in texts:
+        links = annotate(text)
+        rows.append(LinkedText(cnt, highlight(text, links), definition, links.terms, links.covered, links.words))
+    return rows
+
+
+def linked_terms(links):
+    """
+    Возвращает разные термины из разметки в порядке первого вхождения в текст.
+
+    Аргументы:
+        links (TextLinks): Разметка текста (см. `annotate`).
+
+    Возвращает:
+        list: Пары (термин, определение).
+    """
+    seen = {}
+    for _, _, term, definition in links.spans:
+        seen.setdefault(term, definition)
+    return list(seen.items())
@@ -2,53 +2,169 @@
 Модуль для работы с терминами и их определениями.
 
 Здесь реализованы функции для:
-- Чтения и записи терминов в CSV файл.
+- Чтения и записи терминов.
+- Массового импорта терминов с проверкой и удалением дубликатов.
 - Подсчета статистики по терминам и их определениям.
+
+Сами данные хранятся в репозитории (см. модуль `repositories`): в CSV файле
+`./data/terms.csv` или в базе SQLite, в зависимости от настройки `DATA_BACKEND`.
+
+Статистика словаря ведется накопительно (агрегат): количество терминов по
+источникам, сумма длин определений и гистограмма длин. При добавлении термина
+агрегат дополняется только новыми строками и сохраняется в файл
+`./data/terms_stats.json`, поэтому страница статистики не перебирает словарь.
 """
 
+import json
+import os
+import threading
+
+from .metrics import timed
+from .repositories import get_repository
+
+# Файл с сохраненным агрегатом статистики
+STATS_FILE = "./data/terms_stats.json"
+
+# Агрегат статистики в памяти процесса (None — еще не загружен)
+_aggregate = None
+_aggregate_lock = threading.Lock()
+
+
+@timed
 def get_terms_for_table():
     """
-    Читает данные из CSV файла с терминами и их определениями и возвращает список строк в формате таблицы.
+    Возвращает список терминов и их определений в формате таблицы.
 
     Ожидается, что файл CSV имеет следующую структуру:
     - Каждая строка содержит термин, его определение и источник, разделенные точкой с запятой.
     - Первая строка в файле должна быть заголовком и игнорируется.
 
+    Данные берутся из репозитория. Для CSV хранилища файл разбирается и
+    сортируется только один раз после каждого изменения, а возвращаемый список
+    общий для всех запросов и не должен изменяться вызывающим кодом.
+
     Возвращает:
-        list: Список списков, где каждый элемент содержит:
+        list: Список записей TermRow (см. модуль `records`), где каждый элемент содержит:
             - Номер строки в таблице (начиная с 1)
             - Термин
             - Определение термина
 
     Пример возвращаемого значения:
         [
-            [1, 'Term1', 'Definition of term 1'],
-            [2, 'Term2', 'Definition of term 2'],
+            TermRow(cnt=1, term='Term1', definition='Definition of term 1'),
+            TermRow(cnt=2, term='Term2', definition='Definition of term 2'),
             ...
         ]
     """
-    terms = []
-    with open("./data/terms.csv", "r", encoding="utf-8") as f:
-        cnt = 1
-        for line in f.readlines()[1:]:
-            term, definition, source = line.split(";")
-            terms.append([cnt, term, definition])
-            cnt += 1
-  # Сортировка только по английскому терминусу (первый элемент)
-    terms.sort(key=lambda x: x[1].lower())  # .lower() для регистронезависимой сортировки
-    
-    return terms
+    return get_repository().get_terms()
+
+
+@timed
+def count_terms():
+    """
+    Возвращает количество терминов в словаре.
+
+    Возвращает:
+        int: Количество терминов.
+    """
+    return get_repository().count_terms()
+
+
+@timed
+def get_terms_page(page, per_page):
+    """
+    Возвращает одну страницу таблицы терминов.
+
+    Эта функция не строит таблицу целиком: CSV хранилище берет срез из уже
+    отсортированного списка в памяти, SQLite хранилище выполняет запрос с
+    LIMIT/OFFSET по индексу.
+
+    Аргументы:
+        page (int): Номер страницы (начиная с 1).
+        per_page (int): Количество терминов на странице.
+
+    Возвращает:
+        list: Строки таблицы в том же формате, что и у `get_terms_for_table`.
+
+    Пример:
+        get_terms_page(2, 50)  # термины с 51-го по 100-й
+    """
+    return get_repository().get_terms_page((page - 1) * per_page, per_page)
 
 
+@timed
+def get_terms_after(term, limit, position=None):
+    """
+    Возвращает строки таблицы терминов, следующие за указанным термином (курсор по ключу).
+
+    В отличие от `get_terms_page`, стоимость не зависит от того, насколько далеко
+    от начала словаря находится страница: поиск позиции выполняется бинарным
+    поиском (CSV) или по индексу (SQLite).
+
+    Аргументы:
+        term (str): Последний термин предыдущей страницы.
+        limit (int): Максимальное количество строк.
+        position (int | None): Номер термина term в словаре, если известен (SQLite
+                               нумерует строки от него, без него номера не считаются).
+
+    Возвращает:
+        list: Строки таблицы в том же формате, что и у `get_terms_for_table`.
+
+    Пример:
+        get_terms_after("beer", 50)
+    """
+    return get_repository().get_terms_after(term, limit, position)
+
+
+@timed
+def get_term_changes(since, limit):
+    """
+    Возвращает добавленные термины с номером изменения больше since (лента изменений).
+
+    Клиент синхронизации хранит эпоху и номер последнего полученного изменения и
+    запрашивает только новые изменения: стоимость зависит от их количества, а не
+    от размера словаря (для CSV хранилища изменения берутся из таблицы терминов
+    по номеру записи, для SQLite — по id).
+
+    Аргументы:
+        since (int): Номер последнего изменения, которое уже есть у клиента (0 — ни одного).
+        limit (int): Максимальное количество изменений.
+
+    Возвращает:
+        tuple: (эпоха, номер последнего изменения в словаре, список пар (номер изменения, Term)).
+
+    Пример:
+        get_term_changes(1200, 1000)  # ("3f2a….1234", 1202, [(1201, Term(...)), (1202, Term(...))])
+    """
+    return get_repository().get_term_changes(since, limit)
+
+
+@timed
+def get_terms_snapshot():
+    """
+    Возвращает словарь целиком для первой синхронизации по ленте изменений.
+
+    Возвращает:
+        tuple: (эпоха, номер последнего изменения, итерируемые записи Term в порядке номеров).
+
+    Пример:
+        epoch, seq, records = get_terms_snapshot()
+    """
+    return get_repository().get_terms_snapshot()
+
+
+@timed
 def write_term(new_term, new_definition):
     """
-    Добавляет новый термин и его определение в файл CSV, сортируя термины в алфавитном порядке.
+    Добавляет новый термин и его определение в словарь.
 
-    Эта функция:
-    - Считывает существующие термины из файла CSV.
-    - Добавляет новый термин и его определение в файл.
-    - Сортирует все термины в алфавитном порядке.
-    - Перезаписывает файл с обновленным списком терминов.
+    Эта функция передает термин репозиторию:
+    - CSV хранилище дописывает одну строку в конец файла под межпроцессной
+      блокировкой и сбрасывает ее на диск (fsync). Сортировка выполняется при
+      чтении и при уплотнении файла функцией `compact_terms`.
+    - SQLite хранилище выполняет один INSERT в транзакции.
+
+    После записи в агрегат статистики добавляется новый термин.
 
     Аргументы:
         new_term (str): Новый термин, который будет добавлен в файл.
@@ -60,28 +176,201 @@ def write_term(new_term, new_definition):
     Пример:
         write_term("new_term", "This is a new term's definition.")
     """
-    new_term_line = f"{new_term};{new_definition};user"
-    with open("./data/terms.csv", "r", encoding="utf-8") as f:
-        existing_terms = [l.strip("\n") for l in f.readlines()]
-        title = existing_terms[0]
-        old_terms = existing_terms[1:]
-    
-    terms_sorted = old_terms + [new_term_line]
-    terms_sorted.sort()
-    new_terms = [title] + terms_sorted
-    
-    with open("./data/terms.csv", "w", encoding="utf-8") as f:
-        f.write("\n".join(new_terms))
+    get_repository().add_term(new_term, new_definition, "user")
+    _refresh_aggregate()
+
+
+def clean_term(term, definition):
+    """
+    Нормализует и проверяет термин перед импортом.
+
+    Эта функция:
+    - Убирает лишние пробелы в термине и определении.
+    - Заменяет ";" в определении на "," (как при добавлении термина через сайт).
+    - Отклоняет пустой термин или определение и термин с символом ";".
+
+    Аргументы:
+        term (str): Термин.
+        definition (str): Определение.
 
+    Возвращает:
+        tuple: (термин, определение, причина отказа или None).
+
+    Пример:
+        clean_term("  big   apple ", "Нью-Йорк; город")  # ("big apple", "Нью-Йорк, город", None)
+    """
+    term = " ".join(term.split())
+    definition = " ".join(definition.split()).replace(";", ",")
+    if not term:
+        return term, definition, "пустой термин"
+    if not definition:
+        return term, definition, "пустое определение"
+    if ";" in term:
+        return term, definition, "символ ; в термине"
+    return term, definition, None
+
+
+@timed
+def import_terms(records, source="db"):
+    """
+    Добавляет в словарь много терминов за один проход.
+
+    Термины передаются репозиторию одним потоком: CSV хранилище сливает их с файлом
+    терминов в отсортированном порядке (внешнее слияние с ограниченной памятью),
+    SQLite хранилище вставляет их в одной транзакции. Термины, уже имеющиеся в
+    словаре (без учета регистра и лишних пробелов), пропускаются.
+
+    Аргументы:
+        records (iterable): Пары (термин, определение), уже проверенные `clean_term`.
+        source (str): Источник новых терминов.
+
+    Возвращает:
+        dict: {"added": добавлено, "duplicates": пропущено дубликатов}.
+
+    Пример:
+        import_terms([("apple", "яблоко"), ("pear", "груша")])
+    """
+    result = get_repository().add_terms(records, source)
+    _refresh_aggregate()
+    return result
+
+
+@timed
+def compact_terms():
+    """
+    Уплотняет хранилище терминов.
+
+    Для CSV хранилища файл переписывается в отсортированном виде с атомарной
+    заменой (новые термины `write_term` только дописывает в конец файла).
 
+    Возвращает:
+        int: Количество терминов после уплотнения.
+
+    Пример:
+        compact_terms()
+    """
+    return get_repository().compact_terms()
+
+
+def _empty_aggregate():
+    """
+    Возвращает пустой агрегат статистики.
 
+    Возвращает:
+        dict: Словарь с ключами:
+            - "position": Позиция в репозитории, до которой учтены термины.
+            - "sources": Количество терминов по источникам ("db", "user", ...).
+            - "words_sum": Сумма количества слов во всех определениях.
+            - "histogram": Количество определений для каждой длины (в словах).
+    """
+    return {"position": None, "sources": {}, "words_sum": 0, "histogram": {}}
+
+
+def _load_aggregate():
+    """
+    Загружает агрегат статистики из файла `STATS_FILE`.
+
+    Возвращает:
+        dict: Агрегат статистики. Если файла нет или он поврежден — пустой агрегат.
+    """
+    try:
+        with open(STATS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return _empty_aggregate()
+    position = data.get("position")
+    return {
+        "position": tuple(position) if isinstance(position, list) else position,
+        "sources": data.get("sources", {}),
+        "words_sum": data.get("words_sum", 0),
+        # В JSON ключи словаря — строки, а длины определений — числа
+        "histogram": {int(k): v for k, v in data.get("histogram", {}).items()},
+    }
+
+
+def _save_aggregate(aggregate):
+    """
+    Сохраняет агрегат статистики в файл `STATS_FILE` через атомарную замену.
+
+    Аргументы:
+        aggregate (dict): Агрегат статистики.
+    """
+    tmp_path = f"{STATS_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(aggregate, f, ensure_ascii=False)
+    os.replace(tmp_path, STATS_FILE)
+
+
+def _refresh_aggregate():
+    """
+    Дополняет агрегат статистики терминами, добавленными с прошлого обновления.
+
+    Эта функция:
+    - При первом вызове загружает агрегат из файла `STATS_FILE`.
+    - Запрашивает у репозитория только новые термины (хвост файла или новые строки таблицы).
+    - Если репозиторий вернул термины с начала (например, после уплотнения файла),
+      пересчитывает агрегат заново.
+    - Сохраняет агрегат в файл, если он изменился.
+
+    Возвращает:
+        dict: Актуальный агрегат статистики.
+    """
+    global _aggregate
+    with _aggregate_lock:
+        if _aggregate is None:
+            _aggregate = _load_aggregate()
+        rows, position, reset = get_repository().get_term_rows_since(_aggregate["position"])
+        if position == _aggregate["position"] and not rows and not reset:
+            return _aggregate
+
+        aggregate = _empty_aggregate() if reset else _aggregate
+        sources = aggregate["sources"]
+        histogram = aggregate["histogram"]
+        for term, defin, added_by in rows:
+            words = len(defin.split())
+            aggregate["words_sum"] += words
+            histogram[words] = histogram.get(words, 0) + 1
+            sources[added_by] = sources.get(added_by, 0) + 1
+        aggregate["position"] = position
+        _aggregate = aggregate
+        _save_aggregate(aggregate)
+        return aggregate
+
+
+def _histogram_percentile(histogram, total, percent):
+    """
+    Находит значение процентиля по гистограмме.
+
+    Аргументы:
+        histogram (dict): Количество определений для каждой длины.
+        total (int): Общее количество определений.
+        percent (float): Процентиль (от 0 до 100).
+
+    Возвращает:
+        int: Наименьшая длина, не меньше которой не превышают percent% определений.
+    """
+    rank = max(1, -(-total * percent // 100))  # округление вверх
+    seen = 0
+    for length in sorted(histogram):
+        seen += histogram[length]
+        if seen >= rank:
+            return length
+    return 0
+
+
+@timed
 def get_terms_stats():
     """
-    Рассчитывает статистику по терминам и их определениям из файла CSV.
+    Рассчитывает статистику по терминам и их определениям.
+
+    Статистика берется из накопительного агрегата: при каждом вызове в него
+    добавляются только термины, появившиеся с прошлого раза, а итоговые
+    значения вычисляются по гистограмме длин определений, без перебора словаря.
 
     Эта функция:
     - Подсчитывает общее количество терминов, добавленных пользователями и из базы данных.
-    - Рассчитывает среднее количество слов в определении, максимальную и минимальную длину определения (в словах).
+    - Рассчитывает среднее, медианное, максимальное и минимальное количество слов в определении,
+      а также 90-й процентиль.
     - Возвращает словарь с полученной статистикой.
 
     Возвращает:
@@ -92,6 +381,8 @@ def get_terms_stats():
             - "words_avg": Среднее количество слов в определениях.
             - "words_max": Максимальное количество слов в определении.
             - "words_min": Минимальное количество слов в определении.
+            - "words_median": Медианное количество слов в определении.
+            - "words_p90": 90-й процентиль количества слов в определении.
 
     Пример возвращаемого значения:
         {
@@ -100,30 +391,26 @@ def get_terms_stats():
             "terms_added": 20,
             "words_avg": 15.2,
             "words_max": 30,
-            "words_min": 5
+            "words_min": 5,
+            "words_median": 14,
+            "words_p90": 25
         }
     """
-    db_terms = 0
-    user_terms = 0
-    defin_len = []
-    
-    with open("./data/terms.csv", "r", encoding="utf-8") as f:
-        for line in f.readlines()[1:]:
-            term, defin, added_by = line.split(";")
-            words = defin.split()
-            defin_len.append(len(words))
-            if "user" in added_by:
-                user_terms += 1
-            elif "db" in added_by:
-                db_terms += 1
-    
+    aggregate = _refresh_aggregate()
+    histogram = aggregate["histogram"]
+    total = sum(histogram.values())
+    db_terms = aggregate["sources"].get("db", 0)
+    user_terms = aggregate["sources"].get("user", 0)
+
     stats = {
         "terms_all": db_terms + user_terms,
         "terms_own": db_terms,
         "terms_added": user_terms,
-        "words_avg": sum(defin_len)/len(defin_len),
-        "words_max": max(defin_len),
-        "words_min": min(defin_len)
+        "words_avg": aggregate["words_sum"] / total if total else 0,
+        "words_max": max(histogram) if histogram else 0,
+        "words_min": min(histogram) if histogram else 0,
+        "words_median": _histogram_percentile(histogram, total, 50),
+        "words_p90": _histogram_percentile(histogram, total, 90),
     }
-    
-    return  stats
+
+    return stats
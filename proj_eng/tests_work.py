@@ -9,40 +9,289 @@
 Функции:
 - get_tests(): Читает тесты из файла CSV и возвращает их в виде списка с индексами.
 - write_tests(): Записывает тесты в CSV файл.
+- normalize_answer(): Приводит ответ к нормальной форме для сравнения.
+- get_test_bank(): Возвращает банк тестов с подготовленными ключами ответов.
+- grade_submission(): Проверяет ответы одного пользователя.
+- grade_submissions(): Проверяет пачку ответов многих пользователей.
+- sample_positions(): Выбирает случайные позиции вопросов по зерну генератора.
+- start_session(): Выбирает вопросы для сессии теста одного ученика.
+- grade_session(): Проверяет ответы на вопросы сессии теста.
+
+Данные хранятся в репозитории (см. модуль `repositories`).
+
+Банк тестов (вопросы и нормализованные ключи ответов) строится один раз и
+переиспользуется, пока не изменится версия данных тестов в репозитории.
+
+Сессия теста содержит только `SESSION_QUESTIONS` случайных вопросов: их позиции
+выбираются без загрузки всех тестов (см. `sample_positions`), а из репозитория
+читаются только выбранные вопросы. Номера вопросов и правильные ответы
+сохраняются в сессии пользователя, и при проверке учитываются только они.
 """
 
+import random
+import re
+import secrets
+import threading
+import unicodedata
+
+from .metrics import cache_access, timed
+from .records import Question
+from .repositories import get_repository
+
+# Допустимые варианты ответа для правильных ответов из tests.csv (кроме самого ответа)
+ANSWER_SYNONYMS = {
+    "Франция": ["France", "Французская Республика"],
+    "Россия": ["Russia", "РФ", "Российская Федерация"],
+    "Германия": ["Germany", "ФРГ", "Deutschland"],
+    "США": ["USA", "US", "United States", "Америка", "Соединенные Штаты Америки", "Соединенные Штаты"],
+}
+
+# Количество вопросов в одной сессии теста
+SESSION_QUESTIONS = 10
+
+_SPACES_RE = re.compile(r"\s+")
+
+# Банк тестов для определенной версии данных
+_bank = {"version": None, "questions": [], "keys": {}}
+_bank_lock = threading.Lock()
+
+
+@timed
 def get_tests():
     """
-    Читает данные о тестах из CSV файла и возвращает список тестов с их индексами.
+    Читает данные о тестах из репозитория и возвращает список тестов с их индексами.
 
     Эта функция:
-    - Читает строки из файла CSV, пропуская первую строку (заголовок).
-    - Пропускает строки с некорректным форматом (меньше двух частей).
+    - Для CSV хранилища читает строки из файла, пропуская первую строку (заголовок).
+    - Пропускает строки с некорректным форматом (количество полей не равно двум), см. модуль `csv_reader`.
     - Возвращает список, состоящий из кортежей, каждый из которых содержит:
       - Индекс строки.
       - Текст теста.
       - Страну, к которой относится тест.
 
     Возвращает:
-        list: Список кортежей, каждый из которых состоит из:
+        list: Список записей Question (см. модуль `records`), каждая из которых состоит из:
             - Индекса теста (начиная с 1),
             - Текста теста,
             - Страны.
     
     Пример возвращаемого значения:
         [
-            (1, 'Test 1 text', 'Country 1'),
-            (2, 'Test 2 text', 'Country 2'),
+            Question(cnt=1, text='Test 1 text', country='Country 1'),
+            Question(cnt=2, text='Test 2 text', country='Country 2'),
             ...
         ]
     """
-    tests = []
-    with open("./data/tests.csv", "r", encoding="utf-8") as f:
-        lines = f.readlines()[1:]  # Пропускаем заголовок
-        for i, line in enumerate(lines, 1):
-            parts = line.strip().split(";")
-            if len(parts) < 2:
-                continue  # пропускаем битые строки
-            text, country = parts[:2]
-            tests.append((i, text, country))
-    return tests
+    return get_repository().get_tests()
+
+
+def normalize_answer(answer):
+    """
+    Приводит ответ к нормальной форме для сравнения.
+
+    Эта функция:
+    - Нормализует Unicode (NFKC), чтобы одинаковые буквы в разных кодировках совпадали.
+    - Приводит строку к нижнему регистру без учета особенностей языка (casefold).
+    - Заменяет "ё" на "е", убирает точки и лишние пробелы.
+
+    Аргументы:
+        answer (str): Ответ пользователя или правильный ответ.
+
+    Возвращает:
+        str: Нормализованный ответ.
+
+    Пример:
+        normalize_answer("  С.Ш.А. ")  # "сша"
+    """
+    answer = unicodedata.normalize("NFKC", answer).casefold().replace("ё", "е").replace(".", "")
+    return _SPACES_RE.sub(" ", answer).strip()
+
+
+@timed
+def get_test_bank():
+    """
+    Возвращает банк тестов с подготовленными ключами ответов.
+
+    Банк строится один раз на каждую версию данных тестов: правильный ответ и его
+    синонимы из `ANSWER_SYNONYMS` нормализуются и сохраняются во множество.
+
+    Возвращает:
+        dict: Словарь с ключами:
+            - "version": Версия данных тестов, для которой построен банк.
+            - "questions": Список записей Question.
+            - "keys": Словарь {номер вопроса: frozenset допустимых нормализованных ответов}.
+    """
+    global _bank
+    repository = get_repository()
+    version = repository.data_version("tests")
+    bank = _bank
+    if bank["version"] == version:
+        cache_access("test_bank", True)
+        return bank
+    with _bank_lock:
+        cache_access("test_bank", _bank["version"] == version)
+        if _bank["version"] != version:
+            _bank = _make_bank(version, repository.get_tests())
+        return _bank
+
+
+def _make_bank(version, questions):
+    """Строит банк тестов: нормализует правильные ответы и их синонимы."""
+    keys = {
+        question.cnt: frozenset(
+            normalize_answer(answer)
+            for answer in [question.country] + ANSWER_SYNONYMS.get(question.country, [])
+        )
+        for question in questions
+    }
+    return {"version": version, "questions": questions, "keys": keys}
+
+
+@timed
+def grade_submission(answers, bank=None, submitted_only=False):
+    """
+    Проверяет ответы одного пользователя.
+
+    Ответ, который не является строкой (или отсутствует), считается пустым и в
+    строку не превращается.
+
+    Аргументы:
+        answers (dict): Ответы пользователя {номер вопроса: ответ}.
+        bank (dict): Банк тестов (по умолчанию — результат `get_test_bank()`).
+        submitted_only (bool): Проверять только вопросы, номера которых есть в answers
+                               (иначе — все вопросы банка, неотвеченные считаются неверными).
+
+    Возвращает:
+        dict: Словарь с ключами:
+            - "submitted_data": Список кортежей (номер, текст, ответ, правильный ответ, верно ли).
+            - "correct": Количество правильных ответов.
+            - "total": Количество проверенных вопросов.
+            - "score": Процент правильных ответов.
+
+    Пример:
+        grade_submission({1: "франция", 2: "Russia"})
+    """
+    if bank is None:
+        bank = get_test_bank()
+    keys = bank["keys"]
+    submitted_data = []
+    correct_count = 0
+    for cnt, text, correct_country in bank["questions"]:
+        if submitted_only and cnt not in answers:
+            continue
+        answer = answers.get(cnt)
+        user_input = answer.strip() if isinstance(answer, str) else ""
+        is_correct = normalize_answer(user_input) in keys[cnt]
+        submitted_data.append((cnt, text, user_input, correct_country, is_correct))
+        correct_count += is_correct
+    total_count = len(submitted_data)
+    return {
+        "submitted_data": submitted_data,
+        "correct": correct_count,
+        "total": total_count,
+        "score": (correct_count / total_count) * 100 if total_count else 0,
+    }
+
+
+@timed
+def grade_submissions(submissions):
+    """
+    Проверяет пачку ответов многих пользователей за один проход.
+
+    Банк тестов загружается один раз на всю пачку. В каждой пачке проверяются
+    только вопросы, на которые пользователь прислал ответ (номера, которых нет в
+    банке, пропускаются).
+
+    Аргументы:
+        submissions (list): Список словарей {номер вопроса: ответ}.
+
+    Возвращает:
+        list: Результаты `grade_submission` в том же порядке.
+    """
+    bank = get_test_bank()
+    return [grade_submission(answers, bank, submitted_only=True) for answers in submissions]
+
+
+def sample_positions(count, size, seed):
+    """
+    Выбирает size разных позиций из range(count) по зерну генератора.
+
+    Выбор идет по номерам позиций (`random.Random.sample` по range), поэтому время
+    и память зависят только от size, а не от количества вопросов. Одно и то же
+    зерно дает те же позиции, пока не изменилось количество вопросов.
+
+    Аргументы:
+        count (int): Количество вопросов.
+        size (int): Сколько вопросов нужно выбрать.
+        seed (int): Зерно генератора случайных чисел.
+
+    Возвращает:
+        list: Позиции по возрастанию.
+
+    Пример:
+        sample_positions(100_000, 3, 42)  # [3278, 14592, 83810]
+    """
+    return sorted(random.Random(seed).sample(range(count), min(size, count)))
+
+
+@timed
+def start_session(size=SESSION_QUESTIONS, seed=None):
+    """
+    Выбирает вопросы для новой сессии теста.
+
+    Эта функция:
+    - Выбирает позиции вопросов функцией `sample_positions` (при seed=None — случайное зерно).
+    - Читает из репозитория только выбранные вопросы.
+    - Возвращает данные сессии: зерно, номера вопросов и правильные ответы к ним.
+      Тексты вопросов в сессию не попадают.
+
+    Аргументы:
+        size (int): Количество вопросов в сессии.
+        seed (int | None): Зерно генератора случайных чисел.
+
+    Возвращает:
+        tuple: (данные сессии {"seed": ..., "numbers": [...], "answers": [...]}, список записей Question).
+
+    Пример:
+        session, questions = start_session(seed=42)
+    """
+    if seed is None:
+        seed = secrets.randbits(32)
+    repository = get_repository()
+    questions = repository.get_tests_at(sample_positions(repository.count_tests(), size, seed))
+    session = {
+        "seed": seed,
+        "numbers": [question.cnt for question in questions],
+        "answers": [question.country for question in questions],
+    }
+    return session, questions
+
+
+@timed
+def grade_session(session, answers):
+    """
+    Проверяет ответы на вопросы сессии теста.
+
+    Эта функция:
+    - Сверяет ответы с правильными ответами, сохраненными в сессии (а не с текущим
+      файлом тестов), поэтому изменение тестов во время сессии не меняет оценку.
+    - Читает из репозитория тексты только вопросов сессии. Если вопрос с этим номером
+      изменился или удален, текст вопроса в результатах остается пустым.
+
+    Аргументы:
+        session (dict): Данные сессии (см. `start_session`).
+        answers (dict): Ответы пользователя {номер вопроса: ответ}.
+
+    Возвращает:
+        dict: Результат в том же виде, что у `grade_submission`.
+
+    Пример:
+        grade_session(session, {17: "Франция", 204: "Russia"})
+    """
+    current = {question.cnt: question for question in get_repository().get_tests_by_numbers(session["numbers"])}
+    questions = []
+    for cnt, country in zip(session["numbers"], session["answers"]):
+        question = current.get(cnt)
+        text = question.text if question is not None and question.country == country else ""
+        questions.append(Question(cnt, text, country))
+    return grade_submission(answers, _make_bank(None, questions))
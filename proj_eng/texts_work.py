@@ -7,35 +7,89 @@
 
 Функции:
 - get_texts_for_table(): Читает данные из CSV файла с текстами и их определениями, возвращая список строк для таблицы.
-- Другие функции для обработки текстов (если есть).
+- count_texts(): Возвращает количество текстов.
+- get_texts_page(): Возвращает одну страницу таблицы текстов.
+- get_text(): Возвращает один текст по номеру.
+
+Данные хранятся в репозитории (см. модуль `repositories`).
 """
 
+from .metrics import timed
+from .repositories import get_repository
+
+
+@timed
 def get_texts_for_table():
     """
-    Читает данные из CSV файла с текстами и их определениями и возвращает список строк для таблицы.
+    Читает данные о текстах и их определениях из репозитория и возвращает список строк для таблицы.
 
     Ожидается, что файл CSV имеет следующую структуру:
     - Каждая строка содержит текст, его определение и источник, разделенные точкой с запятой.
     - Первая строка в файле должна быть заголовком и игнорируется.
 
     Возвращает:
-        list: Список строк, каждая из которых содержит:
+        list: Список записей Text (см. модуль `records`), каждая из которых содержит:
             - Номер строки в таблице (начиная с 1)
             - Текст
             - Определение текста
 
     Пример возвращаемого значения:
         [
-            [1, 'Text1', 'Definition of text 1'],
-            [2, 'Text2', 'Definition of text 2'],
+            Text(cnt=1, text='Text1', definition='Definition of text 1'),
+            Text(cnt=2, text='Text2', definition='Definition of text 2'),
             ...
         ]
     """
-    texts = []
-    with open("./data/texts.csv", "r", encoding="utf-8") as f:
-        cnt = 1
-        for line in f.readlines()[1:]:
-            text, definition, source = line.split(";")
-            texts.append([cnt, text, definition])
-            cnt += 1
-    return texts
+    return get_repository().get_texts()
+
+
+@timed
+def count_texts():
+    """
+    Возвращает количество текстов.
+
+    Возвращает:
+        int: Количество текстов.
+    """
+    return get_repository().count_texts()
+
+
+@timed
+def get_texts_page(page, per_page):
+    """
+    Возвращает одну страницу таблицы текстов.
+
+    Для CSV хранилища тексты страницы читаются по смещениям из индекса
+    (см. `CsvRepository`), остальные тексты не разбираются.
+
+    Аргументы:
+        page (int): Номер страницы (начиная с 1).
+        per_page (int): Количество текстов на странице.
+
+    Возвращает:
+        list: Строки таблицы в том же формате, что и у `get_texts_for_table`.
+
+    Пример:
+        get_texts_page(1, 10)
+    """
+    return get_repository().get_texts_page((page - 1) * per_page, per_page)
+
+
+@timed
+def get_text(number):
+    """
+    Возвращает один текст по номеру.
+
+    Для CSV хранилища строка читается напрямую по смещению из индекса, поэтому
+    время не зависит от количества текстов в файле.
+
+    Аргументы:
+        number (int): Номер текста (начиная с 1), как в таблице текстов.
+
+    Возвращает:
+        Text | None: Запись Text (номер, текст, перевод) или None, если текста нет.
+
+    Пример:
+        get_text(2)  # Text(cnt=2, text='...', definition='...')
+    """
+    return get_repository().get_text(number)
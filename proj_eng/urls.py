@@ -12,29 +12,54 @@ URL-конфигурация для проекта `proj_maths`.
 - `'send-term/'`: Страница для отправки термина.
 - `'stats/'`: Страница для отображения статистики.
 - `'texts-list/'`: Страница для отображения списка текстов.
+- `'texts/<номер>/'`: Страница одного текста с переводом.
 - `'test-input/'`: Страница для ввода тестовых данных.
+- `'terms-search/'`: Поиск по словарю (JSON или HTML-фрагмент).
+- `'api/tests/grade/'`: Проверка пачки ответов на тест (JSON API).
+- `'review/'`: Интервальное повторение слов из словаря.
+- `'api/reviews/next/'`, `'api/reviews/grade/'`: Выдача и оценка карточек повторения (JSON API).
+- `'api/terms/changes/'`, `'api/terms/snapshot/'`: Синхронизация словаря: лента изменений и словарь целиком (JSON API).
+- `'metrics'`: Метрики производительности в формате Prometheus.
+- `'static/<путь>'`: Собранные статические файлы (сжатые варианты, долгое кэширование).
+
+При `ASYNC_VIEWS = True` страницы словаря, текстов (списка и отдельного текста), теста, добавления термина
+и статистики обслуживаются асинхронными представлениями из `async_views`.
 
 Функции:
 - `path()`: Связывает URL с соответствующим представлением.
-- `static()`: Обрабатывает статические файлы.
+- `re_path()`: Связывает шаблон URL с представлением раздачи статических файлов.
 
 Для более подробной информации о маршрутизации в Django, см. документацию:
 https://docs.djangoproject.com/en/4.1/topics/http/urls/
 """
 
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from . import views
+from . import async_views
+from .metrics import metrics_view
+from .static_assets import serve_static
 
+# Представления страниц с данными: асинхронные под ASGI или обычные синхронные
+pages = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path('', views.index, name='home'),
-    path('terms-list/', views.terms_list, name='terms_list'),
+    path('terms-list/', pages.terms_list, name='terms_list'),
     path('add-term/', views.add_term, name='add_term'),
-    path('send-term/', views.send_term, name='send_term'),
-    path('stats/', views.show_stats, name='stats'),
-    path('texts-list/', views.texts_list, name='texts_list'),
-    path('test-input/',views.test_input, name='test-input')
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    path('send-term/', pages.send_term, name='send_term'),
+    path('stats/', pages.show_stats, name='stats'),
+    path('texts-list/', pages.texts_list, name='texts_list'),
+    path('texts/<int:number>/', pages.text_detail, name='text_detail'),
+    path('test-input/',pages.test_input, name='test-input'),
+    path('terms-search/', views.terms_search, name='terms_search'),
+    path('api/tests/grade/', views.tests_grade, name='tests_grade'),
+    path('review/', views.review, name='review'),
+    path('api/reviews/next/', views.reviews_next, name='reviews_next'),
+    path('api/reviews/grade/', views.reviews_grade, name='reviews_grade'),
+    path('api/terms/changes/', views.terms_changes, name='terms_changes'),
+    path('api/terms/snapshot/', views.terms_snapshot, name='terms_snapshot'),
+    path('metrics', metrics_view, name='metrics'),
+    re_path(r'^%s(?P<path>.+)$' % settings.STATIC_URL.lstrip('/'), serve_static, name='static'),
+]
@@ -11,15 +11,27 @@
     - index: Отображает главную страницу сайта.
     - terms_list: Отображает список терминов.
     - texts_list: Отображает список текстов.
+    - text_detail: Отображает один текст с переводом.
     - test_input: Обрабатывает тестовый запрос и отображает результаты.
     - add_term: Отображает страницу для добавления нового термина.
     - send_term: Обрабатывает добавление нового термина.
-    - show_stats: Отображает статистику по терминам.
+    - show_stats: Отображает статистику по терминам и результатам теста.
+    - terms_search: Ищет термины в словаре (JSON или HTML-фрагмент).
+    - tests_grade: Проверяет пачку ответов на тест (JSON API).
+    - review: Страница интервального повторения слов.
+    - reviews_next: Выдает карточки для повторения (JSON API).
+    - reviews_grade: Принимает оценку карточки (JSON API).
+    - terms_changes: Лента изменений словаря для клиентов синхронизации (JSON API).
+    - terms_snapshot: Словарь целиком для первой синхронизации (JSON API).
 
 Используемые модули:
     - terms_work: Модуль для работы с терминами.
     - texts_work: Модуль для работы с текстами.
     - tests_work: Модуль для работы с тестами.
+    - search_work: Модуль поиска по словарю.
+    - review_work: Модуль интервального повторения слов.
+    - row_cache: Кэш готовых HTML-фрагментов строк таблиц.
+    - term_linker: Подсветка слов словаря в текстах.
 
 Описание функций:
     index(request):
@@ -31,6 +43,9 @@
     texts_list(request):
         Обрабатывает HTTP запрос и рендерит страницу с таблицей текстов.
 
+    text_detail(request, number):
+        Обрабатывает HTTP запрос и рендерит страницу одного текста.
+
     test_input(request):
         Обрабатывает запрос для выполнения теста и отображения результатов.
 
@@ -41,14 +56,163 @@
         Обрабатывает POST запрос для добавления нового термина в систему.
 
     show_stats(request):
-        Обрабатывает запрос и отображает статистику по терминам.
+        Обрабатывает запрос и отображает статистику по терминам и результатам теста.
+
+    terms_search(request):
+        Обрабатывает запрос поиска по словарю и возвращает найденные термины.
+
+    tests_grade(request):
+        Обрабатывает POST запрос с пачкой ответов на тест и возвращает оценки.
+
+    review(request):
+        Показывает следующую карточку для повторения и принимает ее оценку.
+
+    reviews_next(request), reviews_grade(request):
+        JSON API интервального повторения: выдача и оценка карточек.
+
+    terms_changes(request), terms_snapshot(request):
+        JSON API синхронизации словаря: изменения после номера и словарь целиком.
 """
 
-from django.shortcuts import render
-from django.core.cache import cache
+import json
+import uuid
+
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from . import terms_work
 from . import texts_work
 from . import tests_work
+from . import results_work
+from . import search_work
+from . import review_work
+from . import row_cache
+from . import term_linker
+from .page_cache import cached_page, invalidate
+
+# Количество строк на одной странице таблиц
+TERMS_PER_PAGE = 50
+TEXTS_PER_PAGE = 10
+# Максимальное количество результатов поиска по словарю
+SEARCH_LIMIT = 10
+# Максимальное количество ответов в одном запросе к API проверки тестов
+GRADE_BATCH_LIMIT = 10000
+# Максимальный размер тела запроса к API проверки тестов в байтах (как DATA_UPLOAD_MAX_MEMORY_SIZE Django)
+GRADE_BODY_LIMIT = 2_621_440
+# Количество карточек повторения по умолчанию и максимальное в одном запросе
+REVIEW_LIMIT = 10
+REVIEW_MAX_LIMIT = 100
+# Количество изменений словаря в одном ответе ленты изменений по умолчанию и максимальное
+CHANGES_LIMIT = 1000
+CHANGES_MAX_LIMIT = 10000
+# Количество терминов, которые сериализуются за один шаг при выдаче словаря целиком
+SNAPSHOT_CHUNK = 1000
+# Ключ, под которым в сессии пользователя хранятся вопросы текущего теста (см. tests_work.start_session)
+TEST_SESSION_KEY = "test_session"
+
+
+def _get_page_number(request):
+    """
+    Извлекает номер страницы из параметра запроса `?page=`.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса.
+
+    Возвращает:
+        int: Номер страницы (не меньше 1). Некорректное значение считается первой страницей.
+    """
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        page = 1
+    return max(page, 1)
+
+
+def _get_position(request):
+    """
+    Извлекает номер термина курсора из параметра запроса `?pos=`.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса.
+
+    Возвращает:
+        int | None: Номер (не меньше 0) или None, если параметра нет или он некорректен.
+    """
+    try:
+        position = int(request.GET["pos"])
+    except (KeyError, ValueError):
+        return None
+    return position if position >= 0 else None
+
+
+def _get_seed(request):
+    """
+    Извлекает зерно выбора вопросов теста из параметра запроса `?seed=`.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса.
+
+    Возвращает:
+        int | None: Зерно или None, если параметра нет или он некорректен (вопросы выбираются случайно).
+    """
+    try:
+        return int(request.GET["seed"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _get_learner(request):
+    """
+    Возвращает идентификатор ученика, сохраненный в сессии (создает новый при первом обращении).
+
+    Аргументы:
+        request (HttpRequest): Объект запроса.
+
+    Возвращает:
+        str: Идентификатор ученика.
+    """
+    learner = request.session.get("learner")
+    if learner is None:
+        learner = request.session["learner"] = uuid.uuid4().hex
+    return learner
+
+
+def _paginate(page, per_page, total):
+    """
+    Рассчитывает параметры навигации по страницам для шаблона "pagination.html".
+
+    Аргументы:
+        page (int): Запрошенный номер страницы.
+        per_page (int): Количество строк на странице.
+        total (int): Общее количество строк.
+
+    Возвращает:
+        dict: Словарь с ключами "page" (номер страницы, ограниченный их количеством) и "pages".
+    """
+    pages = max((total + per_page - 1) // per_page, 1)
+    return {"page": min(page, pages), "pages": pages}
+
+
+def _terms_page_key(request):
+    """
+    Возвращает параметры, от которых зависит страница таблицы терминов (ключ `cached_page`).
+
+    Курсор (`?after=`, `?pos=`) или номер страницы, ограниченный количеством страниц,
+    как их видит `terms_list`; остальные параметры запроса не учитываются.
+    """
+    after = request.GET.get("after")
+    if after is not None:
+        return "after", after, _get_position(request)
+    return "page", _paginate(_get_page_number(request), TERMS_PER_PAGE, terms_work.count_terms())["page"]
+
+
+def _texts_page_key(request):
+    """Возвращает номер страницы таблицы текстов, как его видит `texts_list` (ключ `cached_page`)."""
+    return "page", _paginate(_get_page_number(request), TEXTS_PER_PAGE, texts_work.count_texts())["page"]
 
 
 def index(request):
@@ -72,13 +236,18 @@ def index(request):
     return render(request, "index.html")
 
 
+@cached_page("terms", key=_terms_page_key)
 def terms_list(request):
     """
     Обрабатывает HTTP запрос и рендерит страницу с таблицей терминов.
 
     Эта функция:
-    - Извлекает список терминов с помощью функции `get_terms_for_table` из модуля `terms_work`.
-    - Передает полученные данные в шаблон "term_list.html".
+    - Извлекает одну страницу терминов из модуля `terms_work`:
+      - `?after=<термин>` — курсор по ключу: термины, следующие за указанным
+        (`&pos=N` — номер этого термина в словаре для нумерации строк);
+      - `?page=N` — страница по номеру (по умолчанию первая).
+    - Собирает строки таблицы из готовых HTML-фрагментов (модуль `row_cache`).
+    - Передает полученные данные и параметры навигации в шаблон "term_list.html".
     - Возвращает HTTP-ответ с отрендеренной страницей, содержащей таблицу терминов.
 
     Аргументы:
@@ -90,17 +259,32 @@ def terms_list(request):
     Пример:
         terms_list(request)
     """
-    terms = terms_work.get_terms_for_table()
-    return render(request, "term_list.html", context={"terms": terms})
-
-
+    after = request.GET.get("after")
+    if after is not None:
+        # Берем на одну строку больше, чтобы узнать, есть ли следующая страница
+        terms = terms_work.get_terms_after(after, TERMS_PER_PAGE + 1, _get_position(request))
+        has_next = len(terms) > TERMS_PER_PAGE
+        terms = terms[:TERMS_PER_PAGE]
+        context = {"terms": terms, "next_after": terms[-1].term if has_next else "",
+                   "next_position": terms[-1].cnt if has_next else None}
+    else:
+        context = _paginate(_get_page_number(request), TERMS_PER_PAGE, terms_work.count_terms())
+        context["terms"] = terms_work.get_terms_page(context["page"], TERMS_PER_PAGE)
+    context["term_rows"] = row_cache.render_rows("terms", context["terms"])
+    return render(request, "term_list.html", context=context)
+
+
+@cached_page("texts", "terms", key=_texts_page_key)
 def texts_list(request):
     """
     Обрабатывает HTTP запрос и рендерит страницу с таблицей текстов.
 
     Эта функция:
-    - Извлекает список текстов с помощью функции `get_texts_for_table` из модуля `texts_work`.
-    - Передает полученные данные в шаблон "text_list.html".
+    - Извлекает одну страницу текстов (`?page=N`) с помощью функции `get_texts_page` из модуля `texts_work`.
+    - Подсвечивает в текстах слова из словаря и считает покрытие текстов словарем (модуль `term_linker`).
+    - Собирает строки таблицы из готовых HTML-фрагментов (модуль `row_cache`).
+    - Передает полученные данные и параметры навигации в шаблон "text_list.html"
+      (в таблице показываются начала текстов со ссылками на страницы текстов).
     - Возвращает HTTP-ответ с отрендеренной страницей, содержащей таблицу текстов.
 
     Аргументы:
@@ -112,8 +296,43 @@ def texts_list(request):
     Пример:
         texts_list(request)
     """
-    texts = texts_work.get_texts_for_table()
-    return render(request, "text_list.html", context={"texts": texts})
+    context = _paginate(_get_page_number(request), TEXTS_PER_PAGE, texts_work.count_texts())
+    context["texts"] = texts_work.get_texts_page(context["page"], TEXTS_PER_PAGE)
+    context["text_rows"] = row_cache.render_rows("texts", term_linker.link_texts(context["texts"]))
+    return render(request, "text_list.html", context=context)
+
+
+@cached_page("texts", "terms")
+def text_detail(request, number):
+    """
+    Обрабатывает HTTP запрос и рендерит страницу одного текста с переводом.
+
+    Эта функция:
+    - Берет текст по номеру с помощью функции `get_text` из модуля `texts_work`
+      (для CSV хранилища — чтение одной строки по смещению, без разбора остальных текстов).
+    - Подсвечивает в тексте слова из словаря (модуль `term_linker`) и собирает их список с переводами.
+    - Передает текст, его разметку и номер страницы таблицы, на которой он находится, в шаблон "text_detail.html".
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+        number (int): Номер текста (начиная с 1).
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "text_detail.html".
+
+    Исключения:
+        Http404: Если текста с таким номером нет.
+
+    Пример:
+        text_detail(request, 3)
+    """
+    text = texts_work.get_text(number)
+    if text is None:
+        raise Http404("Текст не найден")
+    links = term_linker.annotate(text.text)
+    context = {"text": text, "list_page": (number - 1) // TEXTS_PER_PAGE + 1, "links": links,
+               "text_html": term_linker.highlight(text.text, links), "linked_terms": term_linker.linked_terms(links)}
+    return render(request, "text_detail.html", context=context)
 
 
 def test_input(request):
@@ -121,57 +340,129 @@ def test_input(request):
     Обрабатывает HTTP запрос для выполнения теста и отображения результатов.
 
     Эта функция:
-    - Извлекает список тестов с помощью функции `get_tests` из модуля `tests_work`.
-    - Если запрос POST, проверяет введенные пользователем ответы и подсчитывает количество правильных ответов.
-    - Отправляет результаты (в том числе список данных с ответами и итоговую оценку) в шаблон "test_input_form.html".
+    - Если запрос GET, начинает новую сессию теста функцией `start_session` из модуля `tests_work`:
+      выбирает `SESSION_QUESTIONS` случайных вопросов (с параметром `?seed=` — всегда одни и те же)
+      и сохраняет их номера и правильные ответы в сессии пользователя.
+    - Если запрос POST, проверяет ответы только на вопросы из сессии функцией `grade_session`
+      (без учета регистра, с нормализацией и синонимами), записывает результат в журнал
+      результатов (`record_results` из модуля `results_work`) и завершает сессию теста.
+    - Отправляет вопросы или результаты (в том числе список данных с ответами и итоговую оценку)
+      в шаблон "test_input_form.html".
+
+    Страница не кэшируется: у каждого пользователя свои вопросы.
 
     Аргументы:
         request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
 
     Возвращает:
         HttpResponse: Ответ с отрендеренным шаблоном "test_input_form.html", который либо показывает форму для ввода, либо отображает результаты теста.
+        HttpResponseRedirect: Перенаправление на новый тест, если в сессии нет вопросов
+        (форма отправлена повторно или сессия истекла).
 
     Логика:
         Если запрос GET:
-        - Отправляется страница с формой для выполнения теста.
-        
+        - Выбираются вопросы и отправляется страница с формой для выполнения теста.
+
         Если запрос POST:
-        - Обрабатываются ответы пользователя.
+        - Обрабатываются ответы пользователя на вопросы из сессии.
         - Подсчитывается количество правильных ответов и вычисляется итоговый процент.
         - Отправляется страница с результатами теста.
 
     Пример:
         test_input(request)
     """
-    tests = tests_work.get_tests()
-    score = None  # Оценка будет по умолчанию None
-
     if request.method == "POST":
-        submitted_data = []
-        correct_count = 0
-        total_count = len(tests)
-
-        for cnt, text, correct_country in tests:
-            user_input = request.POST.get(f"user_input_{cnt}", "").strip()
-            is_correct = user_input.lower() == correct_country.lower()
-            submitted_data.append((cnt, text, user_input, correct_country, is_correct))
-
-            if is_correct:
-                correct_count += 1
-
-        # Подсчитываем процент
-        score = (correct_count / total_count) * 100
+        session = request.session.pop(TEST_SESSION_KEY, None)
+        if session is None:
+            return redirect("test-input")
+        answers = {cnt: request.POST.get(f"user_input_{cnt}", "") for cnt in session["numbers"]}
+        result = tests_work.grade_session(session, answers)
+        results_work.record_results([result["submitted_data"]])
 
         return render(request, "test_input_form.html", {
-            "submitted_data": submitted_data,
-            "score": score
+            "submitted_data": result["submitted_data"],
+            "score": result["score"]
         })
 
+    session, questions = tests_work.start_session(seed=_get_seed(request))
+    request.session[TEST_SESSION_KEY] = session
     return render(request, "test_input_form.html", {
-        "tests": tests
+        "tests": questions
     })
 
 
+@csrf_exempt
+@require_POST
+def tests_grade(request):
+    """
+    Проверяет пачку ответов на тест (JSON API).
+
+    Эта функция:
+    - Принимает POST запрос с телом в формате JSON:
+      {"submissions": [{"id": "...", "answers": {"1": "Франция", "2": "Russia"}}, ...]}
+    - Отклоняет со статусом 413 тело больше `GRADE_BODY_LIMIT` байт (до чтения и разбора JSON)
+      и пачку больше `GRADE_BATCH_LIMIT` ответов (до разбора отдельных ответов).
+    - Отклоняет со статусом 400 ответы, которые не являются строками (null, числа, списки).
+    - Проверяет за один проход с помощью `grade_submissions` из модуля `tests_work` только
+      вопросы, на которые прислан ответ: "total" — количество таких вопросов.
+    - Записывает эти ответы в журнал результатов (модуль `results_work`).
+    - Возвращает результаты в формате JSON в том же порядке.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        JsonResponse: {"results": [{"id": "...", "correct": 3, "total": 4, "score": 75.0,
+                                    "answers": {"1": true, ...}}, ...]}
+        или {"error": "..."} со статусом 400 при некорректном запросе и 413 при слишком большом.
+
+    Пример:
+        POST /api/tests/grade/
+    """
+    too_large = JsonResponse({"error": f"Тело запроса больше {GRADE_BODY_LIMIT} байт"}, status=413)
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    if length > GRADE_BODY_LIMIT:
+        return too_large
+    # Без Content-Length (или с неверным) читается не больше лимита
+    body = request.read(GRADE_BODY_LIMIT + 1)
+    if len(body) > GRADE_BODY_LIMIT:
+        return too_large
+    try:
+        submissions = json.loads(body)["submissions"]
+        if not isinstance(submissions, list):
+            raise TypeError
+        if len(submissions) > GRADE_BATCH_LIMIT:
+            return JsonResponse({"error": f"Не больше {GRADE_BATCH_LIMIT} ответов за один запрос"}, status=413)
+        ids = [submission.get("id") for submission in submissions]
+        answers = []
+        for submission in submissions:
+            submitted = submission.get("answers", {})
+            # Ответ — только строка: null, число или список не превращаются в "None", "5", "['x']"
+            if not isinstance(submitted, dict) or not all(isinstance(answer, str) for answer in submitted.values()):
+                raise TypeError
+            answers.append({int(cnt): answer for cnt, answer in submitted.items()})
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({"error": "Ожидается JSON вида {\"submissions\": [{\"id\": ..., \"answers\": {...}}]}"},
+                            status=400)
+
+    # Проверяются и попадают в журнал результатов только вопросы, на которые клиент ответил
+    graded = tests_work.grade_submissions(answers)
+    results_work.record_results([result["submitted_data"] for result in graded])
+    results = []
+    for submission_id, result in zip(ids, graded):
+        results.append({
+            "id": submission_id,
+            "correct": result["correct"],
+            "total": result["total"],
+            "score": result["score"],
+            "answers": {str(row[0]): row[4] for row in result["submitted_data"]},
+        })
+    return JsonResponse({"results": results}, json_dumps_params={"ensure_ascii": False})
+
+
 def add_term(request):
     """
     Обрабатывает HTTP запрос и рендерит страницу для добавления нового термина.
@@ -221,7 +512,6 @@ def send_term(request):
         send_term(request)
     """
     if request.method == "POST":
-        cache.clear()
         user_name = request.POST.get("name")
         new_term = request.POST.get("new_term", "")
         new_definition = request.POST.get("new_definition", "").replace(";", ",")
@@ -236,18 +526,23 @@ def send_term(request):
             context["success"] = True
             context["comment"] = "Ваше слово добавлено"
             terms_work.write_term(new_term, new_definition)
+            # Сбрасываем только страницы, зависящие от словаря
+            invalidate("terms")
         if context["success"]:
             context["success-title"] = ""
         return render(request, "term_request.html", context)
     return add_term(request)
 
 
+@cached_page("terms", "results")
 def show_stats(request):
     """
     Обрабатывает HTTP запрос и рендерит страницу с статистикой по терминам.
 
     Эта функция:
     - Извлекает статистику по терминам с помощью функции `get_terms_stats` из модуля `terms_work`.
+    - Добавляет статистику теста (попытки, доля правильных ответов, самые сложные вопросы)
+      с помощью функции `get_results_stats` из модуля `results_work`.
     - Отправляет полученную статистику в шаблон "stats.html" для отображения пользователю.
 
     Аргументы:
@@ -260,4 +555,226 @@ def show_stats(request):
         show_stats(request)
     """
     stats = terms_work.get_terms_stats()
+    stats["tests"] = results_work.get_results_stats()
     return render(request, "stats.html", stats)
+
+
+def terms_search(request):
+    """
+    Обрабатывает запрос поиска по словарю.
+
+    Эта функция:
+    - Берет строку запроса из параметра `?q=`.
+    - Ищет термины с помощью функции `search_terms` из модуля `search_work`:
+      по началу термина, по началу слова в переводе и с учетом опечаток.
+    - Возвращает результаты в формате JSON или, при `?format=html`, HTML-фрагментом
+      из шаблона "term_search_results.html" (для подстановки в страницу).
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        JsonResponse | HttpResponse: Найденные термины.
+
+    Пример:
+        GET /terms-search/?q=arch
+        {"query": "arch", "results": [{"term": "architecture", "definition": "...", "match": "prefix"}]}
+    """
+    query = request.GET.get("q", "")
+    results = search_work.search_terms(query, SEARCH_LIMIT)
+    if request.GET.get("format") == "html":
+        return render(request, "term_search_results.html", {"results": results})
+    return JsonResponse({"query": query, "results": results}, json_dumps_params={"ensure_ascii": False})
+
+
+def review(request):
+    """
+    Обрабатывает HTTP запрос страницы интервального повторения слов.
+
+    Эта функция:
+    - При GET берет следующую карточку ученика с помощью функции `get_due_cards` из модуля
+      `review_work` и передает ее в шаблон "review.html": термин и скрытое определение.
+    - При POST записывает оценку (`term`, `grade` от 0 до 5) функцией `grade_card`
+      и перенаправляет на эту же страницу, где показана следующая карточка.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        HttpResponse: Ответ с отрендеренным шаблоном "review.html" или перенаправление после оценки.
+
+    Пример:
+        review(request)
+    """
+    learner = _get_learner(request)
+    if request.method == "POST":
+        try:
+            review_work.grade_card(learner, request.POST.get("term", ""), int(request.POST.get("grade", "")))
+        except ValueError:
+            pass  # Некорректная оценка не записывается, показывается следующая карточка
+        return redirect("review")
+    cards = review_work.get_due_cards(learner, 1)
+    return render(request, "review.html", {"card": cards[0] if cards else None})
+
+
+def reviews_next(request):
+    """
+    Выдает карточки для повторения (JSON API).
+
+    Эта функция:
+    - Определяет ученика по сессии.
+    - Берет не более `?limit=` (по умолчанию `REVIEW_LIMIT`) карточек с наступившим сроком
+      повторения и новых слов с помощью функции `get_due_cards` из модуля `review_work`.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        JsonResponse: {"cards": [{"term": "...", "definition": "...", "new": true, "due": 1700000000,
+                                  "interval": 0, "repetitions": 0}, ...]}
+
+    Пример:
+        GET /api/reviews/next/?limit=5
+    """
+    try:
+        limit = int(request.GET.get("limit", REVIEW_LIMIT))
+    except ValueError:
+        limit = REVIEW_LIMIT
+    limit = min(max(limit, 1), REVIEW_MAX_LIMIT)
+    cards = review_work.get_due_cards(_get_learner(request), limit)
+    return JsonResponse({"cards": cards}, json_dumps_params={"ensure_ascii": False})
+
+
+@csrf_exempt
+@require_POST
+def reviews_grade(request):
+    """
+    Принимает оценку карточки (JSON API).
+
+    Эта функция:
+    - Принимает POST запрос с телом в формате JSON: {"term": "...", "grade": 4}.
+    - Записывает оценку функцией `grade_card` из модуля `review_work`.
+    - Возвращает новое состояние карточки.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        JsonResponse: {"term": "...", "ease": 2.5, "interval": 6, "repetitions": 2, "due": 1700000000}
+        или {"error": "..."} со статусом 400 при некорректном запросе.
+
+    Пример:
+        POST /api/reviews/grade/
+    """
+    try:
+        data = json.loads(request.body)
+        term, grade = data["term"], data["grade"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Ожидается JSON вида {\"term\": ..., \"grade\": 0..5}"}, status=400)
+    try:
+        card = review_work.grade_card(_get_learner(request), str(term), grade)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse(card._asdict(), json_dumps_params={"ensure_ascii": False})
+
+
+def terms_changes(request):
+    """
+    Выдает изменения словаря после номера since (JSON API ленты изменений).
+
+    Эта функция:
+    - Берет не более `?limit=` (по умолчанию `CHANGES_LIMIT`) изменений с номером больше
+      `?since=` функцией `get_term_changes` из модуля `terms_work`.
+    - Если клиент передал `?epoch=` другой эпохи или номер больше последнего, отвечает
+      410: номера изменений недействительны, и словарь нужно загрузить заново
+      (`terms_snapshot`).
+    - Отвечает 304 на условный запрос с совпадающим ETag (новых изменений нет).
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        JsonResponse: {"epoch": "...", "since": 1200, "seq": 1202, "latest": 1202, "more": false,
+                       "changes": [[1201, "term", "definition", "user"], ...]},
+        где "seq" — номер последнего изменения в ответе (его нужно передать как since в
+        следующем запросе), "more" — есть ли еще изменения после него.
+        Со статусом 410: {"reset": true, "epoch": "...", "latest": 1202, "snapshot": "/api/terms/snapshot/"}.
+        Со статусом 400: {"error": "..."} при некорректном since.
+
+    Пример:
+        GET /api/terms/changes/?since=1200&epoch=3f2a….1234
+    """
+    try:
+        since = int(request.GET.get("since", 0))
+        limit = int(request.GET.get("limit", CHANGES_LIMIT))
+    except ValueError:
+        return JsonResponse({"error": "since и limit должны быть целыми числами"}, status=400)
+    if since < 0:
+        return JsonResponse({"error": "since не может быть отрицательным"}, status=400)
+    limit = min(max(limit, 1), CHANGES_MAX_LIMIT)
+    epoch, latest, changes = terms_work.get_term_changes(since, limit)
+    client_epoch = request.GET.get("epoch")
+    if (client_epoch is not None and client_epoch != epoch) or since > latest:
+        return JsonResponse({"reset": True, "epoch": epoch, "latest": latest,
+                             "snapshot": reverse("terms_snapshot")}, status=410)
+
+    etag = quote_etag(f"{epoch}:{since}:{limit}:{latest}")
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        seq = changes[-1][0] if changes else since
+        response = JsonResponse({
+            "epoch": epoch,
+            "since": since,
+            "seq": seq,
+            "latest": latest,
+            "more": seq < latest,
+            "changes": [[number, *record] for number, record in changes],
+        }, json_dumps_params={"ensure_ascii": False})
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def terms_snapshot(request):
+    """
+    Выдает словарь целиком для первой синхронизации (JSON API).
+
+    Эта функция:
+    - Берет словарь функцией `get_terms_snapshot` из модуля `terms_work`.
+    - Отвечает 304 на условный запрос с совпадающим ETag (эпоха и номер последнего
+      изменения не изменились).
+    - Иначе выдает ответ потоком по `SNAPSHOT_CHUNK` терминов, не собирая JSON всего
+      словаря в памяти.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса, содержащий информацию о запросе от клиента.
+
+    Возвращает:
+        StreamingHttpResponse: {"epoch": "...", "seq": 1202, "terms": [["term", "definition", "user"], ...]},
+        где "seq" нужно передать как since в первом запросе к `terms_changes`.
+
+    Пример:
+        GET /api/terms/snapshot/
+    """
+    epoch, seq, records = terms_work.get_terms_snapshot()
+    etag = quote_etag(f"{epoch}:{seq}")
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        def content():
+            yield f'{{"epoch": {json.dumps(epoch)}, "seq": {seq}, "terms": ['
+            chunk = []
+            separator = ""
+            for record in records:
+                chunk.append(json.dumps(record, ensure_ascii=False))
+                if len(chunk) >= SNAPSHOT_CHUNK:
+                    yield separator + ", ".join(chunk)
+                    separator = ", "
+                    chunk = []
+            if chunk:
+                yield separator + ", ".join(chunk)
+            yield "]}"
+
+        response = StreamingHttpResponse(content(), content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response